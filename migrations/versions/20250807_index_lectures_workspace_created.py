@@ -0,0 +1,24 @@
+"""Index lectures by workspace and creation time."""
+
+from __future__ import annotations
+
+from alembic import op  # type: ignore[import]
+
+revision = "20250807_index_lectures_workspace_created"
+down_revision = "20250806_create_lectures_table"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply the migration."""
+    op.create_index(
+        "ix_lectures_workspace_created",
+        "lectures",
+        ["workspace_id", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    """Revert the migration."""
+    op.drop_index("ix_lectures_workspace_created", table_name="lectures")
@@ -0,0 +1,25 @@
+"""Store source verification results on citation rows."""
+
+from __future__ import annotations
+
+import sqlalchemy as sa  # type: ignore[import]
+from alembic import op  # type: ignore[import]
+
+revision = "20250808_add_citation_verification"
+down_revision = "20250807_index_lectures_workspace_created"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply the migration."""
+    with op.batch_alter_table("citations") as batch:
+        batch.add_column(sa.Column("status_code", sa.Integer, nullable=True))
+        batch.add_column(sa.Column("verified_at", sa.DateTime, nullable=True))
+
+
+def downgrade() -> None:
+    """Revert the migration."""
+    with op.batch_alter_table("citations") as batch:
+        batch.drop_column("verified_at")
+        batch.drop_column("status_code")
@@ -0,0 +1,131 @@
+"""Split citations into global sources and per-workspace links.
+
+``citations.url`` was globally unique, so a workspace citing a URL already
+cited elsewhere replaced the other workspace's row. Source metadata now
+lives once per URL in ``sources`` and workspaces reference it through
+``workspace_citations``. Existing rows are carried over.
+"""
+
+from __future__ import annotations
+
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import sqlalchemy as sa  # type: ignore[import]
+from alembic import op  # type: ignore[import]
+
+revision = "20250809_create_sources_and_workspace_citations"
+down_revision = "20250808_add_citation_verification"
+branch_labels = None
+depends_on = None
+
+_DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+def _source_key(url: str) -> str:
+    """Frozen copy of ``agents.host_limits.source_key`` at this revision."""
+
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    default_port = _DEFAULT_PORTS.get(scheme)
+    if default_port is not None:
+        netloc = netloc.removesuffix(f":{default_port}")
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    key = f"{scheme}://{netloc}{parsed.path or '/'}"
+    if parsed.params:
+        key = f"{key};{parsed.params}"
+    return f"{key}?{query}" if query else key
+
+
+def upgrade() -> None:
+    """Apply the migration."""
+    op.create_table(
+        "sources",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("source_key", sa.String, nullable=False, unique=True),
+        sa.Column("url", sa.String, nullable=False),
+        sa.Column("title", sa.String, nullable=False),
+        sa.Column("licence", sa.String, nullable=False),
+        sa.Column("retrieved_at", sa.DateTime, nullable=False),
+        sa.Column("status_code", sa.Integer, nullable=True),
+        sa.Column("verified_at", sa.DateTime, nullable=True),
+    )
+    op.create_table(
+        "workspace_citations",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("workspace_id", sa.String, nullable=False),
+        sa.Column(
+            "source_id",
+            sa.Integer,
+            sa.ForeignKey("sources.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("added_at", sa.DateTime, nullable=False),
+        sa.UniqueConstraint("workspace_id", "source_id"),
+    )
+    op.create_index(
+        "ix_workspace_citations_workspace",
+        "workspace_citations",
+        ["workspace_id", "id"],
+    )
+
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.text(
+            "SELECT workspace_id, url, title, retrieved_at, licence, status_code,"
+            " verified_at FROM citations ORDER BY id"
+        )
+    ).fetchall()
+    seen: dict[str, int] = {}
+    for row in rows:
+        key = _source_key(row.url)
+        if key not in seen:
+            result = conn.execute(
+                sa.text(
+                    "INSERT INTO sources (source_key, url, title, licence,"
+                    " retrieved_at, status_code, verified_at) VALUES (:key, :url,"
+                    " :title, :licence, :retrieved_at, :status_code, :verified_at)"
+                ),
+                {"key": key, **row._asdict()},
+            )
+            seen[key] = result.lastrowid
+        conn.execute(
+            sa.text(
+                "INSERT OR IGNORE INTO workspace_citations"
+                " (workspace_id, source_id, added_at) VALUES (:ws, :source, :at)"
+            ),
+            {"ws": row.workspace_id, "source": seen[key], "at": row.retrieved_at},
+        )
+    op.drop_table("citations")
+
+
+def downgrade() -> None:
+    """Revert the migration."""
+    op.create_table(
+        "citations",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("workspace_id", sa.String, nullable=False),
+        sa.Column("url", sa.String, nullable=False, unique=True),
+        sa.Column("title", sa.String, nullable=False),
+        sa.Column("retrieved_at", sa.DateTime, nullable=False),
+        sa.Column("licence", sa.String, nullable=False),
+        sa.Column("status_code", sa.Integer, nullable=True),
+        sa.Column("verified_at", sa.DateTime, nullable=True),
+    )
+    # The old table holds one workspace per URL; keep the earliest link.
+    op.execute(
+        """
+        INSERT INTO citations
+            (workspace_id, url, title, retrieved_at, licence, status_code,
+             verified_at)
+        SELECT w.workspace_id, s.url, s.title, s.retrieved_at, s.licence,
+               s.status_code, s.verified_at
+        FROM sources s
+        JOIN workspace_citations w ON w.id = (
+            SELECT MIN(id) FROM workspace_citations WHERE source_id = s.id
+        )
+        """
+    )
+    op.drop_index("ix_workspace_citations_workspace", table_name="workspace_citations")
+    op.drop_table("workspace_citations")
+    op.drop_table("sources")
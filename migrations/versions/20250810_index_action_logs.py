@@ -0,0 +1,30 @@
+"""Index action logs by workspace and time for range and keyset queries."""
+
+from __future__ import annotations
+
+from alembic import op  # type: ignore[import]
+
+revision = "20250810_index_action_logs"
+down_revision = "20250809_create_sources_and_workspace_citations"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply the migration."""
+    op.create_index(
+        "ix_action_logs_workspace_timestamp",
+        "action_logs",
+        ["workspace_id", "timestamp"],
+    )
+    op.create_index(
+        "ix_action_logs_workspace_agent_timestamp",
+        "action_logs",
+        ["workspace_id", "agent_name", "timestamp"],
+    )
+
+
+def downgrade() -> None:
+    """Revert the migration."""
+    op.drop_index("ix_action_logs_workspace_agent_timestamp", table_name="action_logs")
+    op.drop_index("ix_action_logs_workspace_timestamp", table_name="action_logs")
@@ -0,0 +1,31 @@
+"""Convert legacy JSON state snapshots to the binary codec in place."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import aiosqlite
+
+from config import load_settings
+from core.checkpoint import SqliteCheckpointManager
+from persistence.repos.state_repo import StateRepo
+
+
+async def main() -> None:
+    """Upgrade the workspace ``state`` table and the checkpoint database."""
+    settings = load_settings()
+    db_url = settings.database_url or f"sqlite:///{settings.data_dir / 'workspace.db'}"
+    db_path = Path(db_url.replace("sqlite:///", ""))
+    if db_path.exists():
+        async with aiosqlite.connect(db_path) as conn:
+            converted = await StateRepo(conn).migrate_legacy_payloads()
+        print(f"state: converted {converted} rows")
+    checkpoints = settings.data_dir / "checkpoints.db"
+    if checkpoints.exists():
+        converted = await SqliteCheckpointManager(str(checkpoints)).migrate_legacy()
+        print(f"checkpoints: converted {converted} rows")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,22 +2,30 @@
 
 from __future__ import annotations
 
+import asyncio
 from typing import List
 
-from .offline_cache import load_cached_results
+from .offline_cache import load_cached_results, search_cached_results
 from .researcher_web import RawSearchResult
 
 
 class CacheBackedResearcher:
     """Return cached search results for a query.
 
-    The researcher does not perform any network calls. It simply reads
-    pre-fetched results from ``<data_dir>/cache/{query}.json`` where
-    ``<data_dir>`` comes from :class:`config.Settings`. If no cache file is
-    present the search fails immediately, signalling that the user must
-    populate the cache beforehand.
+    The researcher does not perform any network calls. It reads the offline
+    corpus in ``<data_dir>/cache/corpus.db`` where ``<data_dir>`` comes from
+    :class:`config.Settings`. Queries cached verbatim return their original
+    results; any other query falls back to the best BM25 matches among all
+    cached results. The search only fails when nothing in the corpus matches,
+    signalling that the user must populate the cache beforehand.
+
+    Args:
+        limit: Maximum number of results returned for non-exact queries.
     """
 
+    def __init__(self, limit: int = 10) -> None:
+        self._limit = limit
+
     async def __aenter__(self) -> "CacheBackedResearcher":
         return self
 
@@ -37,20 +45,24 @@ class CacheBackedResearcher:
         Parameters
         ----------
         query:
-            The search phrase used to locate a cache file.
+            The search phrase to look up in the offline corpus.
 
         Returns
         -------
         list[RawSearchResult]
-            Previously cached search results.
+            Results cached for ``query``, or the nearest cached matches.
 
         Raises
         ------
         FileNotFoundError
-            If no cache file exists for ``query``.
+            If no cached result matches ``query``.
         """
 
-        results = load_cached_results(query)
+        results = await asyncio.to_thread(load_cached_results, query)
         if results is None:
+            results = await asyncio.to_thread(
+                search_cached_results, query, limit=self._limit
+            )
+        if not results:
             raise FileNotFoundError(f"No cached results for query '{query}'")
         return results
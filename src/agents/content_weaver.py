@@ -4,16 +4,29 @@ from __future__ import annotations
 
 import json
 import logging
+from time import perf_counter
 from typing import AsyncGenerator, Sequence
 
 from pydantic import ValidationError
 
+import config
+from core.document_graph import DocumentDAG
 from core.state import Citation, Module, State
 from prompts import get_prompt
 
-from .models import WeaveResult
+from .hedging import RequestTimeout, hedged_stream
+from .json_stream import JsonItemStream, OffSchemaError
+from .model_routing import model_for, models_for, record_model_call, split_model
+from .models import AssessmentItem, ResearchResult, Slide, WeaveResult
+from .prompt_context import build_source_context, count_tokens, schema_instruction
+from .rate_limits import get_limiter
+from .streaming import stream as publish
 from .streaming import stream_debug, stream_messages
 
+# Array items validated and published on the ``values`` channel as they close.
+_ITEM_MODELS = {"slides": Slide, "assessment": AssessmentItem}
+_ITEM_EVENTS = {"slides": "slide", "assessment": "assessment"}
+
 
 class RetryableError(RuntimeError):
     """Signal that the operation can be retried."""
@@ -66,15 +79,27 @@ async def call_openai_function(
     prompt: str,
     sources: Sequence[Citation] | None = None,
     instructions: Sequence[str] | None = None,
+    research: Sequence[ResearchResult] = (),
+    model: str | None = None,
+    workspace_id: str = "default",
+    system: Sequence[str] | None = None,
 ) -> AsyncGenerator[str, None]:
     """Invoke an LLM via Pydantic AI and yield streamed tokens.
 
     Args:
         prompt: Prompt passed to the agent.
         sources: Optional citation metadata to provide additional context.
+            The most relevant sources are packed into the configured
+            ``prompt_source_tokens`` budget.
         instructions: Optional override instructions for the agent. When
             provided, default instructions including JSON schema enforcement
             are skipped.
+        research: Research results whose keywords rank ``sources``.
+        model: ``<provider>:<model>`` to call. Defaults to the model routed to
+            the ``Content-Weaver`` node.
+        workspace_id: Workspace the call's latency and cost are recorded for.
+        system: Instructions following the source context. Defaults to the
+            weaver system prompt, duration rule and ``WeaveResult`` schema.
     """
 
     try:
@@ -90,8 +115,10 @@ async def call_openai_function(
 
         return empty()
 
-    model = init_model()
-    if model is None:
+    model_id = model or model_for("Content-Weaver")
+    provider_name, model_name = split_model(model_id)
+    llm = init_model(model=model_id)
+    if llm is None:
 
         async def empty() -> AsyncGenerator[str, None]:
             if False:
@@ -99,51 +126,127 @@ async def call_openai_function(
 
         return empty()
 
+    settings = config.load_settings()
     if instructions is None:
-        schema = json.dumps(WeaveResult.model_json_schema(), indent=2)
         instructions = []
         if sources:
-            lines = []
-            for src in sources:
-                if src.title and src.licence and src.retrieved_at:
-                    lines.append(
-                        f"- {src.title} ({src.url}) – {src.licence} retrieved"
-                        f" {src.retrieved_at}"
-                    )
-            if lines:
-                context = "\n".join(lines)
+            context = build_source_context(
+                sources,
+                prompt,
+                model_name=model_name,
+                budget=settings.prompt_source_tokens,
+                research=research,
+            )
+            if context:
                 instructions.append(
                     "Use only the following sources. If a claim is not supported here, "
-                    "write it cautiously and avoid definitive language.\n"
-                    + context
+                    "write it cautiously and avoid definitive language.\n" + context
                 )
-        instructions.extend(
-            [
+        if system is None:
+            system = [
                 get_prompt("content_weaver_system"),
                 get_prompt("content_weaver_duration_rule"),
-                f"Output must conform to this JSON schema:\n{schema}",
+                schema_instruction(),
             ]
-        )
+        instructions.extend(system)
+    prompt_tokens = count_tokens("\n".join([*instructions, prompt]), model_name)
+    stream_debug(f"Content weaver prompt: {prompt_tokens} tokens")
 
-    agent = Agent(model=model, instructions=list(instructions))
+    agent = Agent(model=llm, instructions=list(instructions))
+    limiter = get_limiter(provider_name, model_name)
 
     async def generator() -> AsyncGenerator[str, None]:
-        async with agent.run_stream(prompt) as response:  # pragma: no cover - streaming
+        started = perf_counter()
+        output: list[str] = []
+        async with limiter.stream(
+            lambda: agent.run_stream(prompt), tokens=prompt_tokens
+        ) as response:
             async for chunk in response.stream_text(delta=True):
                 if chunk:
+                    output.append(chunk)
                     yield chunk
+        record_model_call(
+            workspace_id,
+            "Content-Weaver",
+            model_id,
+            perf_counter() - started,
+            input_tokens=prompt_tokens,
+            output_tokens=count_tokens("".join(output), model_name),
+        )
 
     return generator()
 
 
-async def content_weaver(state: State, section_id: int | None = None) -> WeaveResult:
+async def _weave_attempt(
+    prompt: str,
+    state: State,
+    channel: str,
+    section_id: int | None,
+    attempt: int,
+    model: str,
+    sources: Sequence[Citation],
+) -> WeaveResult:
+    """Stream one generation, publishing items and failing fast off-schema.
+
+    Each completed slide or assessment item is validated as soon as its
+    closing brace arrives and published on ``channel``. The stream is
+    abandoned at the first item that cannot match the schema. The request
+    runs under the ``Content-Weaver`` deadline and hedging policy from
+    :mod:`agents.hedging`.
+    """
+
+    tokens: list[str] = []
+    scanner = JsonItemStream(_ITEM_MODELS)
+    workspace_id = getattr(state, "workspace_id", "default")
+    stream = hedged_stream(
+        "Content-Weaver",
+        lambda: call_openai_function(
+            prompt,
+            sources,
+            research=state.research_results,
+            model=model,
+            workspace_id=workspace_id,
+        ),
+    )
+    async for token in stream:
+        tokens.append(token)
+        stream_messages(token)
+        try:
+            for key, data in scanner.feed(token):
+                item = _ITEM_MODELS[key].model_validate(data)
+                publish(
+                    channel,
+                    {
+                        _ITEM_EVENTS[key]: item.model_dump(),
+                        "section_id": section_id,
+                        "attempt": attempt,
+                    },
+                )
+        except (OffSchemaError, ValidationError) as exc:
+            await stream.aclose()
+            raise RetryableError("model returned invalid schema") from exc
+    return _load_weave("".join(tokens))
+
+
+async def content_weaver(
+    state: State,
+    section_id: int | None = None,
+    sources: Sequence[Citation] | None = None,
+) -> WeaveResult:
     """Generate lecture content via an LLM and enforce schema compliance.
 
+    Slides and assessment items are published on the workspace ``values``
+    channel as soon as they are generated. Output that stops matching the
+    schema, or a stream that misses its deadline, aborts the attempt, which
+    is retried once, on the primary model if the node is routed elsewhere.
+
     Args:
         state: Current orchestration state providing the outline and prompt.
         section_id: Optional index into ``state.outline.steps`` specifying a
             particular section to generate. When omitted the full ``state.prompt``
             is used.
+        sources: Citations to ground the generation in. Defaults to
+            ``state.sources``.
     """
 
     prompt = state.prompt
@@ -152,14 +255,21 @@ async def content_weaver(state: State, section_id: int | None = None) -> WeaveRe
             raise IndexError("section_id out of range")
         prompt = state.outline.steps[section_id]
 
+    if sources is None:
+        sources = state.sources
+    channel = f"{getattr(state, 'workspace_id', 'default')}:values"
+    models = models_for("Content-Weaver")
     for attempt in range(2):
-        tokens: list[str] = []
-        stream = await call_openai_function(prompt, state.sources)
-        async for token in stream:
-            tokens.append(token)
-            stream_messages(token)
-        raw = "".join(tokens)
-        weave = _load_weave(raw)
+        model = models[min(attempt, len(models) - 1)]
+        try:
+            weave = await _weave_attempt(
+                prompt, state, channel, section_id, attempt, model, sources
+            )
+        except (RetryableError, RequestTimeout) as exc:
+            stream_debug(f"Discarding weave attempt {attempt + 1}: {exc}")
+            if attempt == 1:
+                raise
+            continue
 
         # Guardrail: ensure speaker notes provide sufficient material
         word_count = sum(
@@ -175,6 +285,93 @@ async def content_weaver(state: State, section_id: int | None = None) -> WeaveRe
     return weave
 
 
+def _slide_prompt(module: Module, slide_number: int, notes_only: bool) -> str:
+    """Return the prompt revising one slide with its neighbours as context."""
+
+    slides = list(module.slides or [])
+    numbers = [slide.slide_number for slide in slides]
+    if slide_number not in numbers:
+        raise KeyError(f"module {module.id} has no slide {slide_number}")
+    position = numbers.index(slide_number)
+
+    def dump(index: int) -> dict | None:
+        if 0 <= index < len(slides):
+            return slides[index].model_dump(exclude_none=True)
+        return None
+
+    context = {
+        "module": module.title,
+        "learning_objectives": module.learning_objectives,
+        "previous_slide": dump(position - 1),
+        "slide": dump(position),
+        "next_slide": dump(position + 1),
+    }
+    part = "the speaker notes of slide" if notes_only else "slide"
+    return f"Revise {part} {slide_number}.\n" + json.dumps(context)
+
+
+async def weave_slide(
+    state: State,
+    module: Module,
+    slide_number: int,
+    *,
+    notes_only: bool = False,
+    sources: Sequence[Citation] | None = None,
+) -> Slide:
+    """Regenerate a single slide of ``module``.
+
+    Only the slide is generated; the module's title, objectives and the
+    neighbouring slides are passed as context. The request runs under the
+    ``Content-Weaver`` model, deadline and hedging policy and is retried
+    once, like :func:`content_weaver`.
+
+    Args:
+        state: Orchestration state providing research results.
+        module: Module containing the slide.
+        slide_number: Number of the slide to regenerate.
+        notes_only: Ask for new speaker notes while keeping the slide copy.
+        sources: Citations to ground the slide in. Defaults to
+            ``state.sources``.
+
+    Raises:
+        KeyError: If ``module`` has no slide ``slide_number``.
+        RetryableError: If both attempts return output that is not a slide.
+    """
+
+    prompt = _slide_prompt(module, slide_number, notes_only)
+    if sources is None:
+        sources = state.sources
+    system = [get_prompt("content_weaver_slide_system"), schema_instruction(Slide)]
+    workspace_id = getattr(state, "workspace_id", "default")
+    models = models_for("Content-Weaver")
+    for attempt in range(2):
+        model = models[min(attempt, len(models) - 1)]
+        stream = hedged_stream(
+            "Content-Weaver",
+            lambda: call_openai_function(
+                prompt,
+                sources,
+                research=state.research_results,
+                model=model,
+                workspace_id=workspace_id,
+                system=system,
+            ),
+        )
+        try:
+            raw = "".join([token async for token in stream])
+            slide = Slide.model_validate_json(_extract_json(raw))
+        except (ValidationError, RequestTimeout) as exc:
+            stream_debug(f"Discarding slide attempt {attempt + 1}: {exc}")
+            if attempt == 1:
+                if isinstance(exc, ValidationError):
+                    raise RetryableError("model returned invalid slide") from exc
+                raise
+            continue
+        break
+
+    return slide.model_copy(update={"slide_number": slide_number})
+
+
 async def run_content_weaver(state: State, section_id: int | None = None) -> Module:
     """Generate content and store it in ``state.modules``.
 
@@ -188,6 +385,15 @@ async def run_content_weaver(state: State, section_id: int | None = None) -> Mod
     """
 
     weave = await content_weaver(state, section_id=section_id)
+    return add_module(state, weave)
+
+
+def add_module(state: State, weave: WeaveResult) -> Module:
+    """Append ``weave`` to ``state.modules`` and the document graph."""
+
     module = Module(id=f"m{len(state.modules) + 1}", **weave.model_dump())
     state.modules.append(module)
+    if state.document_graph is None:
+        state.document_graph = DocumentDAG()
+    state.document_graph.upsert_module(module)
     return module
@@ -10,8 +10,10 @@ from config import settings
 from core.document_graph import build_document_dag
 from core.state import ActionLog, State
 from export.docx_exporter import DocxExporter
+from export.lecture_loader import get_lecture_loader
 from export.markdown_exporter import MarkdownExporter
 from export.pdf_exporter import PdfExporter
+from persistence.manager import PersistenceManager
 
 
 @dataclass(slots=True)
@@ -42,6 +44,8 @@ async def run_exporter(state: State) -> ExportStatus:
     -----
     Expected I/O and database errors are captured and recorded in ``state.log``.
     Unexpected exceptions are logged and re-raised so callers can handle them.
+    After a successful export the lecture is written to the columnar archive,
+    replacing any earlier archive of the same persisted lecture.
     """
 
     workspace_id = getattr(state, "workspace_id", "default")
@@ -54,9 +58,15 @@ async def run_exporter(state: State) -> ExportStatus:
     exported: dict[str, str] = {}
 
     try:
-        # Materialise the document graph before exporting so downstream
-        # consumers can traverse per-slide content.
-        state.document_graph = build_document_dag(state.modules, state.research_results)
+        # Bring the document graph up to date before exporting so downstream
+        # consumers can traverse per-slide content. Only changed modules are
+        # rebuilt when the graph already exists.
+        if state.document_graph is None:
+            state.document_graph = build_document_dag(
+                state.modules, state.research_results
+            )
+        else:
+            state.document_graph.sync(state.modules, state.research_results)
 
         md = MarkdownExporter(str(db_path)).export(workspace_id)
         md_path = export_dir / "lecture.md"
@@ -84,4 +94,29 @@ async def run_exporter(state: State) -> ExportStatus:
         state.log.append(ActionLog(message=f"Export failed: {exc}"))
         raise
 
+    if status.success:
+        await _archive(state, str(db_path))
     return status
+
+
+async def _archive(state: State, db_path: str) -> None:
+    """Archive the exported lecture under its persisted lecture id.
+
+    Re-exports of the same lecture, for example after regeneration, replace
+    its archive partition instead of adding another. Archiving is best
+    effort: a failure is logged and recorded in ``state.log`` but does not
+    fail the export.
+    """
+
+    workspace_id = getattr(state, "workspace_id", "default")
+    try:
+        row_id = get_lecture_loader(db_path).latest_id(workspace_id)
+        if row_id is None:
+            raise ValueError(f"no persisted lecture for workspace {workspace_id}")
+        lecture_id = str(row_id)
+        await PersistenceManager().archive(state, lecture_id)
+    except Exception as exc:
+        logging.exception("Lecture archive failed")
+        state.log.append(ActionLog(message=f"Archive failed: {exc}"))
+        return
+    state.log.append(ActionLog(message=f"Archived lecture {lecture_id}"))
@@ -2,54 +2,186 @@
 
 from __future__ import annotations
 
-import asyncio
+import hashlib
 import logging
 import re
+from bisect import bisect_right
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import List
-
-import httpx
+from datetime import datetime
+from typing import AsyncIterator, Iterator, List, Tuple
 
 from config import Settings
-from core.state import State
+from core.state import Module, State
 from models import ClaimFlag, FactCheckReport, SentenceProbability
+from persistence import CitationRepo, get_db_session
+
+from .host_limits import source_key
+from .url_verifier import UrlCheck, get_url_verifier
 
 _DEF_LOW_CONF_WORDS = ["maybe", "probably", "i think", "uncertain"]
+_CLAIM_PHRASES = ["studies show", "experts say", "research indicates"]
 
+# One alternation over both lexicons so each text is scanned in a single pass.
+_LEXICON_PATTERN = re.compile(
+    "(?P<hedge>{})|(?P<claim>{})".format(
+        "|".join(map(re.escape, _DEF_LOW_CONF_WORDS)),
+        "|".join(map(re.escape, _CLAIM_PHRASES)),
+    ),
+    re.IGNORECASE,
+)
+_SENTENCE_END = re.compile(r"[.!?]\s*")
+_CITATION_PATTERN = re.compile(r"\[[0-9]+\]|\(.*?\d{4}.*?\)")
+
+
+@dataclass(slots=True)
+class _Location:
+    module_id: str | None = None
+    slide_number: int | None = None
+    section: str | None = None
 
-def assess_hallucination_probabilities(text: str) -> List[SentenceProbability]:
-    """Assign confidence scores to sentences and return low-confidence ones."""
 
-    sentences = [s.strip() for s in re.split(r"[.!?]\s*", text) if s.strip()]
-    results: List[SentenceProbability] = []
-    for idx, sentence in enumerate(sentences, start=1):
-        lowered = sentence.lower()
-        probability = 0.9
-        if any(word in lowered for word in _DEF_LOW_CONF_WORDS):
-            probability = 0.4
-        if probability < 0.6:
-            results.append(
+def _scan(
+    text: str, where: _Location | None = None
+) -> Tuple[List[SentenceProbability], List[ClaimFlag]]:
+    """Find hedged sentences and uncited claim lines in ``text``.
+
+    Sentence and line boundaries are only computed once a match needs them,
+    so clean text costs a single regex pass.
+    """
+
+    where = where or _Location()
+    hallucinations: List[SentenceProbability] = []
+    flags: List[ClaimFlag] = []
+    sentences: List[Tuple[int, str]] | None = None
+    sentence_starts: List[int] = []
+    line_starts: List[int] | None = None
+    seen_sentences: set[int] = set()
+    seen_lines: set[int] = set()
+    for match in _LEXICON_PATTERN.finditer(text):
+        offset = match.start()
+        if match.lastgroup == "hedge":
+            if sentences is None:
+                sentences, sentence_starts = _sentences(text)
+            idx = bisect_right(sentence_starts, offset) - 1
+            number, sentence = sentences[idx]
+            if idx in seen_sentences or not sentence:
+                continue
+            seen_sentences.add(idx)
+            hallucinations.append(
                 SentenceProbability(
-                    line_number=idx, sentence=sentence, probability=probability
+                    line_number=number,
+                    sentence=sentence,
+                    probability=0.4,
+                    module_id=where.module_id,
+                    slide_number=where.slide_number,
+                    section=where.section,
                 )
             )
-    return results
+        else:
+            if line_starts is None:
+                line_starts = [0] + [m.end() for m in re.finditer("\n", text)]
+            idx = bisect_right(line_starts, offset) - 1
+            if idx in seen_lines:
+                continue
+            seen_lines.add(idx)
+            end = line_starts[idx + 1] if idx + 1 < len(line_starts) else len(text)
+            line = text[line_starts[idx] : end]
+            if _CITATION_PATTERN.search(line):
+                continue
+            flags.append(
+                ClaimFlag(
+                    line_number=idx + 1,
+                    snippet=line.strip(),
+                    module_id=where.module_id,
+                    slide_number=where.slide_number,
+                    section=where.section,
+                )
+            )
+    return hallucinations, flags
 
 
-_UNSUPPORTED_PATTERN = re.compile(
-    r"(studies show|experts say|research indicates)", re.IGNORECASE
-)
-_CITATION_PATTERN = re.compile(r"\[[0-9]+\]|\(.*?\d{4}.*?\)")
+def _sentences(text: str) -> Tuple[List[Tuple[int, str]], List[int]]:
+    """Return numbered sentences and their start offsets in ``text``.
+
+    Empty fragments keep their slot (numbered ``0``) so offsets stay aligned
+    while numbering matches a plain ``re.split`` over the text.
+    """
+
+    pieces: List[Tuple[int, str]] = []
+    starts: List[int] = []
+    number = 0
+    start = 0
+    for match in [*_SENTENCE_END.finditer(text), None]:
+        end = match.start() if match else len(text)
+        sentence = text[start:end].strip()
+        if sentence:
+            number += 1
+        pieces.append((number if sentence else 0, sentence))
+        starts.append(start)
+        if match is None:
+            break
+        start = match.end()
+    return pieces, starts
+
+
+def assess_hallucination_probabilities(text: str) -> List[SentenceProbability]:
+    """Assign confidence scores to sentences and return low-confidence ones."""
+
+    return _scan(text)[0]
 
 
 def scan_unsupported_claims(text: str) -> List[ClaimFlag]:
     """Detect claim phrases lacking accompanying citations."""
 
+    return _scan(text)[1]
+
+
+def _module_segments(module: Module) -> Iterator[Tuple[_Location, str]]:
+    """Yield each scannable text field of ``module`` with its location."""
+
+    if module.summary:
+        yield _Location(module.id, None, "summary"), module.summary
+    for slide in module.slides or []:
+        if slide.copy and slide.copy.bullet_points:
+            yield (
+                _Location(module.id, slide.slide_number, "bullet_points"),
+                "\n".join(slide.copy.bullet_points),
+            )
+        if slide.speaker_notes and slide.speaker_notes.notes:
+            yield (
+                _Location(module.id, slide.slide_number, "speaker_notes"),
+                slide.speaker_notes.notes,
+            )
+
+
+_ModuleFindings = Tuple[List[SentenceProbability], List[ClaimFlag]]
+_MODULE_CACHE: "OrderedDict[str, _ModuleFindings]" = OrderedDict()
+_MODULE_CACHE_SIZE = 256
+
+
+def scan_module(module: Module) -> _ModuleFindings:
+    """Scan the summary, slides and speaker notes of ``module``.
+
+    Results are memoised by a digest of the module content, so re-running the
+    fact checker only rescans modules that changed since the last check.
+    """
+
+    digest = hashlib.sha256(module.model_dump_json().encode("utf-8")).hexdigest()
+    cached = _MODULE_CACHE.get(digest)
+    if cached is not None:
+        _MODULE_CACHE.move_to_end(digest)
+        return cached
+    hallucinations: List[SentenceProbability] = []
     flags: List[ClaimFlag] = []
-    for idx, line in enumerate(text.splitlines(), start=1):
-        if _UNSUPPORTED_PATTERN.search(line) and not _CITATION_PATTERN.search(line):
-            flags.append(ClaimFlag(line_number=idx, snippet=line.strip()))
-    return flags
+    for where, text in _module_segments(module):
+        found, flagged = _scan(text, where)
+        hallucinations.extend(found)
+        flags.extend(flagged)
+    findings = _MODULE_CACHE[digest] = (hallucinations, flags)
+    if len(_MODULE_CACHE) > _MODULE_CACHE_SIZE:
+        _MODULE_CACHE.popitem(last=False)
+    return findings
 
 
 def compile_fact_check_report(
@@ -66,25 +198,42 @@ def compile_fact_check_report(
 
 
 async def run_fact_checker(state: State) -> FactCheckReport:
-    """Run fact-checking and store the report on ``state``."""
+    """Run fact-checking and store the report on ``state``.
+
+    Outline steps and the woven content of every module (summaries, slide
+    bullets and speaker notes) are scanned; findings from modules carry
+    their module id and slide number. The URLs in ``state.sources`` are
+    verified and each outcome is stored on its citation row.
+    """
 
     outline = getattr(state, "outline", None)
-    if outline is None or not getattr(outline, "steps", None):
+    steps = getattr(outline, "steps", None) if outline is not None else None
+    modules = getattr(state, "modules", None) or []
+    if not steps and not modules:
         raise ValueError("state.outline.steps is required for fact checking")
-    text = "\n".join(outline.steps)
-    hallucinations = assess_hallucination_probabilities(text)
-    flags = scan_unsupported_claims(text)
+    hallucinations: List[SentenceProbability] = []
+    flags: List[ClaimFlag] = []
+    if steps:
+        hallucinations, flags = _scan("\n".join(steps))
+    for module in modules:
+        found, flagged = scan_module(module)
+        hallucinations.extend(found)
+        flags.extend(flagged)
     report = compile_fact_check_report(hallucinations, flags)
     state.factcheck_report = report
+    await record_source_verifications(state)
     return report
 
 
 __all__ = [
     "assess_hallucination_probabilities",
     "scan_unsupported_claims",
+    "scan_module",
     "compile_fact_check_report",
     "run_fact_checker",
+    "record_source_verifications",
     "verify_sources",
+    "iter_verified_sources",
     "SourceVerification",
 ]
 
@@ -98,28 +247,65 @@ class SourceVerification:
     licence: str | None = None
 
 
+def _as_verification(check: UrlCheck) -> SourceVerification:
+    return SourceVerification(
+        url=check.url,
+        status="ok" if check.ok else "error",
+        licence=check.licence,
+    )
+
+
+async def iter_verified_sources(urls: List[str]) -> AsyncIterator[SourceVerification]:
+    """Yield verification results for ``urls`` as they complete.
+
+    Duplicate URLs, compared by :func:`~agents.host_limits.source_key`, are
+    checked once and reported under that key. In offline mode every source
+    is yielded as ``unchecked`` without network access.
+    """
+
+    if Settings().offline_mode:
+        for url in dict.fromkeys(source_key(url) for url in urls):
+            yield SourceVerification(url=url, status="unchecked")
+        return
+    async for check in get_url_verifier().check_many(urls):
+        yield _as_verification(check)
+
+
 async def verify_sources(urls: List[str]) -> List[SourceVerification]:
     """Validate external URLs and capture licence metadata.
 
-    When the application runs in offline mode, network calls are skipped and
+    Checks go through the shared :class:`~agents.url_verifier.UrlVerifier`,
+    so URLs already requested by the researcher are not fetched again. When
+    the application runs in offline mode, network calls are skipped and
     each source is marked as ``unchecked``.
     """
 
-    settings = Settings()
-    if settings.offline_mode:
-        return [SourceVerification(url=url, status="unchecked") for url in urls]
-
-    async def _verify(client: httpx.AsyncClient, url: str) -> SourceVerification:
-        try:
-            response = await client.head(url, timeout=5.0)
-            status = "ok" if response.status_code < 400 else "error"
-            licence = response.headers.get("License")
-        except Exception:
-            logging.exception("Source verification failed")
-            status = "error"
-            licence = None
-        return SourceVerification(url=url, status=status, licence=licence)
-
-    async with httpx.AsyncClient() as client:
-        tasks = [_verify(client, url) for url in urls]
-        return await asyncio.gather(*tasks)
+    results = {source_key(item.url): item async for item in iter_verified_sources(urls)}
+    return [results[source_key(url)] for url in urls]
+
+
+async def record_source_verifications(state: State) -> List[UrlCheck]:
+    """Verify the URLs in ``state.sources`` and store each outcome.
+
+    Results are written to the workspace's citation rows through
+    :meth:`CitationRepo.record_verification`. Nothing is requested or stored
+    in offline mode, and storage failures are logged rather than raised so
+    they never fail the fact-checking step.
+    """
+
+    urls = [str(source.url) for source in getattr(state, "sources", None) or []]
+    if not urls or Settings().offline_mode:
+        return []
+    checks = [check async for check in get_url_verifier().check_many(urls)]
+    try:
+        async with get_db_session() as conn:
+            repo = CitationRepo(conn, getattr(state, "workspace_id", "default"))
+            for check in checks:
+                await repo.record_verification(
+                    check.url,
+                    check.status_code,
+                    datetime.utcfromtimestamp(check.checked_at),
+                )
+    except Exception:
+        logging.exception("Failed to store source verifications")
+    return checks
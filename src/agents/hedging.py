@@ -0,0 +1,277 @@
+"""Deadline-bounded and hedged LLM requests.
+
+Each pipeline node has a :class:`RequestPolicy`, configured through
+``Settings.node_policies``, bounding how long a call may take overall and
+how long it may wait for its first token. When hedging is
+enabled, a duplicate request is launched once the first has been silent for
+longer than the node's observed p95 time to first token; whichever produces
+output first is kept and the other is cancelled. Outcomes are recorded as
+OpenTelemetry metrics labelled by node: streams report their time to first
+token, which also feeds the p95, while non-streaming calls report their
+total latency separately.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from opentelemetry import metrics
+
+import config
+
+from .streaming import stream_debug
+
+T = TypeVar("T")
+
+_EMPTY = object()
+
+
+class RequestTimeout(TimeoutError):
+    """Raised when a call misses its deadline or first-token timeout."""
+
+
+@dataclass(frozen=True, slots=True)
+class RequestPolicy:
+    """Time limits and hedging behaviour for one node's LLM calls.
+
+    Attributes:
+        deadline: Seconds allowed for the whole call, or ``None``.
+        first_token_timeout: Seconds allowed before the first output arrives.
+        hedge: Whether to race a duplicate request when the first is slow.
+        hedge_after: Fallback hedge delay used until enough latency samples
+            exist to estimate the p95.
+        min_samples: Samples required before the observed p95 is used.
+    """
+
+    deadline: Optional[float] = None
+    first_token_timeout: Optional[float] = None
+    hedge: bool = False
+    hedge_after: float = 20.0
+    min_samples: int = 20
+
+
+_LATENCIES: Dict[str, Deque[float]] = {}
+
+_meter = metrics.get_meter("lecture_builder")
+_FIRST_TOKEN = _meter.create_histogram(
+    "llm_first_token_seconds", unit="s", description="Time to first LLM output"
+)
+_CALL_SECONDS = _meter.create_histogram(
+    "llm_call_seconds", unit="s", description="Total latency of non-streaming calls"
+)
+_HEDGES = _meter.create_counter(
+    "llm_hedged_total", description="Duplicate LLM requests launched by hedging"
+)
+_HEDGE_WINS = _meter.create_counter(
+    "llm_hedge_wins_total", description="Hedged requests that answered first"
+)
+_TIMEOUTS = _meter.create_counter(
+    "llm_timeouts_total", description="LLM calls aborted by a deadline"
+)
+
+
+def policy_for(node: str) -> RequestPolicy:
+    """Return the policy configured for ``node`` in ``Settings.node_policies``.
+
+    Fields missing from a node's entry keep their :class:`RequestPolicy`
+    defaults; nodes without an entry get no deadline and no hedging.
+    """
+
+    fields = config.load_settings().node_policies.get(node, {})
+    return RequestPolicy(**fields)  # type: ignore[arg-type]
+
+
+def hedge_delay(node: str, policy: RequestPolicy) -> float:
+    """Return how long to wait before hedging a call for ``node``."""
+
+    samples = sorted(_LATENCIES.get(node, ()))
+    if len(samples) < policy.min_samples:
+        return policy.hedge_after
+    return samples[math.ceil(0.95 * len(samples)) - 1]
+
+
+def _record_first_token(node: str, seconds: float) -> None:
+    _LATENCIES.setdefault(node, deque(maxlen=200)).append(seconds)
+    _FIRST_TOKEN.record(seconds, {"node": node})
+
+
+def _record_call(node: str, seconds: float) -> None:
+    _CALL_SECONDS.record(seconds, {"node": node})
+
+
+async def _race(
+    node: str,
+    policy: RequestPolicy,
+    launch: Callable[[], "asyncio.Task[T]"],
+    give_up: float,
+    record: Callable[[str, float], None],
+    discard: Callable[[T], Awaitable[None]] | None = None,
+) -> T:
+    """Return the result of the first of up to two launched tasks.
+
+    A second task is launched once the hedge delay passes. The time taken by
+    the winner is passed to ``record``. Tasks still running when a winner is
+    found are cancelled; a losing result that completed at the same time is
+    handed to ``discard``.
+    """
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    primary = launch()
+    tasks: List[asyncio.Task[T]] = [primary]
+    hedge_at = started + hedge_delay(node, policy) if policy.hedge else math.inf
+    winner: Optional[asyncio.Task[T]] = None
+    try:
+        while True:
+            wake = min(give_up, hedge_at)
+            timeout = None if wake == math.inf else max(0.0, wake - loop.time())
+            done, _ = await asyncio.wait(
+                tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None or len(tasks) == 1:
+                    winner = task
+                    break
+                # One attempt failed; keep waiting for the other.
+                tasks.remove(task)
+                hedge_at = math.inf
+            if winner is not None:
+                if winner is not primary:
+                    _HEDGE_WINS.add(1, {"node": node})
+                record(node, loop.time() - started)
+                return winner.result()
+            if loop.time() >= give_up:
+                _TIMEOUTS.add(1, {"node": node})
+                raise RequestTimeout(f"{node} produced no output in time")
+            if loop.time() >= hedge_at:
+                stream_debug(f"{node} is slow; hedging with a second request")
+                _HEDGES.add(1, {"node": node})
+                tasks.append(launch())
+                hedge_at = math.inf
+    finally:
+        losers = [task for task in tasks if task is not winner]
+        for task in losers:
+            task.cancel()
+        for outcome in await asyncio.gather(*losers, return_exceptions=True):
+            if discard is not None and not isinstance(outcome, BaseException):
+                await discard(outcome)
+
+
+def _earliest(*times: Optional[float]) -> float:
+    return min([t for t in times if t is not None] or [math.inf])
+
+
+async def hedged_call(
+    node: str,
+    func: Callable[[], Awaitable[T]],
+    policy: RequestPolicy | None = None,
+) -> T:
+    """Await ``func()`` under ``node``'s deadline, hedging when it is slow.
+
+    Raises:
+        RequestTimeout: If no attempt completes before the deadline.
+    """
+
+    policy = policy or policy_for(node)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + policy.deadline if policy.deadline else None
+
+    async def run() -> T:
+        return await func()
+
+    return await _race(
+        node,
+        policy,
+        lambda: asyncio.create_task(run()),
+        _earliest(deadline),
+        _record_call,
+    )
+
+
+async def hedged_stream(
+    node: str,
+    start: Callable[[], Awaitable[AsyncIterator[Any]]],
+    policy: RequestPolicy | None = None,
+) -> AsyncIterator[Any]:
+    """Yield chunks from ``start()`` under ``node``'s policy.
+
+    Hedging only applies while waiting for the first chunk; once a stream
+    has produced output it is consumed to the end and the other attempt is
+    cancelled and closed.
+
+    Raises:
+        RequestTimeout: If no chunk arrives within the first-token timeout or
+            the stream runs past its deadline.
+    """
+
+    policy = policy or policy_for(node)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + policy.deadline if policy.deadline else None
+    first_token_by = (
+        loop.time() + policy.first_token_timeout if policy.first_token_timeout else None
+    )
+
+    async def close(iterator: AsyncIterator[Any]) -> None:
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    async def first() -> Tuple[AsyncIterator[Any], Any]:
+        iterator = (await start()).__aiter__()
+        try:
+            return iterator, await iterator.__anext__()
+        except StopAsyncIteration:
+            return iterator, _EMPTY
+        except asyncio.CancelledError:
+            await close(iterator)
+            raise
+
+    iterator, chunk = await _race(
+        node,
+        policy,
+        lambda: asyncio.create_task(first()),
+        _earliest(deadline, first_token_by),
+        _record_first_token,
+        discard=lambda result: close(result[0]),
+    )
+    if chunk is _EMPTY:
+        return
+    try:
+        yield chunk
+        while True:
+            try:
+                async with asyncio.timeout_at(deadline):
+                    chunk = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+            except TimeoutError as exc:
+                _TIMEOUTS.add(1, {"node": node})
+                raise RequestTimeout(f"{node} exceeded its deadline") from exc
+            yield chunk
+    finally:
+        await close(iterator)
+
+
+__all__ = [
+    "RequestPolicy",
+    "RequestTimeout",
+    "hedge_delay",
+    "hedged_call",
+    "hedged_stream",
+    "policy_for",
+]
@@ -0,0 +1,90 @@
+"""Per-host concurrency limits, politeness delays and URL helpers for HTTP."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+
+def host_of(url: str) -> str:
+    """Return the lower-cased host name of ``url``."""
+
+    return (urlparse(url).hostname or "").lower()
+
+
+def canonical_url(url: str) -> str:
+    """Return a canonical form of ``url`` for deduplication.
+
+    The canonical form strips scheme, query, and fragment components,
+    lower-cases the hostname and path, and removes any leading ``www``.
+    """
+
+    parsed = urlparse(url)
+    netloc = parsed.netloc.lower()
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    path = parsed.path.lower().rstrip("/")
+    return f"{netloc}{path}"
+
+
+# Ports implied by the scheme, dropped from source keys.
+_DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+def source_key(url: str) -> str:
+    """Return a lossless key identifying the resource at ``url``.
+
+    Unlike :func:`canonical_url` the scheme, path case and query are kept,
+    so distinct pages such as ``watch?v=A`` and ``watch?v=B`` get distinct
+    keys. Only spellings of the same URL are merged: scheme and host are
+    lower-cased, a default port and the fragment are dropped, an empty path
+    becomes ``/`` and query parameters are sorted.
+    """
+
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    default_port = _DEFAULT_PORTS.get(scheme)
+    if default_port is not None:
+        netloc = netloc.removesuffix(f":{default_port}")
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    key = f"{scheme}://{netloc}{parsed.path or '/'}"
+    if parsed.params:
+        key = f"{key};{parsed.params}"
+    return f"{key}?{query}" if query else key
+
+
+class HostThrottle:
+    """Bound concurrent requests per host and space them out.
+
+    Args:
+        per_host: Maximum number of in-flight requests to a single host.
+        delay: Minimum number of seconds between request starts on one host.
+    """
+
+    def __init__(self, per_host: int = 2, delay: float = 0.0) -> None:
+        self._per_host = per_host
+        self._delay = delay
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Hold a request slot for the host of ``url``."""
+
+        host = host_of(url)
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self._per_host))
+        async with semaphore:
+            if self._delay:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self._delay
+                if start > now:
+                    await asyncio.sleep(start - now)
+            yield
+
+
+__all__ = ["HostThrottle", "canonical_url", "host_of", "source_key"]
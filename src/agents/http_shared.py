@@ -0,0 +1,76 @@
+"""Building blocks shared by the cached HTTP helpers.
+
+:class:`~agents.url_verifier.UrlVerifier`,
+:class:`~agents.page_fetcher.PageFetcher` and
+:class:`~agents.licence_resolver.LicenceResolver` each hold at most one
+pooled HTTP client and collapse concurrent lookups of the same URL into a
+single request. Process-wide instances are created with
+``functools.lru_cache(maxsize=1)`` like the other shared services.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Optional, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+
+class PooledClient:
+    """Own a lazily created, pooled :class:`httpx.AsyncClient`.
+
+    Args:
+        timeout: Per-request timeout in seconds for the created client.
+        client: Optional pre-configured HTTP client used instead.
+    """
+
+    def __init__(
+        self, timeout: float, client: Optional[httpx.AsyncClient] = None
+    ) -> None:
+        self._timeout = timeout
+        self._client = client
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self._timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client."""
+
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class Inflight(Generic[T]):
+    """Share one running lookup between concurrent callers of the same key."""
+
+    def __init__(self) -> None:
+        self._tasks: Dict[str, asyncio.Future[T]] = {}
+
+    async def run(self, key: str, start: Callable[[], Awaitable[T]]) -> T:
+        """Return the result of ``start()``, joining a lookup already running.
+
+        Callers joining an existing lookup are shielded, so cancelling one of
+        them does not abort the request the others are waiting on.
+        """
+
+        pending = self._tasks.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        task = asyncio.ensure_future(start())
+        self._tasks[key] = task
+        try:
+            return await task
+        finally:
+            self._tasks.pop(key, None)
+
+
+__all__ = ["Inflight", "PooledClient"]
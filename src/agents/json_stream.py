@@ -0,0 +1,153 @@
+"""Incremental scanning of a JSON object streamed token by token.
+
+:class:`JsonItemStream` consumes LLM output as it arrives and returns each
+element of selected top-level arrays (for example ``slides``) as soon as its
+closing bracket or quote is seen, long before the surrounding document is complete.
+Only structural characters are inspected; the text between them is skipped
+with a single regex search, so feeding the stream costs roughly one pass over
+the output.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Iterable, List, Optional, Tuple
+
+# Structural characters outside strings, and the characters ending a string run.
+_STRUCTURAL = re.compile(r'[{}\[\]",:]')
+_STRING_END = re.compile(r'["\\]')
+
+
+class OffSchemaError(ValueError):
+    """Raised when streamed output can no longer match the expected object."""
+
+
+class JsonItemStream:
+    """Emit completed elements of top-level arrays from a streamed object.
+
+    Leading text before the opening ``{`` (such as a markdown fence) is
+    tolerated up to ``max_preamble`` characters. Anything after the root
+    object closes is ignored.
+
+    Args:
+        keys: Top-level keys whose array elements should be emitted.
+        max_preamble: Characters allowed before the root object starts.
+    """
+
+    def __init__(self, keys: Iterable[str], *, max_preamble: int = 2000) -> None:
+        self._keys = frozenset(keys)
+        self._max_preamble = max_preamble
+        self._buf = ""
+        self._pos = 0
+        self._root_start: Optional[int] = None
+        self._done = False
+        self._in_string = False
+        self._string_start = 0
+        # Each frame is [bracket, expecting_key, current_key].
+        self._stack: List[List[Any]] = []
+        self._item_start: Optional[int] = None
+
+    @property
+    def done(self) -> bool:
+        """``True`` once the root object has been closed."""
+
+        return self._done
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume ``chunk`` and return ``(key, value)`` for completed items.
+
+        Raises:
+            OffSchemaError: If the output is not a JSON object or is
+                structurally malformed.
+        """
+
+        if self._done:
+            return []
+        self._buf += chunk
+        if self._root_start is None and not self._find_root():
+            return []
+        items: List[Tuple[str, Any]] = []
+        buf = self._buf
+        while not self._done:
+            if self._in_string:
+                match = _STRING_END.search(buf, self._pos)
+                if match is None:
+                    self._pos = len(buf)
+                    break
+                if match.group() == "\\":
+                    if match.end() >= len(buf):
+                        self._pos = match.start()
+                        break
+                    self._pos = match.end() + 1
+                    continue
+                self._in_string = False
+                self._pos = match.end()
+                item = self._close_string(buf[self._string_start : match.end()])
+                if item is not None:
+                    items.append(item)
+                continue
+            match = _STRUCTURAL.search(buf, self._pos)
+            if match is None:
+                self._pos = len(buf)
+                break
+            self._pos = match.end()
+            item = self._structural(match.group(), match.start())
+            if item is not None:
+                items.append(item)
+        return items
+
+    def _find_root(self) -> bool:
+        start = self._buf.find("{")
+        preamble = (self._buf if start == -1 else self._buf[:start]).strip()
+        if len(preamble) > self._max_preamble or preamble.startswith(("[", '"')):
+            raise OffSchemaError("output does not start with a JSON object")
+        if start == -1:
+            return False
+        self._root_start = start
+        self._pos = start
+        return True
+
+    def _close_string(self, literal: str) -> Optional[Tuple[str, Any]]:
+        stack = self._stack
+        frame = stack[-1]
+        if frame[0] == "{" and frame[1]:
+            frame[2] = json.loads(literal)
+            frame[1] = False
+        elif len(stack) == 2 and frame[0] == "[" and stack[0][2] in self._keys:
+            # String elements of a selected array are complete once closed.
+            return stack[0][2], json.loads(literal)
+        return None
+
+    def _structural(self, char: str, index: int) -> Optional[Tuple[str, Any]]:
+        stack = self._stack
+        if char == '"':
+            self._in_string = True
+            self._string_start = index
+            return None
+        if char in "{[":
+            if len(stack) == 2 and stack[0][2] in self._keys and stack[1][0] == "[":
+                self._item_start = index
+            stack.append([char, char == "{", None])
+            return None
+        if char in "}]":
+            if not stack or stack[-1][0] != ("{" if char == "}" else "["):
+                raise OffSchemaError(f"unexpected {char!r} at offset {index}")
+            stack.pop()
+            if not stack:
+                self._done = True
+                return None
+            if len(stack) == 2 and self._item_start is not None:
+                start, self._item_start = self._item_start, None
+                try:
+                    value = json.loads(self._buf[start : index + 1])
+                except json.JSONDecodeError as exc:
+                    raise OffSchemaError(str(exc)) from exc
+                return stack[0][2], value
+            return None
+        if char == "," and stack and stack[-1][0] == "{":
+            stack[-1][1] = True
+        return None
+
+
+__all__ = ["JsonItemStream", "OffSchemaError"]
@@ -0,0 +1,176 @@
+"""Cached, rate-limited licence resolution for citation URLs.
+
+Licences are resolved in three steps:
+
+1. Domain rules: hosts with a known site-wide licence (e.g. Wikipedia) are
+   answered without any network access.
+2. Cache: results persisted per URL in a small SQLite file under
+   ``Settings.data_dir``. Failed or empty lookups are cached for a shorter
+   period so broken hosts are not hammered on every run.
+3. Network: the ``License`` header from the shared
+   :class:`~agents.url_verifier.UrlVerifier`, which also serves the fact
+   checker so each URL is requested only once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import aiosqlite
+
+from config import Settings
+
+from .host_limits import host_of
+from .http_shared import Inflight
+from .url_verifier import UrlVerifier, get_url_verifier
+
+# Hosts (matched by suffix) whose content is published under a single licence.
+DOMAIN_LICENCES: Dict[str, str] = {
+    "wikipedia.org": "CC BY-SA 4.0",
+    "wikibooks.org": "CC BY-SA 4.0",
+    "wikiversity.org": "CC BY-SA 4.0",
+    "wikimedia.org": "CC BY-SA 4.0",
+    "openstax.org": "CC BY 4.0",
+    "creativecommons.org": "CC BY 4.0",
+}
+
+_DAY = 24 * 60 * 60
+
+
+def infer_licence(url: str) -> Optional[str]:
+    """Return the licence implied by the host of ``url``, if any."""
+
+    host = host_of(url)
+    for domain, licence in DOMAIN_LICENCES.items():
+        if host == domain or host.endswith("." + domain):
+            return licence
+    return None
+
+
+class LicenceResolver:
+    """Resolve licences for URLs from domain rules, a cache or the network.
+
+    Args:
+        cache_path: SQLite file used to persist results.
+        verifier: URL verifier used for network lookups. Defaults to the
+            process-wide instance.
+        ttl: Seconds a resolved licence stays valid.
+        negative_ttl: Seconds a failed or empty lookup is remembered.
+    """
+
+    def __init__(
+        self,
+        cache_path: Path,
+        *,
+        verifier: Optional[UrlVerifier] = None,
+        ttl: float = 30 * _DAY,
+        negative_ttl: float = _DAY,
+    ) -> None:
+        self._path = cache_path
+        self._verifier = verifier
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._memory: Optional[Dict[Tuple[str, str], Tuple[str, float]]] = None
+        self._load_lock = asyncio.Lock()
+        self._inflight: Inflight[str] = Inflight()
+
+    async def _entries(self) -> Dict[Tuple[str, str], Tuple[str, float]]:
+        """Return the in-memory view of the cache, loading it once."""
+
+        if self._memory is not None:
+            return self._memory
+        async with self._load_lock:
+            if self._memory is None:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                async with aiosqlite.connect(self._path) as db:
+                    await db.execute(
+                        """
+                        CREATE TABLE IF NOT EXISTS licence_cache (
+                            scope TEXT NOT NULL,
+                            key TEXT NOT NULL,
+                            licence TEXT NOT NULL,
+                            expires_at REAL NOT NULL,
+                            PRIMARY KEY (scope, key)
+                        )
+                        """
+                    )
+                    # Earlier versions also cached header hits per domain.
+                    await db.execute(
+                        "DELETE FROM licence_cache"
+                        " WHERE expires_at < ? OR scope != 'url'",
+                        (time.time(),),
+                    )
+                    await db.commit()
+                    cur = await db.execute(
+                        "SELECT scope, key, licence, expires_at FROM licence_cache"
+                    )
+                    rows = await cur.fetchall()
+                    await cur.close()
+                self._memory = {(r[0], r[1]): (r[2], r[3]) for r in rows}
+        return self._memory
+
+    async def _store(self, entries: Iterable[Tuple[str, str, str, float]]) -> None:
+        rows = list(entries)
+        memory = await self._entries()
+        for scope, key, licence, expires_at in rows:
+            memory[(scope, key)] = (licence, expires_at)
+        async with aiosqlite.connect(self._path) as db:
+            await db.executemany(
+                "INSERT OR REPLACE INTO licence_cache VALUES (?, ?, ?, ?)", rows
+            )
+            await db.commit()
+
+    async def cached(self, url: str) -> Optional[str]:
+        """Return a non-expired licence for ``url`` without network access.
+
+        ``""`` means a previous lookup failed or found no licence.
+        """
+
+        inferred = infer_licence(url)
+        if inferred is not None:
+            return inferred
+        hit = (await self._entries()).get(("url", url))
+        if hit is not None and hit[1] >= time.time():
+            return hit[0]
+        return None
+
+    async def _fetch(self, url: str) -> str:
+        verifier = self._verifier or get_url_verifier()
+        licence = (await verifier.check(url)).licence or ""
+        # A ``License`` header describes one response, not the whole site;
+        # site-wide licences belong in :data:`DOMAIN_LICENCES`.
+        ttl = self._ttl if licence else self._negative_ttl
+        await self._store([("url", url, licence, time.time() + ttl)])
+        return licence
+
+    async def resolve(self, url: str) -> str:
+        """Return the licence for ``url`` or ``""`` when none is known."""
+
+        cached = await self.cached(url)
+        if cached is not None:
+            return cached
+        return await self._inflight.run(url, lambda: self._fetch(url))
+
+    async def resolve_many(self, urls: Iterable[str]) -> List[str]:
+        """Resolve ``urls`` concurrently, preserving order."""
+
+        return list(await asyncio.gather(*(self.resolve(url) for url in urls)))
+
+
+@lru_cache(maxsize=1)
+def get_licence_resolver() -> LicenceResolver:
+    """Return the process-wide :class:`LicenceResolver`."""
+
+    return LicenceResolver(Settings().data_dir / "licences.db")
+
+
+__all__ = [
+    "DOMAIN_LICENCES",
+    "LicenceResolver",
+    "get_licence_resolver",
+    "infer_licence",
+]
@@ -0,0 +1,145 @@
+"""Per-node model selection with fallback to the primary model.
+
+``Settings.node_models`` maps pipeline node names to ``<provider>:<model>``
+identifiers so short, structured calls such as planning and Bloom
+classification can run on a small fast model while weaving keeps the
+configured ``Settings.model``. Routing is opt-in: nodes without an entry use
+``Settings.model``. When a routed model's output fails structured parsing the
+call is repeated on the primary model. Every call records its routing
+decision, latency and estimated cost through the shared
+:class:`~metrics.collector.MetricsCollector`.
+"""
+
+from __future__ import annotations
+
+from time import perf_counter
+from typing import Awaitable, Callable, Dict, List, Tuple, TypeVar
+
+from pydantic import ValidationError
+from pydantic_ai.exceptions import UnexpectedModelBehavior
+
+import config
+from metrics.collector import get_metrics_collector
+
+from .prompt_context import count_tokens
+
+T = TypeVar("T")
+
+# USD per million (input, output) tokens, used for cost estimates.
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "o3": (2.00, 8.00),
+    "o4-mini": (1.10, 4.40),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+
+class StructuredOutputError(ValueError):
+    """Raised by callers when a model's output does not parse as expected."""
+
+
+FALLBACK_ERRORS = (ValidationError, UnexpectedModelBehavior, StructuredOutputError)
+
+
+def model_for(node: str) -> str:
+    """Return the ``<provider>:<model>`` identifier routed to ``node``."""
+
+    settings = config.load_settings()
+    return settings.node_models.get(node, settings.model)
+
+
+def models_for(node: str) -> List[str]:
+    """Return the routed model for ``node`` followed by its fallback, if any."""
+
+    primary = config.load_settings().model
+    routed = model_for(node)
+    return [routed] if routed == primary else [routed, primary]
+
+
+def split_model(model_id: str) -> Tuple[str, str]:
+    """Split ``model_id`` into ``(provider, model_name)``."""
+
+    provider, _, name = model_id.partition(":")
+    return provider, name
+
+
+def record_model_call(
+    workspace_id: str,
+    node: str,
+    model_id: str,
+    seconds: float,
+    *,
+    input_tokens: int = 0,
+    output_tokens: int = 0,
+) -> None:
+    """Record latency and estimated cost of one call to ``model_id``."""
+
+    _, name = split_model(model_id)
+    collector = get_metrics_collector()
+    collector.record(workspace_id, f"{node}.route.{name}", 1)
+    collector.record(workspace_id, f"model.{name}.latency_ms", seconds * 1000)
+    prices = MODEL_PRICES.get(name)
+    if prices is not None:
+        cost = (input_tokens * prices[0] + output_tokens * prices[1]) / 1_000_000
+        collector.record(workspace_id, f"model.{name}.cost_usd", cost)
+
+
+async def run_routed(
+    node: str,
+    call: Callable[[str], Awaitable[T]],
+    *,
+    workspace_id: str = "default",
+    prompt: str = "",
+    output_text: Callable[[T], str] = str,
+) -> T:
+    """Run ``call`` with the model routed to ``node``, falling back on errors.
+
+    Args:
+        node: Pipeline node name used for routing and metrics.
+        call: Coroutine function invoked with a ``<provider>:<model>`` id.
+        workspace_id: Workspace the metrics are recorded against.
+        prompt: Prompt text used to estimate input tokens.
+        output_text: Extracts the generated text from a result for the
+            output token estimate.
+
+    Raises:
+        Exception: The last model's error if every model fails to produce
+            parseable output.
+    """
+
+    models = models_for(node)
+    for index, model_id in enumerate(models):
+        _, name = split_model(model_id)
+        started = perf_counter()
+        try:
+            result = await call(model_id)
+        except FALLBACK_ERRORS:
+            if index == len(models) - 1:
+                raise
+            get_metrics_collector().record(workspace_id, f"{node}.fallback", 1)
+            continue
+        record_model_call(
+            workspace_id,
+            node,
+            model_id,
+            perf_counter() - started,
+            input_tokens=count_tokens(prompt, name) if prompt else 0,
+            output_tokens=count_tokens(output_text(result), name),
+        )
+        return result
+    raise AssertionError("unreachable")  # pragma: no cover
+
+
+__all__ = [
+    "FALLBACK_ERRORS",
+    "MODEL_PRICES",
+    "StructuredOutputError",
+    "model_for",
+    "models_for",
+    "record_model_call",
+    "run_routed",
+    "split_model",
+]
@@ -1,14 +1,77 @@
-"""Offline search result caching utilities."""
+"""Offline search corpus backed by a single SQLite file.
+
+Every result returned by the live search provider is stored once per URL in
+``<data_dir>/cache/corpus.db`` and linked to the queries that produced it.
+Titles and snippets are indexed with FTS5, so offline runs can answer
+arbitrary queries with BM25-ranked matches from everything cached so far
+instead of only exact query repeats. The corpus can be exported to and
+imported from JSON Lines (one ``{"query", "results"}`` record per line);
+imports also accept a directory of legacy one-file-per-query JSON caches.
+Legacy ``<data_dir>/cache/*.json`` files are imported into the default
+corpus automatically the first time it is opened.
+
+The functions here use blocking :mod:`sqlite3`; async callers run them with
+:func:`asyncio.to_thread`.
+"""
 
 from __future__ import annotations
 
 import json
+import logging
 import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
 from pathlib import Path
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Set
 
 from config import Settings
 
+if TYPE_CHECKING:  # pragma: no cover - imported for type hints only
+    from .researcher_web import RawSearchResult
+
+_TERM = re.compile(r"\w+")
+
+# ``PRAGMA user_version`` once legacy JSON caches have been imported.
+_LEGACY_IMPORTED = 1
+
+# Corpus files whose schema has been created by this process.
+_READY: Set[Path] = set()
+_READY_LOCK = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    snippet TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS queries (
+    query TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS query_results (
+    query TEXT NOT NULL REFERENCES queries(query) ON DELETE CASCADE,
+    result_id INTEGER NOT NULL REFERENCES results(id),
+    rank INTEGER NOT NULL,
+    PRIMARY KEY (query, result_id)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS results_fts USING fts5(
+    title, snippet, content='results', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS results_ai AFTER INSERT ON results BEGIN
+    INSERT INTO results_fts(rowid, title, snippet)
+    VALUES (new.id, new.title, new.snippet);
+END;
+CREATE TRIGGER IF NOT EXISTS results_au AFTER UPDATE ON results BEGIN
+    INSERT INTO results_fts(results_fts, rowid, title, snippet)
+    VALUES ('delete', old.id, old.title, old.snippet);
+    INSERT INTO results_fts(rowid, title, snippet)
+    VALUES (new.id, new.title, new.snippet);
+END;
+"""
+
 
 def _cache_dir() -> Path:
     """Return the directory used for storing cached results."""
@@ -16,31 +79,233 @@ def _cache_dir() -> Path:
     return Settings().data_dir / "cache"
 
 
-if TYPE_CHECKING:  # pragma: no cover - imported for type hints only
-    from .researcher_web import RawSearchResult
+def corpus_path() -> Path:
+    """Return the SQLite file holding the offline corpus."""
+
+    return _cache_dir() / "corpus.db"
+
+
+def _legacy_records(directory: Path) -> Iterator[dict]:
+    """Yield ``{"query", "results"}`` records from legacy ``*.json`` caches.
+
+    File names hold a sanitised form of the query, so a query stored in the
+    payload itself is preferred; the file stem is used otherwise.
+    """
+
+    for file in sorted(directory.glob("*.json")):
+        try:
+            payload = json.loads(file.read_text())
+        except (OSError, ValueError) as exc:
+            logging.warning("Skipping unreadable cache file %s: %s", file, exc)
+            continue
+        if isinstance(payload, dict) and "query" in payload:
+            yield payload
+        else:
+            yield {"query": file.stem, "results": payload}
+
+
+def _store_records(conn: sqlite3.Connection, records: Iterable[dict]) -> int:
+    """Store each ``{"query", "results"}`` record and return how many were.
+
+    Malformed records are logged and skipped; the rows written for a record
+    before it failed are rolled back so no partial query is left behind.
+    """
+
+    count = 0
+    for record in records:
+        conn.execute("SAVEPOINT record")
+        try:
+            _store(conn, record["query"], record["results"])
+        except (KeyError, TypeError) as exc:
+            conn.execute("ROLLBACK TO record")
+            logging.warning("Skipping malformed cache record: %r", exc)
+        else:
+            count += 1
+        conn.execute("RELEASE record")
+    return count
+
+
+def _initialise(path: Path, legacy_dir: Optional[Path]) -> None:
+    """Create the corpus schema at ``path``.
+
+    Legacy JSON caches in ``legacy_dir`` are imported once per corpus file,
+    tracked with ``PRAGMA user_version``.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        (version,) = conn.execute("PRAGMA user_version").fetchone()
+        if legacy_dir is None or version >= _LEGACY_IMPORTED:
+            return
+        with conn:
+            count = _store_records(conn, _legacy_records(legacy_dir))
+            conn.execute(f"PRAGMA user_version = {_LEGACY_IMPORTED}")
+        if count:
+            logging.info("Imported %d legacy cache files into %s", count, path)
+
 
+def _connect(path: Optional[Path] = None) -> sqlite3.Connection:
+    """Open the corpus at ``path``, creating its schema on first use."""
 
-def _cache_file(query: str) -> Path:
-    """Return filesystem path for ``query``'s cached results."""
-    sanitized = re.sub(r"[^A-Za-z0-9_-]", "_", query)
-    return _cache_dir() / f"{sanitized}.json"
+    legacy_dir = None
+    if path is None:
+        path = corpus_path()
+        legacy_dir = path.parent
+    with _READY_LOCK:
+        if path not in _READY:
+            _initialise(path, legacy_dir)
+            _READY.add(path)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
 
 
-def load_cached_results(query: str) -> Optional[List["RawSearchResult"]]:
-    """Load cached search results for ``query`` if available."""
+def _to_results(rows: Iterable[tuple]) -> List["RawSearchResult"]:
     from .researcher_web import RawSearchResult
 
-    path = _cache_file(query)
-    if not path.exists():
+    return [
+        RawSearchResult(url=url, title=title, snippet=snippet)
+        for url, title, snippet in rows
+    ]
+
+
+def _store(conn: sqlite3.Connection, query: str, results: Iterable[dict]) -> int:
+    """Replace the results linked to ``query`` and return how many were stored."""
+
+    conn.execute(
+        "INSERT INTO queries (query, fetched_at) VALUES (?, ?)"
+        " ON CONFLICT(query) DO UPDATE SET fetched_at = excluded.fetched_at",
+        (query, time.time()),
+    )
+    conn.execute("DELETE FROM query_results WHERE query = ?", (query,))
+    count = 0
+    for rank, item in enumerate(results):
+        url, title, snippet = item["url"], item["title"], item["snippet"]
+        conn.execute(
+            "INSERT INTO results (url, title, snippet) VALUES (?, ?, ?)"
+            " ON CONFLICT(url) DO UPDATE SET title = excluded.title,"
+            " snippet = excluded.snippet"
+            " WHERE title != excluded.title OR snippet != excluded.snippet",
+            (url, title, snippet),
+        )
+        (result_id,) = conn.execute(
+            "SELECT id FROM results WHERE url = ?", (url,)
+        ).fetchone()
+        conn.execute(
+            "INSERT OR IGNORE INTO query_results (query, result_id, rank)"
+            " VALUES (?, ?, ?)",
+            (query, result_id, rank),
+        )
+        count += 1
+    return count
+
+
+def load_cached_results(
+    query: str, *, path: Optional[Path] = None
+) -> Optional[List["RawSearchResult"]]:
+    """Load the results cached for exactly ``query`` if available."""
+
+    with closing(_connect(path)) as conn:
+        if not conn.execute(
+            "SELECT 1 FROM queries WHERE query = ?", (query,)
+        ).fetchone():
+            return None
+        rows = conn.execute(
+            "SELECT r.url, r.title, r.snippet FROM query_results q"
+            " JOIN results r ON r.id = q.result_id"
+            " WHERE q.query = ? ORDER BY q.rank",
+            (query,),
+        ).fetchall()
+    return _to_results(rows)
+
+
+def save_cached_results(
+    query: str, results: List["RawSearchResult"], *, path: Optional[Path] = None
+) -> None:
+    """Persist ``results`` for ``query`` to the offline corpus."""
+
+    with closing(_connect(path)) as conn, conn:
+        _store(conn, query, (result.model_dump() for result in results))
+
+
+def _match_expression(query: str) -> Optional[str]:
+    """Return an FTS5 expression matching any term of ``query``."""
+
+    terms = dict.fromkeys(term.lower() for term in _TERM.findall(query))
+    if not terms:
         return None
-    data = json.loads(path.read_text())
-    return [RawSearchResult.model_validate(item) for item in data]
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+def search_cached_results(
+    query: str, *, limit: int = 10, path: Optional[Path] = None
+) -> List["RawSearchResult"]:
+    """Return up to ``limit`` cached results best matching ``query``.
+
+    Results from every cached query are ranked by BM25 over their titles and
+    snippets, with title matches weighted double.
+    """
+
+    expression = _match_expression(query)
+    if expression is None:
+        return []
+    with closing(_connect(path)) as conn:
+        rows = conn.execute(
+            "SELECT r.url, r.title, r.snippet FROM results_fts"
+            " JOIN results r ON r.id = results_fts.rowid"
+            " WHERE results_fts MATCH ?"
+            " ORDER BY bm25(results_fts, 2.0, 1.0) LIMIT ?",
+            (expression, limit),
+        ).fetchall()
+    return _to_results(rows)
+
+
+def import_corpus(source: Path, *, path: Optional[Path] = None) -> int:
+    """Load cached queries from ``source`` and return how many were imported.
+
+    ``source`` is either a JSON Lines export written by :func:`export_corpus`
+    or a directory of legacy ``<query>.json`` files, whose file stem is used
+    as the query unless the file records it. Malformed records are skipped.
+    """
+
+    if source.is_dir():
+        records: Iterable[dict] = _legacy_records(source)
+    else:
+        records = (json.loads(line) for line in source.read_text().splitlines() if line)
+    with closing(_connect(path)) as conn, conn:
+        return _store_records(conn, records)
+
+
+def export_corpus(dest: Path, *, path: Optional[Path] = None) -> int:
+    """Write every cached query to ``dest`` as JSON Lines.
+
+    Returns:
+        Number of queries written.
+    """
+
+    count = 0
+    with closing(_connect(path)) as conn, dest.open("w") as fh:
+        queries = conn.execute("SELECT query FROM queries ORDER BY query").fetchall()
+        for (query,) in queries:
+            rows = conn.execute(
+                "SELECT r.url, r.title, r.snippet FROM query_results q"
+                " JOIN results r ON r.id = q.result_id"
+                " WHERE q.query = ? ORDER BY q.rank",
+                (query,),
+            ).fetchall()
+            results = [{"url": u, "title": t, "snippet": s} for u, t, s in rows]
+            fh.write(json.dumps({"query": query, "results": results}) + "\n")
+            count += 1
+    return count
 
 
-def save_cached_results(query: str, results: List["RawSearchResult"]) -> None:
-    """Persist ``results`` for ``query`` to the cache directory."""
-    cache_dir = _cache_dir()
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    path = cache_dir / _cache_file(query).name
-    data = [result.model_dump() for result in results]
-    path.write_text(json.dumps(data))
+__all__ = [
+    "corpus_path",
+    "export_corpus",
+    "import_corpus",
+    "load_cached_results",
+    "save_cached_results",
+    "search_cached_results",
+]
@@ -0,0 +1,236 @@
+"""Shared asynchronous fetching of full remote pages.
+
+Grounding needs the body of every citation page, which makes it the most
+I/O-heavy step of a run. :class:`PageFetcher` keeps one pooled HTTP client,
+bounds requests per host with :class:`~agents.host_limits.HostThrottle`,
+stops reading a body once it exceeds a byte cap and decodes it using the
+declared or sniffed charset. Pages are persisted to a SQLite file together
+with their ``ETag`` / ``Last-Modified`` validators so later runs revalidate
+with a conditional ``GET`` and reuse the stored body on ``304``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import re
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+import aiosqlite
+import httpx
+
+from config import Settings
+
+from .host_limits import HostThrottle
+from .http_shared import Inflight, PooledClient
+
+_HOUR = 60 * 60
+
+# ``<meta charset=...>`` or ``<meta http-equiv=... content="...; charset=...">``.
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w.:-]+)""", re.I)
+
+
+@dataclass(slots=True)
+class FetchedPage:
+    """Decoded body of a fetched page.
+
+    Attributes:
+        url: The URL that was requested.
+        content: Decoded text, cut off after the fetcher's byte cap.
+        etag: ``ETag`` validator sent by the server, if any.
+        last_modified: ``Last-Modified`` validator sent by the server, if any.
+        truncated: Whether the body was longer than the byte cap.
+        fetched_at: Unix time the page was last fetched or revalidated.
+    """
+
+    url: str
+    content: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    truncated: bool
+    fetched_at: float
+
+
+def detect_charset(body: bytes, declared: Optional[str] = None) -> str:
+    """Return the encoding to decode ``body`` with.
+
+    The charset from the ``Content-Type`` header wins, then a ``<meta>``
+    declaration in the first kilobytes of the document, then UTF-8.
+    """
+
+    candidates = [declared]
+    match = _META_CHARSET.search(body[:4096])
+    if match is not None:
+        candidates.append(match.group(1).decode("ascii", "ignore"))
+    for name in candidates:
+        if not name:
+            continue
+        try:
+            return codecs.lookup(name).name
+        except LookupError:
+            continue
+    return "utf-8"
+
+
+class PageFetcher(PooledClient):
+    """Fetch pages with caching, revalidation and bounded concurrency.
+
+    Args:
+        cache_path: SQLite file used to persist fetched pages.
+        ttl: Seconds a stored page is reused without any request.
+        max_bytes: Bytes read from a response body before it is cut off.
+        max_concurrency: Maximum requests in flight across all hosts.
+        per_host: Maximum requests in flight per host.
+        delay: Minimum spacing in seconds between requests to one host.
+        timeout: Per-request timeout in seconds.
+        client: Optional pre-configured HTTP client.
+    """
+
+    def __init__(
+        self,
+        cache_path: Path,
+        *,
+        ttl: float = _HOUR,
+        max_bytes: int = 2_000_000,
+        max_concurrency: int = 16,
+        per_host: int = 2,
+        delay: float = 0.25,
+        timeout: float = 10.0,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        super().__init__(timeout, client)
+        self._path = cache_path
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._limit = asyncio.Semaphore(max_concurrency)
+        self._throttle = HostThrottle(per_host=per_host, delay=delay)
+        self._ready = False
+        self._inflight: Inflight[FetchedPage] = Inflight()
+
+    async def _prepare(self, db: aiosqlite.Connection) -> None:
+        """Create the ``pages`` table on first use."""
+
+        if self._ready:
+            return
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                truncated INTEGER NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        await db.commit()
+        self._ready = True
+
+    async def cached(self, url: str) -> Optional[FetchedPage]:
+        """Return the stored page for ``url`` regardless of its age."""
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        async with aiosqlite.connect(self._path) as db:
+            await self._prepare(db)
+            cur = await db.execute(
+                "SELECT url, content, etag, last_modified, truncated, fetched_at"
+                " FROM pages WHERE url = ?",
+                (url,),
+            )
+            row = await cur.fetchone()
+            await cur.close()
+        if row is None:
+            return None
+        return FetchedPage(row[0], row[1], row[2], row[3], bool(row[4]), row[5])
+
+    async def _store(self, page: FetchedPage) -> None:
+        async with aiosqlite.connect(self._path) as db:
+            await self._prepare(db)
+            await db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    page.url,
+                    page.content,
+                    page.etag,
+                    page.last_modified,
+                    int(page.truncated),
+                    page.fetched_at,
+                ),
+            )
+            await db.commit()
+
+    async def _read(self, response: httpx.Response) -> tuple[bytes, bool]:
+        """Read at most ``max_bytes`` of ``response`` and report truncation."""
+
+        chunks: list[bytes] = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > self._max_bytes:
+                return b"".join(chunks)[: self._max_bytes], True
+        return b"".join(chunks), False
+
+    async def _request(self, url: str, previous: Optional[FetchedPage]) -> FetchedPage:
+        headers: Dict[str, str] = {}
+        if previous is not None:
+            if previous.etag:
+                headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                headers["If-Modified-Since"] = previous.last_modified
+        async with self._limit, self._throttle.slot(url):
+            async with self._http().stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and previous is not None:
+                    page = FetchedPage(
+                        url,
+                        previous.content,
+                        response.headers.get("ETag", previous.etag),
+                        previous.last_modified,
+                        previous.truncated,
+                        time.time(),
+                    )
+                else:
+                    response.raise_for_status()
+                    body, truncated = await self._read(response)
+                    encoding = detect_charset(body, response.charset_encoding)
+                    page = FetchedPage(
+                        url,
+                        body.decode(encoding, errors="replace"),
+                        response.headers.get("ETag"),
+                        response.headers.get("Last-Modified"),
+                        truncated,
+                        time.time(),
+                    )
+        await self._store(page)
+        return page
+
+    async def fetch(self, url: str) -> FetchedPage:
+        """Return the page at ``url``.
+
+        Pages fetched within the TTL are served from disk; older ones are
+        revalidated. Concurrent callers asking for the same URL share one
+        request.
+
+        Raises:
+            httpx.HTTPError: If the request fails or returns an error status.
+        """
+
+        previous = await self.cached(url)
+        if previous is not None and previous.fetched_at + self._ttl >= time.time():
+            return previous
+        return await self._inflight.run(url, lambda: self._request(url, previous))
+
+
+@lru_cache(maxsize=1)
+def get_page_fetcher() -> PageFetcher:
+    """Return the process-wide :class:`PageFetcher`."""
+
+    return PageFetcher(Settings().data_dir / "page_cache.db")
+
+
+__all__ = ["FetchedPage", "PageFetcher", "detect_charset", "get_page_fetcher"]
@@ -13,8 +13,10 @@ from typing import Awaitable, Callable, Dict, List
 
 from pydantic import BaseModel, ValidationError
 
-import config
+from agents.model_routing import StructuredOutputError, run_routed, split_model
 from agents.models import Activity
+from agents.prompt_context import count_tokens
+from agents.rate_limits import get_limiter
 from core.state import State
 from models import (
     ActivityDiversityReport,
@@ -76,33 +78,46 @@ def _keyword_classify(text: str) -> str:
     return "unknown"
 
 
-async def classify_bloom_level(text: str) -> str:
+async def classify_bloom_level(text: str, workspace_id: str = "default") -> str:
     """Use an LLM to infer the Bloom level for ``text``.
 
-    Falls back to simple keyword matching if the LLM is unavailable or
-    produces an unexpected result.
+    The model routed to the ``Pedagogy-Critic`` node is tried first and the
+    primary model is used when its answer does not parse. Falls back to
+    simple keyword matching if the LLM is unavailable or produces an
+    unexpected result.
     """
 
     instructions = get_prompt("pedagogy_critic_classify")
     try:  # pragma: no cover - network dependency
         from pydantic_ai import Agent
-        from pydantic_ai.models.openai import OpenAIModel
-        from pydantic_ai.providers.openai import OpenAIProvider
-
-        settings = config.load_settings()
-        provider = OpenAIProvider()
-        model = OpenAIModel(settings.model_name, provider=provider)
-        agent = Agent(
-            model=model,
-            output_type=BloomResult,  # return structured BloomResult from LLM
-            instructions=instructions,
-            retries=0,  # attempt the model call once to avoid retry loops
-        )
-        result = await agent.run(text)
-        level = result.output.level.strip().lower()
-        if level in BLOOM_LEVELS:
+
+        from agents.model_utils import init_model
+
+        async def call(model_id: str) -> str:
+            provider_name, model_name = split_model(model_id)
+            agent = Agent(
+                model=init_model(model=model_id),
+                output_type=BloomResult,  # return structured BloomResult from LLM
+                instructions=instructions,
+                retries=0,  # attempt the model call once to avoid retry loops
+            )
+            limiter = get_limiter(provider_name, model_name)
+            result = await limiter.call(
+                lambda: agent.run(text),
+                tokens=count_tokens(f"{instructions}\n{text}", model_name),
+            )
+            level = result.output.level.strip().lower()
+            if level not in BLOOM_LEVELS:
+                raise StructuredOutputError(f"unknown Bloom level {level!r}")
             return level
-    except ValidationError:
+
+        return await run_routed(
+            "Pedagogy-Critic",
+            call,
+            workspace_id=workspace_id,
+            prompt=f"{instructions}\n{text}",
+        )
+    except (ValidationError, StructuredOutputError):
         logging.warning("LLM response failed validation; falling back to keywords")
         return _keyword_classify(text)
     except Exception:
@@ -5,12 +5,25 @@ from __future__ import annotations
 import logging
 import re
 from dataclasses import dataclass
+from time import perf_counter
+from typing import AsyncIterator, List, Optional
 
 from pydantic import BaseModel, ValidationError
 
 from core.state import Outline, State
 from prompts import get_prompt
 
+from .hedging import RequestTimeout, hedged_call, hedged_stream
+from .json_stream import JsonItemStream, OffSchemaError
+from .model_routing import (
+    StructuredOutputError,
+    model_for,
+    record_model_call,
+    run_routed,
+    split_model,
+)
+from .prompt_context import count_tokens
+from .rate_limits import get_limiter
 from .streaming import stream_debug, stream_messages
 
 
@@ -34,29 +47,53 @@ class PlannerOutput(BaseModel):
     steps: list[str]
 
 
-async def call_planner_llm(topic: str) -> str:
+async def call_planner_llm(topic: str, workspace_id: str = "default") -> str:
     """Call an LLM to produce an outline for ``topic``.
 
-    Falls back to an empty string if the LLM client is unavailable.
+    The model routed to the ``Planner`` node is tried first; output that does
+    not parse into outline steps is regenerated with the primary model.
+    Falls back to an empty string if the LLM client is unavailable or no
+    model produces an outline.
+
+    Raises:
+        RequestTimeout: If the call misses the planner's deadline.
     """
 
     try:  # pragma: no cover - exercised via monkeypatch in tests
         from pydantic_ai import Agent
-
-        import config
     except Exception:  # dependency missing
         logging.exception("Planner dependencies unavailable")
         return ""
 
-    settings = config.load_settings()
-    provider_name = settings.model_provider
-    model_name = settings.model_name
-    agent = Agent(
-        f"{provider_name}:{model_name}",
-        system_prompt=get_prompt("planner_system"),
-    )
-    response = await agent.run(topic)
-    return response.output or ""
+    system_prompt = get_prompt("planner_system")
+
+    async def call(model_id: str) -> str:
+        provider_name, model_name = split_model(model_id)
+        agent = Agent(model_id, system_prompt=system_prompt)
+        limiter = get_limiter(provider_name, model_name)
+        tokens = count_tokens(f"{system_prompt}\n{topic}", model_name)
+        response = await hedged_call(
+            "Planner", lambda: limiter.call(lambda: agent.run(topic), tokens=tokens)
+        )
+        text = response.output or ""
+        if not parse_outline(text).steps:
+            raise StructuredOutputError("planner output contains no steps")
+        return text
+
+    try:
+        return await run_routed(
+            "Planner",
+            call,
+            workspace_id=workspace_id,
+            prompt=f"{system_prompt}\n{topic}",
+        )
+    except RequestTimeout:
+        logging.warning("Planner LLM call timed out")
+        stream_debug("planner call missed its deadline")
+        raise
+    except StructuredOutputError:
+        logging.warning("Planner output could not be parsed")
+    return ""
 
 
 _LINE_RE = re.compile(r"^\s*(?:[-*]|\d+\.)\s+(.*)")
@@ -73,6 +110,156 @@ def extract_outline(text: str) -> Outline:
     return Outline(steps=steps)
 
 
+class OutlineStream:
+    """Extract outline steps from planner output while it streams in.
+
+    Output starting with a JSON object is scanned with
+    :class:`~agents.json_stream.JsonItemStream` and each ``steps`` element is
+    returned once its closing quote arrives. Anything else is parsed like
+    :func:`extract_outline`, one completed bullet or numbered line at a time.
+    """
+
+    def __init__(self) -> None:
+        self._buf = ""
+        self._json: Optional[JsonItemStream] = None
+        self._lines = False
+
+    def feed(self, chunk: str) -> List[str]:
+        """Consume ``chunk`` and return the steps it completed.
+
+        Raises:
+            OffSchemaError: If JSON output becomes structurally malformed.
+        """
+
+        self._buf += chunk
+        if self._json is None and not self._lines and not self._detect():
+            return []
+        if self._json is not None:
+            chunk, self._buf = self._buf, ""
+            return [value.strip() for _, value in self._json.feed(chunk)]
+        *lines, self._buf = self._buf.split("\n")
+        return self._steps(lines)
+
+    def _detect(self) -> bool:
+        """Choose JSON or line parsing once the first content is visible."""
+
+        head = self._buf.lstrip()
+        if len(head) < 3 and "```".startswith(head):
+            return False
+        if head.startswith("```"):
+            # Skip a markdown fence line such as ```json.
+            newline = head.find("\n")
+            head = head[newline + 1 :].lstrip() if newline != -1 else ""
+            if not head:
+                return False
+        if head[0] == "{":
+            self._json = JsonItemStream(["steps"])
+        else:
+            self._lines = True
+        return True
+
+    def finish(self) -> List[str]:
+        """Return any step left on an unterminated final line."""
+
+        if self._json is not None:
+            return []
+        tail, self._buf = self._buf, ""
+        return self._steps([tail])
+
+    @staticmethod
+    def _steps(lines: List[str]) -> List[str]:
+        steps = []
+        for line in lines:
+            match = _LINE_RE.match(line)
+            if match:
+                steps.append(match.group(1).strip())
+        return steps
+
+
+async def stream_planner_steps(
+    topic: str, workspace_id: str = "default"
+) -> AsyncIterator[str]:
+    """Yield outline steps for ``topic`` as soon as the planner emits them.
+
+    The call streams from the model routed to the ``Planner`` node under its
+    deadline and hedging policy. Nothing is yielded if the dependencies are
+    missing; callers fall back to :func:`call_planner_llm` when no step was
+    produced.
+
+    Raises:
+        RequestTimeout: If the call misses its deadline, possibly after some
+            steps were already yielded.
+        OffSchemaError: If the output turns malformed part way through.
+    """
+
+    try:  # pragma: no cover - exercised via monkeypatch in tests
+        from pydantic_ai import Agent
+    except Exception:  # dependency missing
+        logging.exception("Planner dependencies unavailable")
+        return
+
+    system_prompt = get_prompt("planner_system")
+    model_id = model_for("Planner")
+    provider_name, model_name = split_model(model_id)
+    agent = Agent(model_id, system_prompt=system_prompt)
+    limiter = get_limiter(provider_name, model_name)
+    tokens = count_tokens(f"{system_prompt}\n{topic}", model_name)
+
+    async def start() -> AsyncIterator[str]:
+        async def chunks() -> AsyncIterator[str]:
+            async with limiter.stream(
+                lambda: agent.run_stream(topic), tokens=tokens
+            ) as response:
+                async for chunk in response.stream_text(delta=True):
+                    if chunk:
+                        yield chunk
+
+        return chunks()
+
+    parser = OutlineStream()
+    output: List[str] = []
+    started = perf_counter()
+    try:
+        async for chunk in hedged_stream("Planner", start):
+            output.append(chunk)
+            for step in parser.feed(chunk):
+                yield step
+        for step in parser.finish():
+            yield step
+    except RequestTimeout:
+        logging.warning("Streamed planner call timed out")
+        raise
+    except OffSchemaError:
+        logging.warning("Streamed planner output could not be parsed")
+        raise
+    record_model_call(
+        workspace_id,
+        "Planner",
+        model_id,
+        perf_counter() - started,
+        input_tokens=tokens,
+        output_tokens=count_tokens("".join(output), model_name),
+    )
+
+
+def parse_outline(raw: str) -> Outline:
+    """Parse planner output as :class:`PlannerOutput` JSON or a bullet list."""
+
+    try:
+        data = PlannerOutput.model_validate_json(raw)
+    except ValidationError:
+        return extract_outline(raw)
+    return Outline(steps=[step.strip() for step in data.steps])
+
+
+def plan_confidence(outline: Outline) -> float:
+    """Return the heuristic planning confidence for ``outline``."""
+
+    if not outline.steps:
+        return 0.0
+    return min(1.0, round(0.5 + 0.1 * len(outline.steps), 2))
+
+
 async def run_planner(state: State) -> PlanResult:
     """Analyze ``state.prompt`` and draft an outline.
 
@@ -80,26 +267,24 @@ async def run_planner(state: State) -> PlanResult:
     minimal :class:`PlanResult` for policy evaluation.
     """
 
-    raw = await call_planner_llm(state.prompt)
+    raw = await call_planner_llm(
+        state.prompt, getattr(state, "workspace_id", "default")
+    )
     stream_messages(raw)
-    outline = Outline(steps=[])
-    try:
-        data = PlannerOutput.model_validate_json(raw)
-        outline = Outline(steps=[step.strip() for step in data.steps])
-    except ValidationError:
-        outline = extract_outline(raw)
+    outline = parse_outline(raw)
     state.outline = outline
-    confidence = 0.0
-    if outline.steps:
-        confidence = min(1.0, round(0.5 + 0.1 * len(outline.steps), 2))
-    else:
+    if not outline.steps:
         stream_debug("planner produced empty outline")
-    return PlanResult(confidence=confidence, outline=outline)
+    return PlanResult(confidence=plan_confidence(outline), outline=outline)
 
 
 __all__ = [
+    "OutlineStream",
     "PlanResult",
     "call_planner_llm",
     "extract_outline",
+    "parse_outline",
+    "plan_confidence",
     "run_planner",
+    "stream_planner_steps",
 ]
@@ -0,0 +1,114 @@
+"""Token-budgeted prompt context for LLM calls.
+
+Source citations are ranked by how well their research keywords match the
+section being generated and packed into a fixed token budget, compacting or
+dropping the least relevant ones. The JSON schema instruction is minified and
+built once per process, and token counts share a single cached ``tiktoken``
+encoder.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from functools import lru_cache
+from typing import Iterable, List, Sequence, Type
+
+import tiktoken
+from pydantic import BaseModel
+
+from core.state import Citation
+
+from .models import ResearchResult, WeaveResult
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model_name: str) -> "tiktoken.Encoding":
+    """Return the cached ``tiktoken`` encoding for ``model_name``."""
+
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:  # pragma: no cover - fallback for unknown models
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model_name: str) -> int:
+    """Return the number of tokens ``text`` encodes to for ``model_name``."""
+
+    return len(get_encoding(model_name).encode(text))
+
+
+@lru_cache(maxsize=None)
+def schema_instruction(model: Type[BaseModel] = WeaveResult) -> str:
+    """Return the minified schema instruction for ``model``."""
+
+    schema = json.dumps(model.model_json_schema(), separators=(",", ":"))
+    return f"Output must conform to this JSON schema:\n{schema}"
+
+
+def _words(text: str) -> set[str]:
+    return set(_WORD.findall(text.lower()))
+
+
+def rank_sources(
+    sources: Iterable[Citation],
+    query: str,
+    research: Sequence[ResearchResult] = (),
+) -> List[Citation]:
+    """Order ``sources`` by keyword overlap with ``query``, best first.
+
+    A source is scored with the keywords of the research result sharing its
+    URL, falling back to its title. Ties keep the original order.
+    """
+
+    wanted = _words(query)
+    keywords = {r.url.rstrip("/"): r.keywords for r in research}
+
+    def score(src: Citation) -> int:
+        terms = keywords.get(str(src.url).rstrip("/")) or [src.title or ""]
+        return len(wanted & _words(" ".join(terms)))
+
+    return sorted(sources, key=score, reverse=True)
+
+
+def _source_line(src: Citation) -> str:
+    return f"- {src.title} ({src.url}) – {src.licence} retrieved {src.retrieved_at}"
+
+
+def build_source_context(
+    sources: Iterable[Citation],
+    query: str,
+    *,
+    model_name: str,
+    budget: int,
+    research: Sequence[ResearchResult] = (),
+) -> str:
+    """Return citation lines for ``query`` fitting within ``budget`` tokens.
+
+    Only sources with a title, licence and retrieval date are listed. When a
+    full line does not fit, a compact ``title (url)`` form is tried before
+    the source is dropped.
+    """
+
+    usable = [s for s in sources if s.title and s.licence and s.retrieved_at]
+    lines: List[str] = []
+    remaining = budget
+    for src in rank_sources(usable, query, research):
+        for line in (_source_line(src), f"- {src.title} ({src.url})"):
+            cost = count_tokens(line + "\n", model_name)
+            if cost <= remaining:
+                lines.append(line)
+                remaining -= cost
+                break
+    return "\n".join(lines)
+
+
+__all__ = [
+    "build_source_context",
+    "count_tokens",
+    "get_encoding",
+    "rank_sources",
+    "schema_instruction",
+]
@@ -0,0 +1,338 @@
+"""Client-side rate limiting for LLM and search providers.
+
+Each provider/model pair gets a :class:`ProviderLimiter` combining three
+mechanisms:
+
+* token buckets capping requests and tokens per minute at the quota,
+* an AIMD concurrency window that halves on 429 responses or latency spikes
+  and grows by one slot per window of successful calls,
+* retries with full-jitter exponential backoff that honour ``Retry-After``.
+
+Limiter state is exported through OpenTelemetry gauges so it appears on the
+Prometheus ``/metrics`` endpoint next to the other application metrics.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import (
+    AsyncContextManager,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    TypeVar,
+)
+
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
+
+from .streaming import stream_debug
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass(frozen=True, slots=True)
+class LimitConfig:
+    """Quota and concurrency bounds for one provider.
+
+    Attributes:
+        requests_per_minute: Request quota, or ``None`` for no limit.
+        tokens_per_minute: Token quota, or ``None`` for no limit.
+        initial_concurrency: Starting size of the concurrency window.
+        max_concurrency: Upper bound for the window.
+        max_retries: Retries after a throttled or failed call.
+    """
+
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    initial_concurrency: int = 4
+    max_concurrency: int = 32
+    max_retries: int = 4
+
+
+PROVIDER_LIMITS: Dict[str, LimitConfig] = {
+    "openai": LimitConfig(requests_per_minute=500, tokens_per_minute=200_000),
+    "tavily": LimitConfig(requests_per_minute=100, initial_concurrency=2),
+}
+
+
+class TokenBucket:
+    """Continuously refilled bucket holding up to one minute of quota."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = float(per_minute)
+        self._rate = per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def available(self) -> float:
+        """Tokens currently available, including refill since the last take."""
+
+        elapsed = time.monotonic() - self._updated
+        return min(self.capacity, self._tokens + elapsed * self._rate)
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until ``amount`` tokens can be taken from the bucket.
+
+        Requests larger than the bucket are capped at its capacity so a
+        single oversized call waits for a full bucket instead of forever.
+        """
+
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._tokens = self.available
+                self._updated = time.monotonic()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self._rate)
+
+
+class AdaptiveConcurrency:
+    """AIMD window bounding in-flight calls.
+
+    Each success adds ``1 / limit`` slots, so the window grows by one per
+    round of calls; a throttled call or a latency spike halves it.
+    """
+
+    def __init__(
+        self, initial: int, maximum: int, *, spike_factor: float = 3.0
+    ) -> None:
+        self.limit = float(initial)
+        self._maximum = maximum
+        self._spike_factor = spike_factor
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        """Wait for a free slot in the current window."""
+
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, elapsed: float, *, throttled: bool = False) -> None:
+        """Return a slot and adapt the window to the call's outcome."""
+
+        spike = self.latency is not None and elapsed > self.latency * self._spike_factor
+        if throttled or spike:
+            self.limit = max(1.0, self.limit / 2)
+        else:
+            self.limit = min(float(self._maximum), self.limit + 1 / self.limit)
+        if not throttled:
+            # Exponentially weighted average of successful call latency.
+            self.latency = (
+                elapsed if self.latency is None else 0.8 * self.latency + 0.2 * elapsed
+            )
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+
+def status_of(exc: BaseException) -> Optional[int]:
+    """Return the HTTP status carried by ``exc`` if there is one."""
+
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Return the ``Retry-After`` delay in seconds advertised by ``exc``."""
+
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class ProviderLimiter:
+    """Rate, token and concurrency limits shared by calls to one provider."""
+
+    def __init__(self, name: str, config: LimitConfig) -> None:
+        self.name = name
+        self.config = config
+        self.requests = (
+            TokenBucket(config.requests_per_minute)
+            if config.requests_per_minute
+            else None
+        )
+        self.tokens = (
+            TokenBucket(config.tokens_per_minute) if config.tokens_per_minute else None
+        )
+        self.concurrency = AdaptiveConcurrency(
+            config.initial_concurrency, config.max_concurrency
+        )
+        self.throttled = 0
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0) -> AsyncIterator[None]:
+        """Hold quota and a concurrency slot for one call.
+
+        Args:
+            tokens: Estimated tokens consumed by the call.
+        """
+
+        if self.requests is not None:
+            await self.requests.acquire()
+        if self.tokens is not None and tokens:
+            await self.tokens.acquire(tokens)
+        await self.concurrency.acquire()
+        started = time.monotonic()
+        throttled = False
+        try:
+            yield
+        except BaseException as exc:
+            throttled = status_of(exc) == 429
+            if throttled:
+                self.throttled += 1
+                _THROTTLED.add(1, {"limiter": self.name})
+            raise
+        finally:
+            await self.concurrency.release(
+                time.monotonic() - started, throttled=throttled
+            )
+
+    def _retry_delay(self, exc: Exception, attempt: int) -> Optional[float]:
+        """Return how long to wait before retrying after ``exc``.
+
+        Returns ``None`` when ``exc`` is not transient or retries are used
+        up. Delays use full-jitter exponential backoff, waiting at least as
+        long as the server's ``Retry-After`` header when it sends one.
+        """
+
+        status = status_of(exc)
+        if status not in RETRYABLE_STATUS or attempt == self.config.max_retries:
+            return None
+        delay = random.uniform(0, min(30.0, 0.5 * 2**attempt))
+        delay = max(delay, retry_after(exc) or 0.0)
+        stream_debug(f"{self.name} returned {status}; retrying in {delay:.1f}s")
+        return delay
+
+    async def call(self, func: Callable[[], Awaitable[T]], *, tokens: int = 0) -> T:
+        """Run ``func`` inside :meth:`slot`, retrying transient HTTP failures."""
+
+        for attempt in range(self.config.max_retries + 1):
+            try:
+                async with self.slot(tokens):
+                    return await func()
+            except Exception as exc:
+                delay = self._retry_delay(exc, attempt)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    @asynccontextmanager
+    async def stream(
+        self, open_stream: Callable[[], AsyncContextManager[T]], *, tokens: int = 0
+    ) -> AsyncIterator[T]:
+        """Open a streamed call inside :meth:`slot`, retrying like :meth:`call`.
+
+        Only opening the stream is retried: a failure before the response
+        starts has produced no output, while one after it has may already
+        have been consumed by the caller and is raised as is.
+        """
+
+        for attempt in range(self.config.max_retries + 1):
+            opened = False
+            try:
+                async with self.slot(tokens), open_stream() as response:
+                    opened = True
+                    yield response
+                return
+            except Exception as exc:
+                delay = None if opened else self._retry_delay(exc, attempt)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return the current limiter state for metrics and debugging."""
+
+        state = {
+            "concurrency_limit": self.concurrency.limit,
+            "in_flight": float(self.concurrency.in_flight),
+            "throttled": float(self.throttled),
+        }
+        if self.requests is not None:
+            state["requests_available"] = self.requests.available
+        if self.tokens is not None:
+            state["tokens_available"] = self.tokens.available
+        return state
+
+
+_LIMITERS: Dict[str, ProviderLimiter] = {}
+
+
+def get_limiter(provider: str, model: str | None = None) -> ProviderLimiter:
+    """Return the process-wide limiter for ``provider`` and ``model``."""
+
+    key = f"{provider}:{model}" if model else provider
+    limiter = _LIMITERS.get(key)
+    if limiter is None:
+        config = PROVIDER_LIMITS.get(provider, LimitConfig())
+        limiter = _LIMITERS[key] = ProviderLimiter(key, config)
+    return limiter
+
+
+def _observe(field: str) -> Callable[[CallbackOptions], Iterable[Observation]]:
+    def callback(_options: CallbackOptions) -> Iterable[Observation]:
+        for key, limiter in list(_LIMITERS.items()):
+            value = limiter.snapshot().get(field)
+            if value is not None:
+                yield Observation(value, {"limiter": key})
+
+    return callback
+
+
+_meter = metrics.get_meter("lecture_builder")
+_THROTTLED = _meter.create_counter(
+    "provider_throttled_total", description="Provider calls rejected with HTTP 429"
+)
+for _field, _description in (
+    ("concurrency_limit", "Adaptive concurrency window per provider"),
+    ("in_flight", "Provider calls currently in flight"),
+    ("requests_available", "Request tokens left in the per-minute bucket"),
+    ("tokens_available", "LLM tokens left in the per-minute bucket"),
+):
+    _meter.create_observable_gauge(
+        f"provider_{_field}", callbacks=[_observe(_field)], description=_description
+    )
+
+
+__all__ = [
+    "AdaptiveConcurrency",
+    "LimitConfig",
+    "PROVIDER_LIMITS",
+    "ProviderLimiter",
+    "TokenBucket",
+    "get_limiter",
+    "retry_after",
+    "status_of",
+]
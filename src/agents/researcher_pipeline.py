@@ -7,42 +7,54 @@ import logging
 from datetime import datetime
 from typing import List
 
-import httpx
-
 from core.state import State
 from persistence import Citation, CitationRepo, get_db_session
 
 from .copyright_filter import filter_allowlist
+from .licence_resolver import get_licence_resolver
 from .researcher_web import CitationDraft, rank_by_authority
 from .researcher_web_runner import run_web_search
+from .url_verifier import get_url_verifier
 
 
 async def _lookup_licence(url: str) -> str:
-    """Fetch licence information via HTTP HEAD."""
+    """Resolve licence information through the shared cached resolver."""
 
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.head(url, timeout=5.0)
-            return response.headers.get("License", "")
-    except Exception:
-        logging.exception("Failed to look up licence")
-        return ""
+    return await get_licence_resolver().resolve(url)
 
 
-async def researcher_pipeline(query: str, state: State) -> List[Citation]:
-    """Execute the researcher pipeline for ``query``."""
+async def researcher_pipeline(
+    query: str, state: State, drafts: List[CitationDraft] | None = None
+) -> List[Citation]:
+    """Execute the researcher pipeline for ``query``.
+
+    ``drafts`` already gathered by the caller are used instead of running
+    another search.
+    """
 
     state.prompt = query
-    try:
-        drafts: List[CitationDraft] = await run_web_search(state)
-    except Exception:
-        logging.exception("Web search failed")
-        return []
+    if drafts is None:
+        try:
+            drafts = await run_web_search(state)
+        except Exception:
+            logging.exception("Web search failed")
+            return []
+
+    return await cite_drafts(drafts, getattr(state, "workspace_id", "default"))
+
+
+async def cite_drafts(
+    drafts: List[CitationDraft], workspace_id: str = "default"
+) -> List[Citation]:
+    """Rank, filter and license ``drafts`` and store them for ``workspace_id``.
+
+    Returns:
+        The citations that were stored, best-ranked first.
+    """
 
     ranked = rank_by_authority(drafts)
     kept, _ = filter_allowlist(ranked)
     citations: List[Citation] = []
-    workspace_id = getattr(state, "workspace_id", "default")
 
     try:
         licence_results: List[str | BaseException] = await asyncio.gather(
@@ -53,25 +65,42 @@ async def researcher_pipeline(query: str, state: State) -> List[Citation]:
         logging.exception("Licence lookups failed")
         licence_results = ["unknown" for _ in kept]
 
-    async with get_db_session() as conn:
-        repo = CitationRepo(conn, workspace_id)
-        for draft, licence in zip(kept, licence_results):
-            licence_text = "unknown"
-            if isinstance(licence, BaseException):
-                logging.exception("Licence lookup failed for %s", draft.url)
-            elif isinstance(licence, str) and licence:
-                licence_text = licence
-
-            citation = Citation(
+    for draft, licence in zip(kept, licence_results):
+        licence_text = "unknown"
+        if isinstance(licence, BaseException):
+            logging.exception("Licence lookup failed for %s", draft.url)
+        elif isinstance(licence, str) and licence:
+            licence_text = licence
+
+        # Reuse the HEAD made during licence lookup, if any, so the fact
+        # checker and exports can see the verification on the row.
+        check = await get_url_verifier().cached(draft.url)
+        citations.append(
+            Citation(
                 url=draft.url,
                 title=draft.title,
                 retrieved_at=datetime.utcnow(),
                 licence=licence_text,
+                status_code=check.status_code if check else None,
+                verified_at=(
+                    datetime.utcfromtimestamp(check.checked_at) if check else None
+                ),
             )
+        )
+
+    async with get_db_session() as conn:
+        repo = CitationRepo(conn, workspace_id)
+        try:
+            await repo.upsert_many(citations)
+            return citations
+        except Exception:
+            logging.exception("Bulk citation insert failed; storing one at a time")
+        stored: List[Citation] = []
+        for citation in citations:
             try:
                 await repo.insert(citation)
             except Exception:
-                logging.exception("Failed to insert citation for %s", draft.url)
+                logging.exception("Failed to insert citation for %s", citation.url)
                 continue
-            citations.append(citation)
-    return citations
+            stored.append(citation)
+    return stored
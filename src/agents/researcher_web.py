@@ -9,6 +9,7 @@ from typing import List, Optional, Protocol
 from urllib.parse import urlparse
 
 import httpx
+from opentelemetry import metrics
 from pydantic import BaseModel
 
 from persistence import get_db_session
@@ -16,8 +17,15 @@ from persistence.repositories.retrieval_cache_repo import RetrievalCacheRepo
 
 from .dense_retriever import DenseRetriever
 from .offline_cache import save_cached_results
+from .rate_limits import get_limiter
 from .streaming import stream_debug, stream_messages
 
+_meter = metrics.get_meter("lecture_builder")
+_CACHE_LOOKUPS = _meter.create_counter(
+    "research_cache_lookups_total",
+    description="Retrieval cache lookups by outcome (hit or miss)",
+)
+
 
 class RawSearchResult(BaseModel):
     """Minimal search result returned by a search provider."""
@@ -74,15 +82,23 @@ class TavilyClient(SearchClient):
 
         await self._http.aclose()
 
-    async def search(self, query: str) -> List[RawSearchResult]:
-        """Call the Tavily API and cache search results."""
-
-        stream_debug(f"tavily search: {query}")
+    async def _post(self, query: str) -> httpx.Response:
         response = await self._http.post(
             self._URL,
             json={"api_key": self._api_key, "query": query},
         )
         response.raise_for_status()
+        return response
+
+    async def search(self, query: str) -> List[RawSearchResult]:
+        """Call the Tavily API and cache search results.
+
+        Requests go through the shared ``tavily`` limiter, which retries
+        throttled calls.
+        """
+
+        stream_debug(f"tavily search: {query}")
+        response = await get_limiter("tavily").call(lambda: self._post(query))
         items = response.json().get("results", [])
         results = [
             RawSearchResult.model_validate(
@@ -96,7 +112,7 @@ class TavilyClient(SearchClient):
         ]
         for res in results:
             stream_messages(res.snippet)
-        save_cached_results(query, results)
+        await asyncio.to_thread(save_cached_results, query, results)
         return results
 
 
@@ -112,7 +128,9 @@ async def _cached_search_async(
         cached = await repo.get(query)
         if cached is not None:
             stream_debug(f"cache hit: {query}")
+            _CACHE_LOOKUPS.add(1, {"result": "hit"})
             return [RawSearchResult.model_validate(item) for item in cached]
+    _CACHE_LOOKUPS.add(1, {"result": "miss"})
 
     try:
         results = await client.search(query)
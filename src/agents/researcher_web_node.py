@@ -7,7 +7,7 @@ from typing import List
 
 from agents.models import ResearchResult
 from agents.researcher_pipeline import researcher_pipeline
-from agents.researcher_web_runner import run_web_search
+from agents.researcher_web_runner import run_fanout_search
 from core.state import Citation as StateCitation
 from core.state import State
 
@@ -20,9 +20,14 @@ def _extract_keywords(text: str) -> list[str]:
 
 
 async def run_researcher_web(state: State) -> List[ResearchResult]:
-    """Execute web research and record results with keywords."""
+    """Execute web research and record results with keywords.
 
-    drafts = await run_web_search(state)
+    Several sub-queries derived from the prompt are searched in
+    parallel; the merged drafts feed both the research results and the
+    citation pipeline, so each query is searched only once.
+    """
+
+    drafts = await run_fanout_search(state)
     results: List[ResearchResult] = []
     for draft in drafts:
         text = f"{draft.title} {draft.snippet}"
@@ -37,7 +42,7 @@ async def run_researcher_web(state: State) -> List[ResearchResult]:
         )
     state.research_results.extend(results)
 
-    citations = await researcher_pipeline(state.prompt, state)
+    citations = await researcher_pipeline(state.prompt, state, drafts)
     new_sources = [StateCitation(url=c.url) for c in citations]
     state.sources.extend(new_sources)
     return results
@@ -2,34 +2,109 @@
 
 from __future__ import annotations
 
-from typing import List
+import asyncio
+import logging
+import re
+from collections import Counter
+from typing import List, Sequence
 
 from config import Settings
+from core.policies import merge_research_results
 from core.state import State
 
 from .cache_backed_researcher import CacheBackedResearcher
+from .host_limits import canonical_url
 from .researcher_web import (
     CitationDraft,
     RawSearchResult,
     SearchClient,
     TavilyClient,
+    cached_search,
 )
 
+# Separators between independent sub-topics of a prompt.
+_CLAUSES = re.compile(r"\s*(?:[,;\n]|\band\b)\s*", re.IGNORECASE)
+# Facets appended to the prompt when it yields too few sub-queries.
+_FACETS = ("overview", "examples", "teaching resources")
+
 
 def _to_draft(result: RawSearchResult) -> CitationDraft:
     return CitationDraft(url=result.url, snippet=result.snippet, title=result.title)
 
 
+def _client(settings: Settings) -> SearchClient:
+    if settings.offline_mode:
+        return CacheBackedResearcher()
+    return TavilyClient(settings.tavily_api_key or "")
+
+
+def derive_queries(prompt: str, *, limit: int = 4) -> List[str]:
+    """Return up to ``limit`` search queries covering ``prompt``.
+
+    The prompt itself always comes first, followed by each clause of a
+    compound prompt, then generic facets of the prompt until ``limit`` is
+    reached. Duplicates are dropped ignoring case. Research runs before the
+    planner, so only the prompt is available to derive queries from.
+    """
+
+    prompt = prompt.strip()
+    candidates = [prompt]
+    clauses = [c for c in _CLAUSES.split(prompt) if c]
+    if len(clauses) > 1:
+        candidates += clauses
+    candidates += [f"{prompt} {facet}" for facet in _FACETS]
+    queries: dict[str, str] = {}
+    for query in candidates:
+        queries.setdefault(query.lower(), query)
+    return list(queries.values())[: max(1, limit)]
+
+
 async def run_web_search(state: State) -> List[CitationDraft]:
     """Run a web search using the configured provider."""
 
     settings = Settings()
-    if settings.offline_mode:
-        client: SearchClient = CacheBackedResearcher()
-    else:
-        client = TavilyClient(settings.tavily_api_key or "")
+    client = _client(settings)
 
     async with client:
         results = await client.search(state.prompt)
 
     return [_to_draft(r) for r in results]
+
+
+async def run_fanout_search(
+    state: State, queries: Sequence[str] | None = None
+) -> List[CitationDraft]:
+    """Search several queries for ``state`` concurrently and merge the results.
+
+    Queries default to :func:`derive_queries` over the prompt, capped by
+    ``Settings.research_queries``. Each goes through
+    :func:`~agents.researcher_web.cached_search`. Results are deduplicated by
+    canonical URL and ordered by how many queries returned them, so sources
+    relevant to several sub-topics come first.
+
+    Raises:
+        Exception: The first search error if every query failed.
+    """
+
+    settings = Settings()
+    if queries is None:
+        queries = derive_queries(state.prompt, limit=settings.research_queries)
+    async with _client(settings) as client:
+        outcomes = await asyncio.gather(
+            *(cached_search(query, client) for query in queries),
+            return_exceptions=True,
+        )
+    errors = [o for o in outcomes if isinstance(o, BaseException)]
+    if errors and len(errors) == len(outcomes):
+        raise errors[0]
+    results: List[RawSearchResult] = []
+    hits: Counter[str] = Counter()
+    for query, outcome in zip(queries, outcomes):
+        if isinstance(outcome, BaseException):
+            logging.warning("Search failed for %r: %s", query, outcome)
+            continue
+        results.extend(outcome)
+        hits.update({canonical_url(r.url) for r in outcome})
+    merged = merge_research_results(results)
+    merged.sort(key=lambda r: hits[canonical_url(r.url)], reverse=True)
+    return [_to_draft(r) for r in merged]
@@ -0,0 +1,158 @@
+"""Pipelined planning and section-level weaving.
+
+When ``Settings.pipeline_sections`` is enabled the ``Planner`` node streams
+its outline and starts a Content-Weaver generation for each section as soon
+as that step is parsed, so early sections are written while later ones are
+still being planned. The ``Content-Weaver`` node then collects the section
+results in outline order, starting any section that has not been started
+yet, for example after resuming from a checkpoint taken after planning.
+
+With ``Settings.section_research`` each section is also researched in the
+background as soon as it is planned and woven from its own citations; see
+:mod:`agents.section_research`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Dict, List
+
+import config
+from core.state import Module, Outline, State
+
+from . import content_weaver, planner, section_research
+from .hedging import RequestTimeout
+from .json_stream import OffSchemaError
+from .models import WeaveResult
+from .streaming import stream_debug, stream_messages
+
+# Section generations started by the planner, keyed by workspace.
+_PENDING: Dict[str, List["asyncio.Task[WeaveResult]"]] = {}
+
+
+def _workspace(state: State) -> str:
+    return getattr(state, "workspace_id", "default")
+
+
+async def _weave_researched(state: State, section_id: int) -> WeaveResult:
+    wait = config.load_settings().section_research_wait
+    sources = await section_research.section_sources(state, section_id, wait)
+    return await content_weaver.content_weaver(
+        state, section_id=section_id, sources=sources
+    )
+
+
+def _start_section(state: State, section_id: int) -> "asyncio.Task[WeaveResult]":
+    if config.load_settings().section_research:
+        section_research.prefetch_section(state, section_id)
+        return asyncio.create_task(_weave_researched(state, section_id))
+    return asyncio.create_task(
+        content_weaver.content_weaver(state, section_id=section_id)
+    )
+
+
+def _cancel(tasks: List["asyncio.Task[WeaveResult]"]) -> None:
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            # Retrieve the error so it is not reported as unhandled.
+            task.exception()
+
+
+def cancel_sections(state: State) -> None:
+    """Cancel section weaving and research started for ``state``'s workspace.
+
+    The orchestrator calls this whenever a run ends, so sections started by
+    the planner never outlive a run that failed or was abandoned before the
+    ``Content-Weaver`` node collected them.
+    """
+
+    _cancel(_PENDING.pop(_workspace(state), []))
+    section_research.cancel_prefetch(state)
+
+
+async def run_pipelined_planner(state: State) -> "planner.PlanResult":
+    """Plan ``state.prompt`` and start weaving each section as it is planned.
+
+    Falls back to :func:`~agents.planner.run_planner` when streaming yields
+    no steps or stops part way through (deadline or malformed output); any
+    sections already started are cancelled, since the blocking outline may
+    differ, and are started again by :func:`run_section_weaver`.
+    """
+
+    workspace_id = _workspace(state)
+    _cancel(_PENDING.pop(workspace_id, []))
+    section_research.cancel_prefetch(state)
+    state.outline = Outline()
+    tasks: List["asyncio.Task[WeaveResult]"] = []
+    try:
+        async for step in planner.stream_planner_steps(state.prompt, workspace_id):
+            state.outline.steps.append(step)
+            stream_messages(step)
+            tasks.append(_start_section(state, len(state.outline.steps) - 1))
+    except (RequestTimeout, OffSchemaError) as exc:
+        _cancel(tasks)
+        section_research.cancel_prefetch(state)
+        stream_debug(
+            f"streamed plan stopped after {len(tasks)} steps ({exc});"
+            " falling back to a blocking call"
+        )
+        return await run_prefetching_planner(state)
+    except BaseException:
+        _cancel(tasks)
+        raise
+    if not tasks:
+        stream_debug("streamed plan was empty; falling back to a blocking call")
+        return await run_prefetching_planner(state)
+    _PENDING[workspace_id] = tasks
+    outline = state.outline
+    return planner.PlanResult(
+        confidence=planner.plan_confidence(outline), outline=outline
+    )
+
+
+async def run_prefetching_planner(state: State) -> "planner.PlanResult":
+    """Plan ``state.prompt`` and start researching each planned section.
+
+    Research only starts when ``Settings.section_research`` is enabled and
+    runs while the following nodes execute.
+    """
+
+    result = await planner.run_planner(state)
+    if config.load_settings().section_research:
+        section_research.prefetch_sections(state)
+    return result
+
+
+async def run_section_weaver(state: State) -> List[Module]:
+    """Collect one module per outline step, in order.
+
+    Sections already started by :func:`run_pipelined_planner` are awaited;
+    the rest are started now and run concurrently. Without an outline the
+    whole prompt is woven into a single module.
+    """
+
+    tasks = _PENDING.pop(_workspace(state), [])
+    steps = state.outline.steps
+    if not steps:
+        _cancel(tasks)
+        return [await content_weaver.run_content_weaver(state)]
+    tasks = tasks[: len(steps)]
+    tasks += [_start_section(state, i) for i in range(len(tasks), len(steps))]
+    try:
+        weaves = await asyncio.gather(*tasks)
+    except BaseException:
+        _cancel(tasks)
+        raise
+    finally:
+        section_research.cancel_prefetch(state)
+    return [content_weaver.add_module(state, weave) for weave in weaves]
+
+
+__all__ = [
+    "cancel_sections",
+    "run_pipelined_planner",
+    "run_prefetching_planner",
+    "run_section_weaver",
+]
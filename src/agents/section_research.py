@@ -0,0 +1,138 @@
+"""Background research for individual outline sections.
+
+The ``Researcher-Web`` node searches the raw topic before any outline
+exists, so sections introduced by the planner have no targeted sources.
+When ``Settings.section_research`` is enabled a search for
+``"<prompt> <step>"`` is started in the background for every outline step
+as soon as it is known. Its citations are handed to that section's
+Content-Weaver call in place of the topic-wide sources. A section waits at
+most ``Settings.section_research_wait`` seconds for its research and falls
+back to the topic-wide sources otherwise, so slow searches never hold up
+weaving. Prefetch hits and misses are recorded per workspace as
+``research.section.hit`` and ``research.section.miss``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from core.state import Citation, State
+from metrics.collector import get_metrics_collector
+
+from .host_limits import source_key
+from .researcher_pipeline import cite_drafts
+from .researcher_web_runner import run_fanout_search
+
+# Section searches in flight or finished, keyed by workspace then section.
+_PREFETCH: Dict[str, Dict[int, "asyncio.Task[List[Citation]]"]] = {}
+
+
+def _workspace(state: State) -> str:
+    return getattr(state, "workspace_id", "default")
+
+
+def section_query(prompt: str, step: str) -> str:
+    """Return the search query used for outline ``step`` of ``prompt``."""
+
+    return f"{prompt.strip()} {step.strip()}"
+
+
+async def research_section(state: State, section_id: int) -> List[Citation]:
+    """Search the web for one outline section and return its citations.
+
+    Citations are filtered, licensed, verified and stored for the workspace
+    exactly like those of the topic-wide research. Sources not yet listed in
+    ``state.sources`` are appended to it, compared by :func:`source_key`.
+    """
+
+    query = section_query(state.prompt, state.outline.steps[section_id])
+    drafts = await run_fanout_search(state, [query])
+    stored = await cite_drafts(drafts, _workspace(state))
+    citations = [
+        Citation(
+            url=c.url,
+            title=c.title,
+            licence=c.licence,
+            retrieved_at=c.retrieved_at.isoformat(),
+            status_code=c.status_code,
+            verified_at=c.verified_at.isoformat() if c.verified_at else None,
+        )
+        for c in stored
+    ]
+    known = {source_key(str(source.url)) for source in state.sources}
+    for citation in citations:
+        key = source_key(str(citation.url))
+        if key not in known:
+            known.add(key)
+            state.sources.append(citation)
+    return citations
+
+
+def prefetch_section(state: State, section_id: int) -> "asyncio.Task[List[Citation]]":
+    """Start researching ``section_id`` unless it is already under way."""
+
+    tasks = _PREFETCH.setdefault(_workspace(state), {})
+    task = tasks.get(section_id)
+    if task is None:
+        task = asyncio.create_task(research_section(state, section_id))
+        tasks[section_id] = task
+    return task
+
+
+def prefetch_sections(state: State) -> None:
+    """Start researching every step of ``state.outline``."""
+
+    for section_id in range(len(state.outline.steps)):
+        prefetch_section(state, section_id)
+
+
+def cancel_prefetch(state: State) -> None:
+    """Drop all section research for the workspace of ``state``.
+
+    Searches still running are cancelled; the errors of failed ones are
+    retrieved so they are not reported as unhandled.
+    """
+
+    for task in _PREFETCH.pop(_workspace(state), {}).values():
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            task.exception()
+
+
+async def section_sources(
+    state: State, section_id: int, wait: float
+) -> Optional[List[Citation]]:
+    """Return the researched citations for ``section_id``.
+
+    Waits up to ``wait`` seconds for a search still in flight. Returns
+    ``None`` when the section was not prefetched, its search failed or
+    timed out, or it found no usable sources; the search keeps running in
+    the background after a timeout.
+    """
+
+    workspace_id = _workspace(state)
+    task = _PREFETCH.get(workspace_id, {}).get(section_id)
+    citations: Optional[List[Citation]] = None
+    if task is not None:
+        try:
+            citations = await asyncio.wait_for(asyncio.shield(task), wait) or None
+        except asyncio.TimeoutError:
+            logging.info("Research for section %d not ready", section_id)
+        except Exception:
+            logging.exception("Research for section %d failed", section_id)
+    outcome = "hit" if citations else "miss"
+    get_metrics_collector().record(workspace_id, f"research.section.{outcome}", 1)
+    return citations
+
+
+__all__ = [
+    "cancel_prefetch",
+    "prefetch_section",
+    "prefetch_sections",
+    "research_section",
+    "section_query",
+    "section_sources",
+]
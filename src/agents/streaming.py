@@ -3,14 +3,88 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import logging
-from collections import defaultdict
-from collections.abc import AsyncIterator
-from typing import Any, Callable, DefaultDict, Dict, List
+import time
+from collections import defaultdict, deque
+from collections.abc import AsyncIterator, Iterable
+from typing import Any, Callable, DefaultDict, Deque, Dict, List, Optional, Tuple
+
+# (channel, event id, payload) as delivered to multi-channel subscribers.
+TaggedEvent = Tuple[str, int, Any]
 
 _SUBSCRIBERS: DefaultDict[str, List[asyncio.Queue[Any]]] = defaultdict(list)
+_TAGGED_SUBSCRIBERS: DefaultDict[str, List[asyncio.Queue[TaggedEvent]]] = defaultdict(
+    list
+)
 # Store the most recent payload for each channel so clients can poll updates.
 _LATEST: Dict[str, Any] = {}
+# Recent events per channel so reconnecting clients can resume by event id.
+HISTORY_SIZE = 256
+# Channels whose payloads supersede earlier ones keep a shorter history,
+# keyed by channel suffix. ``:state`` carries full snapshots, so only the
+# newest is worth replaying.
+HISTORY_SIZES: Dict[str, int] = {":state": 1}
+_HISTORY: Dict[str, Deque[Tuple[int, Any]]] = {}
+_EVENT_IDS = itertools.count(1)
+_last_event_id = 0
+# Seconds a channel without subscribers keeps its history after its last event.
+CHANNEL_TTL = 60 * 60.0
+# Minimum seconds between sweeps for idle channels.
+_SWEEP_INTERVAL = 60.0
+_LAST_EVENT: Dict[str, float] = {}
+_last_sweep = 0.0
+
+
+def history_size(channel: str) -> int:
+    """Return how many events are kept for replay on ``channel``."""
+
+    for suffix, size in HISTORY_SIZES.items():
+        if channel.endswith(suffix):
+            return size
+    return HISTORY_SIZE
+
+
+def _evict_idle(now: float) -> None:
+    """Forget channels without subscribers whose last event is too old."""
+
+    global _last_sweep
+    if now - _last_sweep < _SWEEP_INTERVAL:
+        return
+    _last_sweep = now
+    for channel, last in list(_LAST_EVENT.items()):
+        if now - last < CHANNEL_TTL:
+            continue
+        if _SUBSCRIBERS.get(channel) or _TAGGED_SUBSCRIBERS.get(channel):
+            continue
+        for registry in (_LAST_EVENT, _HISTORY, _LATEST):
+            registry.pop(channel, None)
+        _SUBSCRIBERS.pop(channel, None)
+        _TAGGED_SUBSCRIBERS.pop(channel, None)
+
+
+def _put_latest(queue: asyncio.Queue[Any], item: Any) -> None:
+    """Enqueue ``item``, discarding the oldest entry if ``queue`` is full."""
+
+    try:
+        queue.put_nowait(item)
+    except asyncio.QueueFull:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:  # pragma: no cover - race condition
+            pass
+        queue.put_nowait(item)
+
+
+def _unsubscribe(
+    registry: DefaultDict[str, List[Any]], channel: str, queue: Any
+) -> None:
+    """Remove ``queue`` from ``channel``, dropping the list once empty."""
+
+    queues = registry[channel]
+    queues.remove(queue)
+    if not queues:
+        del registry[channel]
 
 
 def stream(
@@ -32,17 +106,21 @@ def stream(
     """
 
     # Persist the latest payload so that polling clients can retrieve it.
+    global _last_event_id
     _LATEST[channel] = payload
+    event_id = _last_event_id = next(_EVENT_IDS)
+    history = _HISTORY.get(channel)
+    if history is None:
+        history = _HISTORY[channel] = deque(maxlen=history_size(channel))
+    history.append((event_id, payload))
+    now = time.monotonic()
+    _LAST_EVENT[channel] = now
+    _evict_idle(now)
 
     for queue in list(_SUBSCRIBERS.get(channel, [])):
-        try:
-            queue.put_nowait(payload)
-        except asyncio.QueueFull:
-            try:
-                queue.get_nowait()
-            except asyncio.QueueEmpty:  # pragma: no cover - race condition
-                pass
-            queue.put_nowait(payload)
+        _put_latest(queue, payload)
+    for tagged in list(_TAGGED_SUBSCRIBERS.get(channel, [])):
+        _put_latest(tagged, (channel, event_id, payload))
     if fallback:
         fallback(channel, payload)
 
@@ -65,7 +143,54 @@ async def subscribe(channel: str, *, max_queue: int = 100) -> AsyncIterator[Any]
         while True:
             yield await queue.get()
     finally:
-        _SUBSCRIBERS[channel].remove(queue)
+        _unsubscribe(_SUBSCRIBERS, channel, queue)
+
+
+async def subscribe_many(
+    channels: Iterable[str],
+    *,
+    last_event_id: Optional[int] = None,
+    max_queue: int = 100,
+) -> AsyncIterator[TaggedEvent]:
+    """Yield ``(channel, event_id, payload)`` for events on any of ``channels``.
+
+    All channels share one queue. Event ids increase across channels, so
+    passing the last id a client saw replays the buffered events it missed
+    (up to :func:`history_size` per channel) before live events.
+
+    Parameters
+    ----------
+    channels:
+        Names of the channels to subscribe to.
+    last_event_id:
+        Id of the last event the client received, if resuming.
+    max_queue:
+        Maximum number of pending events before older ones are discarded.
+    """
+
+    names = list(dict.fromkeys(channels))
+    queue: asyncio.Queue[TaggedEvent] = asyncio.Queue(max_queue)
+    for name in names:
+        _TAGGED_SUBSCRIBERS[name].append(queue)
+    try:
+        seen = 0
+        if last_event_id is not None:
+            missed = sorted(
+                (event_id, name, payload)
+                for name in names
+                for event_id, payload in _HISTORY.get(name, ())
+                if event_id > last_event_id
+            )
+            for event_id, name, payload in missed:
+                seen = event_id
+                yield name, event_id, payload
+        while True:
+            event = await queue.get()
+            if event[1] > seen:
+                yield event
+    finally:
+        for name in names:
+            _unsubscribe(_TAGGED_SUBSCRIBERS, name, queue)
 
 
 def get_latest(channel: str) -> Any | None:
@@ -74,6 +199,45 @@ def get_latest(channel: str) -> Any | None:
     return _LATEST.get(channel)
 
 
+def last_event_id() -> int:
+    """Return the id of the newest event published in this process.
+
+    Ids restart at ``1`` with every process, so an id above this value was
+    issued by an earlier process.
+    """
+
+    return _last_event_id
+
+
+def get_latest_event(channel: str) -> Tuple[int, Any] | None:
+    """Return ``(event_id, payload)`` of the newest event on ``channel``."""
+
+    history = _HISTORY.get(channel)
+    return history[-1] if history else None
+
+
+async def wait_for_event(
+    channel: str, since: int, timeout: float
+) -> Tuple[int, Any] | None:
+    """Return the newest event on ``channel`` with an id above ``since``.
+
+    Waits up to ``timeout`` seconds for one to be published and returns
+    ``None`` if none arrives.
+    """
+
+    latest = get_latest_event(channel)
+    if latest is not None and latest[0] > since:
+        return latest
+    events = subscribe_many([channel], last_event_id=since, max_queue=1)
+    try:
+        _, event_id, payload = await asyncio.wait_for(events.__anext__(), timeout)
+    except asyncio.TimeoutError:
+        return None
+    finally:
+        await events.aclose()
+    return event_id, payload
+
+
 def stream_messages(token: str) -> None:
     """Forward ``token`` over the ``messages`` channel and log it."""
 
@@ -101,7 +265,13 @@ def _log_debug(_channel: str, payload: Any) -> None:
 __all__ = [
     "stream",
     "subscribe",
+    "subscribe_many",
+    "TaggedEvent",
     "get_latest",
+    "get_latest_event",
+    "history_size",
+    "last_event_id",
+    "wait_for_event",
     "stream_messages",
     "stream_debug",
 ]
@@ -0,0 +1,219 @@
+"""Shared HEAD-based verification of external URLs.
+
+The researcher (licence lookup) and the fact checker (source validation)
+both need the status and headers of the same citation URLs. Routing both
+through :class:`UrlVerifier` means each URL is requested at most once per
+TTL window. Checks are keyed by :func:`~agents.host_limits.source_key`, so
+spellings of one URL such as ``https://a.example`` and ``https://a.example/``
+share a single entry. Results are kept in memory and persisted to a small
+SQLite file so that later runs can revalidate with ``If-None-Match`` /
+``If-Modified-Since`` instead of repeating full requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, Optional
+
+import aiosqlite
+import httpx
+
+from config import Settings
+
+from .host_limits import HostThrottle, source_key
+from .http_shared import Inflight, PooledClient
+
+_HOUR = 60 * 60
+
+
+@dataclass(slots=True)
+class UrlCheck:
+    """Outcome of a ``HEAD`` request against ``url``.
+
+    ``url`` is the :func:`~agents.host_limits.source_key` of the checked URL.
+    ``status_code`` is ``None`` when the request failed before a response
+    was received.
+    """
+
+    url: str
+    status_code: Optional[int]
+    licence: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    checked_at: float
+
+    @property
+    def ok(self) -> bool:
+        """Return ``True`` when the URL answered with a non-error status."""
+
+        return self.status_code is not None and self.status_code < 400
+
+
+class UrlVerifier(PooledClient):
+    """Verify URLs with memoisation, revalidation and bounded concurrency.
+
+    Args:
+        cache_path: SQLite file used to persist checks.
+        ttl: Seconds a successful check is reused without any request.
+        error_ttl: Seconds a failed check is reused before retrying.
+        max_concurrency: Maximum requests in flight across all hosts.
+        per_host: Maximum requests in flight per host.
+        delay: Minimum spacing in seconds between requests to one host.
+        timeout: Per-request timeout in seconds.
+        client: Optional pre-configured HTTP client.
+    """
+
+    def __init__(
+        self,
+        cache_path: Path,
+        *,
+        ttl: float = 24 * _HOUR,
+        error_ttl: float = _HOUR,
+        max_concurrency: int = 16,
+        per_host: int = 2,
+        delay: float = 0.25,
+        timeout: float = 5.0,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        super().__init__(timeout, client)
+        self._path = cache_path
+        self._ttl = ttl
+        self._error_ttl = error_ttl
+        self._limit = asyncio.Semaphore(max_concurrency)
+        self._throttle = HostThrottle(per_host=per_host, delay=delay)
+        self._memory: Optional[Dict[str, UrlCheck]] = None
+        self._load_lock = asyncio.Lock()
+        self._inflight: Inflight[UrlCheck] = Inflight()
+
+    async def _entries(self) -> Dict[str, UrlCheck]:
+        """Return the in-memory view of persisted checks, loading it once."""
+
+        if self._memory is not None:
+            return self._memory
+        async with self._load_lock:
+            if self._memory is None:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                async with aiosqlite.connect(self._path) as db:
+                    await db.execute(
+                        """
+                        CREATE TABLE IF NOT EXISTS url_checks (
+                            url TEXT PRIMARY KEY,
+                            status_code INTEGER,
+                            licence TEXT,
+                            etag TEXT,
+                            last_modified TEXT,
+                            checked_at REAL NOT NULL
+                        )
+                        """
+                    )
+                    await db.commit()
+                    cur = await db.execute(
+                        "SELECT url, status_code, licence, etag, last_modified,"
+                        " checked_at FROM url_checks"
+                    )
+                    rows = await cur.fetchall()
+                    await cur.close()
+                self._memory = {row[0]: UrlCheck(*row) for row in rows}
+        return self._memory
+
+    async def _store(self, check: UrlCheck) -> None:
+        (await self._entries())[check.url] = check
+        async with aiosqlite.connect(self._path) as db:
+            await db.execute(
+                "INSERT OR REPLACE INTO url_checks VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    check.url,
+                    check.status_code,
+                    check.licence,
+                    check.etag,
+                    check.last_modified,
+                    check.checked_at,
+                ),
+            )
+            await db.commit()
+
+    def _fresh(self, check: UrlCheck, now: float) -> bool:
+        ttl = self._ttl if check.status_code is not None else self._error_ttl
+        return check.checked_at + ttl >= now
+
+    async def cached(self, url: str) -> Optional[UrlCheck]:
+        """Return a fresh check for ``url`` without network access."""
+
+        check = (await self._entries()).get(source_key(url))
+        if check is not None and self._fresh(check, time.time()):
+            return check
+        return None
+
+    async def _request(self, url: str, previous: Optional[UrlCheck]) -> UrlCheck:
+        headers: Dict[str, str] = {}
+        if previous is not None and previous.ok:
+            if previous.etag:
+                headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                headers["If-Modified-Since"] = previous.last_modified
+        try:
+            async with self._limit, self._throttle.slot(url):
+                response = await self._http().head(url, headers=headers)
+        except Exception:
+            logging.exception("Source verification failed for %s", url)
+            check = UrlCheck(url, None, None, None, None, time.time())
+        else:
+            if response.status_code == 304 and previous is not None:
+                check = UrlCheck(
+                    url,
+                    previous.status_code,
+                    previous.licence,
+                    response.headers.get("ETag", previous.etag),
+                    previous.last_modified,
+                    time.time(),
+                )
+            else:
+                check = UrlCheck(
+                    url,
+                    response.status_code,
+                    response.headers.get("License"),
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    time.time(),
+                )
+        await self._store(check)
+        return check
+
+    async def check(self, url: str) -> UrlCheck:
+        """Return the verification result for ``url``.
+
+        Concurrent callers asking for the same URL share one request.
+        """
+
+        key = source_key(url)
+        previous = (await self._entries()).get(key)
+        if previous is not None and self._fresh(previous, time.time()):
+            return previous
+        return await self._inflight.run(key, lambda: self._request(key, previous))
+
+    async def check_many(self, urls: Iterable[str]) -> AsyncIterator[UrlCheck]:
+        """Yield checks for the distinct ``urls`` as each one completes."""
+
+        keys = dict.fromkeys(source_key(url) for url in urls)
+        pending = [asyncio.ensure_future(self.check(key)) for key in keys]
+        try:
+            for next_done in asyncio.as_completed(pending):
+                yield await next_done
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+@lru_cache(maxsize=1)
+def get_url_verifier() -> UrlVerifier:
+    """Return the process-wide :class:`UrlVerifier`."""
+
+    return UrlVerifier(Settings().data_dir / "url_checks.db")
+
+
+__all__ = ["UrlCheck", "UrlVerifier", "get_url_verifier"]
@@ -0,0 +1,211 @@
+"""Command-line tool that pre-populates the offline research caches.
+
+For every topic and portfolio variant only the search stage is run, using
+the same ``"<topic> for <portfolio>"`` prompt as ``generate-lecture`` and
+the same sub-queries derived from it by the researcher, so later offline
+runs hit the cache verbatim. Results are written to the
+retrieval cache and the offline corpus, and the licences of allow-listed
+sources are resolved once per canonical URL. No LLM calls are made.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from agents.copyright_filter import filter_allowlist
+from agents.host_limits import canonical_url
+from agents.licence_resolver import get_licence_resolver
+from agents.offline_cache import export_corpus, import_corpus, save_cached_results
+from agents.researcher_web import (
+    CitationDraft,
+    RawSearchResult,
+    SearchClient,
+    TavilyClient,
+    cached_search,
+)
+from agents.researcher_web_runner import derive_queries
+from cli.generate_lecture import PORTFOLIOS_ALL
+from config import Settings
+from persistence.database import init_db
+
+
+@dataclass(slots=True)
+class WarmSummary:
+    """Outcome of a cache warm-up run.
+
+    Attributes:
+        queries: Number of queries searched successfully.
+        failed: Queries whose search raised an error.
+        sources: Distinct canonical URLs across all results.
+        licences: Licences resolved for allow-listed sources.
+    """
+
+    queries: int = 0
+    failed: List[str] = field(default_factory=list)
+    sources: int = 0
+    licences: int = 0
+
+
+def build_queries(
+    topics: Iterable[str], portfolios: Iterable[str], *, limit: int = 4
+) -> List[str]:
+    """Return the researcher's queries for every topic and portfolio.
+
+    Each ``"<topic> for <portfolio>"`` prompt is expanded with
+    :func:`~agents.researcher_web_runner.derive_queries` using ``limit``, and
+    duplicates are dropped.
+    """
+
+    portfolios = list(portfolios)
+    return list(
+        dict.fromkeys(
+            query
+            for topic in topics
+            for portfolio in portfolios
+            for query in derive_queries(f"{topic} for {portfolio}", limit=limit)
+        )
+    )
+
+
+async def warm_cache(
+    queries: Iterable[str],
+    client: SearchClient,
+    *,
+    concurrency: int = 4,
+    resolve_licences: bool = True,
+) -> WarmSummary:
+    """Search ``queries`` with ``client`` and fill the offline caches.
+
+    Searches run concurrently, bounded by ``concurrency`` on top of the
+    provider rate limiter used by the client.
+    """
+
+    limit = asyncio.Semaphore(concurrency)
+    summary = WarmSummary()
+    unique: Dict[str, RawSearchResult] = {}
+
+    async def search(query: str) -> List[RawSearchResult]:
+        async with limit:
+            results = await cached_search(query, client)
+        await asyncio.to_thread(save_cached_results, query, results)
+        return results
+
+    queries = list(queries)
+    outcomes = await asyncio.gather(
+        *(search(query) for query in queries), return_exceptions=True
+    )
+    for query, outcome in zip(queries, outcomes):
+        if isinstance(outcome, BaseException):
+            logging.error("Search failed for %r: %s", query, outcome)
+            summary.failed.append(query)
+            continue
+        summary.queries += 1
+        for result in outcome:
+            unique.setdefault(canonical_url(result.url), result)
+    summary.sources = len(unique)
+
+    if resolve_licences and unique:
+        drafts = [
+            CitationDraft(url=r.url, snippet=r.snippet, title=r.title)
+            for r in unique.values()
+        ]
+        kept, _ = filter_allowlist(drafts)
+        licences = await get_licence_resolver().resolve_many(d.url for d in kept)
+        summary.licences = sum(1 for licence in licences if licence)
+    return summary
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Prefetch research for a topic catalogue into the offline cache.",
+    )
+    parser.add_argument("topics", nargs="*", help="Topics to prefetch")
+    parser.add_argument(
+        "--topics-file",
+        type=Path,
+        help="File with one topic per line, added to the positional topics",
+    )
+    parser.add_argument(
+        "--portfolio",
+        dest="portfolios",
+        action="append",
+        help="Portfolio to target. May be used multiple times.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum searches in flight",
+    )
+    parser.add_argument(
+        "--skip-licences",
+        action="store_true",
+        help="Do not resolve source licences",
+    )
+    parser.add_argument(
+        "--export",
+        type=Path,
+        help="Write the offline corpus to this JSON Lines file when done",
+    )
+    parser.add_argument(
+        "--import",
+        dest="import_path",
+        type=Path,
+        help="Load an exported corpus instead of searching (works offline)",
+    )
+    args = parser.parse_args(argv)
+    if args.topics_file:
+        lines = args.topics_file.read_text().splitlines()
+        args.topics += [line.strip() for line in lines if line.strip()]
+    if not args.topics and not args.import_path:
+        parser.error("no topics given")
+    if not args.portfolios:
+        args.portfolios = PORTFOLIOS_ALL
+    return args
+
+
+async def _run(args: argparse.Namespace, settings: Settings) -> WarmSummary:
+    await init_db()
+    async with TavilyClient(settings.tavily_api_key or "") as client:
+        return await warm_cache(
+            build_queries(
+                args.topics, args.portfolios, limit=settings.research_queries
+            ),
+            client,
+            concurrency=args.concurrency,
+            resolve_licences=not args.skip_licences,
+        )
+
+
+def main(argv: List[str] | None = None) -> None:
+    """Entry point for console scripts."""
+    args = parse_args(argv)
+    if args.import_path:
+        count = import_corpus(args.import_path)
+        print(f"Imported {count} queries from {args.import_path}")
+        return
+    settings = Settings()
+    if settings.offline_mode:
+        raise SystemExit("Cannot warm the cache while OFFLINE_MODE is enabled")
+    if not settings.tavily_api_key:
+        raise SystemExit("TAVILY_API_KEY is required to warm the cache")
+    summary = asyncio.run(_run(args, settings))
+    print(
+        f"Cached {summary.queries} queries, {summary.sources} unique sources,"
+        f" {summary.licences} licences"
+    )
+    if args.export:
+        count = export_corpus(args.export)
+        print(f"Exported {count} queries to {args.export}")
+    if summary.failed:
+        raise SystemExit(f"{len(summary.failed)} searches failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,26 @@ load_dotenv()
 # Default LLM provider and model enforced across the application.
 MODEL: str = "openai:o4-mini"
 DEFAULT_MODEL_NAME = MODEL.split(":", 1)[1]
+# Per-node model overrides; every node uses ``MODEL`` unless one is configured.
+DEFAULT_NODE_MODELS: dict[str, str] = {}
+# Per-node LLM time limits in seconds and hedging switches; the keys are the
+# fields of ``agents.hedging.RequestPolicy``.
+NODE_POLICY_FIELDS = {
+    "deadline",
+    "first_token_timeout",
+    "hedge",
+    "hedge_after",
+    "min_samples",
+}
+DEFAULT_NODE_POLICIES: dict[str, dict[str, float | bool]] = {
+    "Planner": {"deadline": 120, "first_token_timeout": 60, "hedge": True},
+    "Content-Weaver": {
+        "deadline": 600,
+        "first_token_timeout": 90,
+        "hedge": True,
+        "hedge_after": 30.0,
+    },
+}
 
 SENSITIVE_FIELDS = {
     "openai_api_key",
@@ -54,8 +74,19 @@ class Settings(BaseSettings):
     database_url: str | None = None
     tavily_api_key: str | None = None
     model: str = MODEL
+    node_models: dict[str, str] = dict(DEFAULT_NODE_MODELS)
+    node_policies: dict[str, dict[str, float | bool]] = {
+        node: dict(policy) for node, policy in DEFAULT_NODE_POLICIES.items()
+    }
+    prompt_source_tokens: int = 1500
+    research_queries: int = 4
     offline_mode: bool = False
     enable_tracing: bool = True
+    enable_checkpoints: bool = False
+    pipeline_sections: bool = False
+    section_research: bool = False
+    section_research_wait: float = 3.0
+    max_checkpoints: int | None = 50
     logfire_api_key: str | None = None
     logfire_project: str | None = None
     allowlist_domains: list[str] = ["wikipedia.org", ".edu", ".gov"]
@@ -78,6 +109,32 @@ class Settings(BaseSettings):
             raise ValueError("MODEL must be in '<provider>:<model_name>' format")
         return value
 
+    @field_validator("node_models")
+    @classmethod
+    def _validate_node_models(cls, value: dict[str, str]) -> dict[str, str]:
+        """Ensure every ``NODE_MODELS`` entry is a ``<provider>:<model_name>``."""
+        for node, model in value.items():
+            if ":" not in model:
+                raise ValueError(
+                    f"NODE_MODELS[{node!r}] must be in '<provider>:<model_name>' format"
+                )
+        return value
+
+    @field_validator("node_policies")
+    @classmethod
+    def _validate_node_policies(
+        cls, value: dict[str, dict[str, float | bool]]
+    ) -> dict[str, dict[str, float | bool]]:
+        """Ensure ``NODE_POLICIES`` entries only use known policy fields."""
+        for node, policy in value.items():
+            unknown = set(policy) - NODE_POLICY_FIELDS
+            if unknown:
+                raise ValueError(
+                    f"NODE_POLICIES[{node!r}] has unknown fields: "
+                    + ", ".join(sorted(unknown))
+                )
+        return value
+
     @field_validator("data_dir", "frontend_dist", mode="before")
     @classmethod
     def _to_path(cls, value: str | Path) -> Path:
@@ -101,7 +158,14 @@ class Settings(BaseSettings):
             return parsed
         return value
 
-    @field_validator("offline_mode", "enable_tracing", mode="before")
+    @field_validator(
+        "offline_mode",
+        "enable_tracing",
+        "enable_checkpoints",
+        "pipeline_sections",
+        "section_research",
+        mode="before",
+    )
     @classmethod
     def _parse_bool(
         cls, value: bool | str | None, info: ValidationInfo
@@ -178,4 +242,5 @@ __all__ = [
     "load_env",
     "MODEL",
     "DEFAULT_MODEL_NAME",
+    "DEFAULT_NODE_MODELS",
 ]
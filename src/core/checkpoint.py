@@ -2,64 +2,414 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+import logging
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 import aiosqlite
 
 from core.state import State, increment_version
+from core.state_codec import (
+    StateHeader,
+    decode_dict,
+    encode_dict,
+    encode_payload,
+    is_encoded,
+    read_header,
+    to_plain,
+    upgrade_payload,
+)
+from core.state_delta import apply, diff
+
+# Columns added after the original ``(id, state)`` layout. Older databases are
+# upgraded in place the first time a manager touches them.
+_EXTRA_COLUMNS = {
+    "workspace_id": "TEXT NOT NULL DEFAULT 'default'",
+    "node": "TEXT",
+    "next_node": "TEXT",
+    "kind": "TEXT NOT NULL DEFAULT 'full'",
+    "version": "INTEGER",
+}
+
+
+@dataclass(slots=True)
+class _Chain:
+    """Last snapshot written for a workspace, used as the next delta base."""
+
+    plain: dict
+    version: int
+    since_full: int
+
+
+@dataclass(slots=True)
+class _Snapshot:
+    """Plain copy of a state taken when its checkpoint was requested."""
+
+    plain: dict
+    prompt: str
+    version: int
+    workspace_id: str
+
+
+@dataclass(slots=True)
+class _Record:
+    """Encoded checkpoint row awaiting insertion."""
+
+    payload: bytes
+    kind: str
+    version: int
+    workspace_id: str
 
 
 class SqliteCheckpointManager:
     """Persist ``State`` snapshots to an on-disk SQLite database.
 
     The manager uses :mod:`aiosqlite` and opens a fresh connection for each
-    operation to avoid cross-task sharing.
+    operation to avoid cross-task sharing. Each row records the workspace, the
+    node that just completed and the node scheduled to run next so that an
+    interrupted run can be resumed. Snapshots are stored in the compact
+    format from :mod:`core.state_codec`; legacy JSON rows remain readable.
+
+    Every ``snapshot_interval``-th checkpoint of a workspace stores the full
+    state. Rows in between hold JSON Patch deltas (:mod:`core.state_delta`)
+    against the previous checkpoint, so storage grows with what changed rather
+    than with the size of the whole state. Any version can be rebuilt by
+    replaying deltas from the nearest full snapshot.
 
     Args:
         db_path: Location of the SQLite file used for persistence.
         max_checkpoints: Optional retention limit. When set, only the most
-            recent ``max_checkpoints`` rows are kept in the database.
+            recent ``max_checkpoints`` rows per workspace are kept; a delta
+            left at the head of the retained window is folded into a full
+            snapshot.
+        snapshot_interval: Number of checkpoints per full snapshot. ``1``
+            disables deltas.
     """
 
-    def __init__(self, db_path: str, max_checkpoints: int | None = None) -> None:
+    def __init__(
+        self,
+        db_path: str,
+        max_checkpoints: int | None = None,
+        snapshot_interval: int = 10,
+    ) -> None:
         """Store the path to the backing database file and retention limit."""
         self._path = Path(db_path)
         self._max_checkpoints = max_checkpoints
+        self._snapshot_interval = max(1, snapshot_interval)
+        self._pending: Optional[asyncio.Task[bool]] = None
+        self._chains: Dict[str, _Chain] = {}
+
+    async def _ensure_table(self, db: aiosqlite.Connection) -> None:
+        """Create the checkpoint table and add any missing columns."""
+        await db.execute(
+            """CREATE TABLE IF NOT EXISTS checkpoints
+              (id INTEGER PRIMARY KEY AUTOINCREMENT, state TEXT NOT NULL)"""
+        )
+        cur = await db.execute("PRAGMA table_info(checkpoints)")
+        existing = {row[1] for row in await cur.fetchall()}
+        await cur.close()
+        for column, ddl in _EXTRA_COLUMNS.items():
+            if column not in existing:
+                await db.execute(f"ALTER TABLE checkpoints ADD COLUMN {column} {ddl}")
+
+    def _snapshot(self, state: State) -> _Snapshot:
+        """Bump ``state.version`` and copy it into plain JSON types.
 
-    async def save_checkpoint(self, state: State) -> None:
-        """Serialize ``state`` into the checkpoint table and enforce retention."""
+        This runs on the event loop so that later mutations of ``state``
+        cannot leak into the checkpoint.
+        """
         increment_version(state)
-        payload = json.dumps(state.to_dict())
+        return _Snapshot(
+            plain=to_plain(state.to_dict()),
+            prompt=state.prompt,
+            version=state.version,
+            workspace_id=getattr(state, "workspace_id", "default"),
+        )
+
+    def _encode(self, snapshot: _Snapshot) -> _Record:
+        """Encode ``snapshot`` as a full row or a delta against its chain.
+
+        Runs in a worker thread; writes are serialised, so at most one call
+        touches ``_chains`` at a time.
+        """
+        chain = self._chains.get(snapshot.workspace_id)
+        if chain is not None and chain.since_full + 1 < self._snapshot_interval:
+            body = {"base": chain.version, "ops": diff(chain.plain, snapshot.plain)}
+            payload = encode_payload(
+                body, prompt=snapshot.prompt, version=snapshot.version
+            )
+            kind = "delta"
+            since_full = chain.since_full + 1
+        else:
+            payload = encode_dict(snapshot.plain)
+            kind = "full"
+            since_full = 0
+        self._chains[snapshot.workspace_id] = _Chain(
+            snapshot.plain, snapshot.version, since_full
+        )
+        return _Record(payload, kind, snapshot.version, snapshot.workspace_id)
+
+    async def _materialise(self, db: aiosqlite.Connection, row_id: int) -> dict:
+        """Rebuild the state mapping stored at ``row_id``."""
+        cur = await db.execute(
+            """
+            SELECT id, workspace_id FROM checkpoints WHERE workspace_id = (
+                SELECT workspace_id FROM checkpoints WHERE id = ?
+            ) AND kind = 'full' AND id <= ? ORDER BY id DESC LIMIT 1
+            """,
+            (row_id, row_id),
+        )
+        base = await cur.fetchone()
+        await cur.close()
+        if base is None:
+            raise RuntimeError("Checkpoint chain has no full snapshot")
+        cur = await db.execute(
+            "SELECT state FROM checkpoints WHERE workspace_id = ?"
+            " AND id BETWEEN ? AND ? ORDER BY id",
+            (base[1], base[0], row_id),
+        )
+        rows = await cur.fetchall()
+        await cur.close()
+        doc = decode_dict(rows[0][0])
+        for (payload,) in rows[1:]:
+            delta = decode_dict(payload)
+            if delta["base"] != doc.get("version"):
+                raise RuntimeError("Checkpoint chain is broken")
+            doc = apply(doc, delta["ops"])
+        return doc
+
+    async def _compact(self, db: aiosqlite.Connection, workspace_id: str) -> None:
+        """Drop rows beyond the retention limit, folding deltas if needed."""
+        cur = await db.execute(
+            "SELECT id, kind FROM checkpoints WHERE workspace_id = ?"
+            " ORDER BY id DESC LIMIT 1 OFFSET ?",
+            (workspace_id, (self._max_checkpoints or 1) - 1),
+        )
+        oldest = await cur.fetchone()
+        await cur.close()
+        if oldest is None:
+            return
+        oldest_id, kind = oldest
+        if kind == "delta":
+            doc = await self._materialise(db, oldest_id)
+            await db.execute(
+                "UPDATE checkpoints SET state = ?, kind = 'full' WHERE id = ?",
+                (await asyncio.to_thread(encode_dict, doc), oldest_id),
+            )
+        await db.execute(
+            "DELETE FROM checkpoints WHERE workspace_id = ? AND id < ?",
+            (workspace_id, oldest_id),
+        )
+
+    async def _write(
+        self,
+        record: _Record,
+        node: str | None,
+        next_node: str | None,
+    ) -> None:
+        """Insert ``record`` and enforce the retention limit."""
         async with aiosqlite.connect(self._path) as db:
+            await self._ensure_table(db)
             await db.execute(
-                """CREATE TABLE IF NOT EXISTS checkpoints
-                  (id INTEGER PRIMARY KEY AUTOINCREMENT, state TEXT NOT NULL)"""
+                """
+                INSERT INTO checkpoints
+                    (state, workspace_id, node, next_node, kind, version)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    record.payload,
+                    record.workspace_id,
+                    node,
+                    next_node,
+                    record.kind,
+                    record.version,
+                ),
             )
-            await db.execute("INSERT INTO checkpoints (state) VALUES (?)", (payload,))
             if self._max_checkpoints is not None:
-                await db.execute(
-                    """
-                    DELETE FROM checkpoints WHERE id NOT IN (
-                        SELECT id FROM checkpoints ORDER BY id DESC LIMIT ?
-                    )
-                    """,
-                    (self._max_checkpoints,),
-                )
+                await self._compact(db, record.workspace_id)
             await db.commit()
 
-    async def load_checkpoint(self) -> State:
-        """Load the most recent ``State`` snapshot."""
+    def _enqueue(
+        self,
+        state: State,
+        node: str | None,
+        next_node: str | None,
+        *,
+        background: bool,
+    ) -> asyncio.Task[bool]:
+        """Snapshot ``state`` now and schedule its encoding and write.
+
+        Each write waits for the previously scheduled one, so checkpoints
+        land in call order and deltas are always taken against the row
+        written before them. Diffing and encoding run in a worker thread.
+        After a failed write the workspace restarts with a full snapshot.
+        """
+        snapshot = self._snapshot(state)
+        previous = self._pending
+
+        async def _run() -> bool:
+            if previous is not None:
+                await asyncio.wait([previous])
+            try:
+                record = await asyncio.to_thread(self._encode, snapshot)
+                await self._write(record, node, next_node)
+            except Exception:
+                self._chains.pop(snapshot.workspace_id, None)
+                if not background:
+                    raise
+                logging.exception("Checkpoint write failed after %s", node)
+                return False
+            return True
+
+        self._pending = asyncio.create_task(_run())
+        return self._pending
+
+    async def save_checkpoint(
+        self,
+        state: State,
+        *,
+        node: str | None = None,
+        next_node: str | None = None,
+    ) -> None:
+        """Serialize ``state`` into the checkpoint table and enforce retention.
+
+        Args:
+            state: State to persist. Its ``version`` is incremented first.
+            node: Name of the node that has just completed, if any.
+            next_node: Name of the node that should run when resuming.
+        """
+        await self._enqueue(state, node, next_node, background=False)
+
+    def save_in_background(
+        self,
+        state: State,
+        *,
+        node: str | None = None,
+        next_node: str | None = None,
+    ) -> asyncio.Task[bool]:
+        """Schedule a checkpoint write without blocking the caller.
+
+        The state is copied immediately so later mutations cannot leak into
+        the snapshot; diffing, encoding and the write happen off the event
+        loop. Failures are logged rather than propagated to the running
+        pipeline, and the task resolves to whether the write succeeded.
+        """
+        return self._enqueue(state, node, next_node, background=True)
+
+    async def flush(self) -> None:
+        """Wait for any checkpoint writes scheduled in the background."""
+        pending = self._pending
+        if pending is not None:
+            await asyncio.wait([pending])
+            if self._pending is pending:
+                self._pending = None
+
+    async def _load_row(
+        self, query: str, params: Tuple[object, ...]
+    ) -> Tuple[State, str | None]:
+        """Rebuild the state for the first row matched by ``query``."""
         async with aiosqlite.connect(self._path) as db:
-            await db.execute(
-                """CREATE TABLE IF NOT EXISTS checkpoints
-                (id INTEGER PRIMARY KEY AUTOINCREMENT, state TEXT NOT NULL)"""
+            await self._ensure_table(db)
+            cur = await db.execute(query, params)
+            row = await cur.fetchone()
+            await cur.close()
+            if row is None:
+                raise RuntimeError("No checkpoint available")
+            row_id, workspace_id, next_node = row
+            doc = await self._materialise(db, row_id)
+        state = State.from_dict(doc)
+        state.workspace_id = workspace_id
+        return state, next_node
+
+    async def load_checkpoint(self, workspace_id: str | None = None) -> State:
+        """Load the most recent ``State`` snapshot.
+
+        Args:
+            workspace_id: Restrict the lookup to this workspace. When ``None``
+                the newest checkpoint across all workspaces is returned.
+        """
+        state, _ = await self.load_resume_point(workspace_id)
+        return state
+
+    async def load_resume_point(
+        self, workspace_id: str | None = None
+    ) -> Tuple[State, str | None]:
+        """Return the latest snapshot and the node that should run next.
+
+        The second element is ``None`` when the checkpointed run had already
+        finished.
+        """
+        select = "SELECT id, workspace_id, next_node FROM checkpoints"
+        if workspace_id is None:
+            return await self._load_row(f"{select} ORDER BY id DESC LIMIT 1", ())
+        return await self._load_row(
+            f"{select} WHERE workspace_id = ? ORDER BY id DESC LIMIT 1",
+            (workspace_id,),
+        )
+
+    async def load_version(self, workspace_id: str, version: int) -> State:
+        """Rebuild the checkpointed state with ``version`` for ``workspace_id``."""
+        state, _ = await self._load_row(
+            "SELECT id, workspace_id, next_node FROM checkpoints"
+            " WHERE workspace_id = ? AND version = ? ORDER BY id DESC LIMIT 1",
+            (workspace_id, version),
+        )
+        return state
+
+    async def list_versions(self, workspace_id: str) -> List[StateHeader]:
+        """Return snapshot headers for ``workspace_id``, oldest first.
+
+        Only the small header of each payload is decoded, so listing stays
+        cheap regardless of how large individual snapshots are.
+        """
+        async with aiosqlite.connect(self._path) as db:
+            await self._ensure_table(db)
+            cur = await db.execute(
+                "SELECT state FROM checkpoints WHERE workspace_id = ? ORDER BY id",
+                (workspace_id,),
             )
+            rows = await cur.fetchall()
+            await cur.close()
+        return [read_header(row[0]) for row in rows]
+
+    async def latest_header(self, workspace_id: str) -> StateHeader | None:
+        """Return the header of the newest checkpoint for ``workspace_id``.
+
+        Only the header is decoded. ``None`` means the workspace has no
+        checkpoint to resume from.
+        """
+        async with aiosqlite.connect(self._path) as db:
+            await self._ensure_table(db)
             cur = await db.execute(
-                "SELECT state FROM checkpoints ORDER BY id DESC LIMIT 1"
+                "SELECT state FROM checkpoints WHERE workspace_id = ?"
+                " ORDER BY id DESC LIMIT 1",
+                (workspace_id,),
             )
             row = await cur.fetchone()
-        if row is None:
-            raise RuntimeError("No checkpoint available")
-        data = json.loads(row[0])
-        return State.from_dict(data)
+            await cur.close()
+        return read_header(row[0]) if row is not None else None
+
+    async def migrate_legacy(self) -> int:
+        """Rewrite JSON checkpoints in the binary format.
+
+        Returns:
+            int: Number of rows converted.
+        """
+        converted = 0
+        async with aiosqlite.connect(self._path) as db:
+            await self._ensure_table(db)
+            cur = await db.execute("SELECT id, state FROM checkpoints")
+            rows = await cur.fetchall()
+            await cur.close()
+            for row_id, payload in rows:
+                if is_encoded(payload):
+                    continue
+                await db.execute(
+                    "UPDATE checkpoints SET state = ? WHERE id = ?",
+                    (upgrade_payload(payload), row_id),
+                )
+                converted += 1
+            await db.commit()
+        return converted
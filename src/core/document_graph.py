@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-from typing import Dict, List
+import hashlib
+from typing import Any, Dict, List, Sequence
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from agents.models import ResearchResult
 
@@ -31,30 +32,311 @@ from agents.models import ResearchResult
 
 
 class DocumentNode(BaseModel):
-    """Content node tracked within the :class:`DocumentDAG`."""
+    """Content node tracked within the :class:`DocumentDAG`.
+
+    Nodes hold no content themselves; :meth:`DocumentDAG.resolve` looks it up
+    in the modules and research results the graph was built from, so the
+    serialised graph stays small.
+
+    Attributes:
+        id: Unique node identifier.
+        type: Node kind such as ``module`` or ``slide``.
+        parent: Identifier of the parent node, ``None`` for the root.
+        hash: Digest of the node's content used to skip unchanged updates.
+        dirty: Whether the node or a descendant changed since the last
+            :meth:`DocumentDAG.clear_dirty`.
+    """
 
     id: str
     type: str
-    content: object | None = None
+    parent: str | None = None
+    hash: str | None = None
+    dirty: bool = False
+
+
+# Slide attribute held by each slide part node type.
+_SLIDE_PARTS = {
+    "slide_copy": "copy",
+    "slide_visualization": "visualization",
+    "slide_speaker_notes": "speaker_notes",
+}
+
+
+def _fingerprint(value: object) -> str:
+    if isinstance(value, BaseModel):
+        return value.model_dump_json()
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_fingerprint(item) for item in value) + "]"
+    return repr(value)
+
+
+def content_hash(value: object) -> str:
+    """Return a stable digest of ``value`` for change detection."""
+
+    return hashlib.sha256(_fingerprint(value).encode("utf-8")).hexdigest()
 
 
 class DocumentDAG(BaseModel):
-    """Directed acyclic graph capturing document structure."""
+    """Directed acyclic graph capturing document structure.
+
+    The graph is maintained incrementally: :meth:`upsert_module` and
+    :meth:`set_research` compare content hashes and only rebuild the
+    subtrees that changed, marking them and their ancestors dirty. Parent
+    pointers and a per-type index keep traversal independent of graph size.
+    """
 
     root: str = "root"
     nodes: Dict[str, DocumentNode] = Field(default_factory=dict)
     edges: Dict[str, List[str]] = Field(default_factory=dict)
+    _by_type: Dict[str, Dict[str, None]] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context: Any) -> None:
+        """Rebuild the type index and any parent pointers missing on load."""
+
+        for node in self.nodes.values():
+            self._by_type.setdefault(node.type, {})[node.id] = None
+        for parent, children in self.edges.items():
+            for child in children:
+                node = self.nodes.get(child)
+                if node is not None and node.parent is None:
+                    node.parent = parent
 
     def add_node(self, node: DocumentNode) -> None:
+        previous = self.nodes.get(node.id)
+        if previous is not None:
+            self._by_type.get(previous.type, {}).pop(node.id, None)
         self.nodes[node.id] = node
         self.edges.setdefault(node.id, [])
+        self._by_type.setdefault(node.type, {})[node.id] = None
 
     def add_edge(self, parent: str, child: str) -> None:
         self.edges.setdefault(parent, []).append(child)
+        node = self.nodes.get(child)
+        if node is not None:
+            node.parent = parent
 
     def children(self, node_id: str) -> List[DocumentNode]:
         return [self.nodes[c] for c in self.edges.get(node_id, [])]
 
+    def parent_of(self, node_id: str) -> DocumentNode | None:
+        """Return the parent of ``node_id`` or ``None`` for the root."""
+
+        parent = self.nodes[node_id].parent
+        return self.nodes.get(parent) if parent is not None else None
+
+    def nodes_of_type(self, node_type: str) -> List[DocumentNode]:
+        """Return all nodes of ``node_type`` in insertion order."""
+
+        return [self.nodes[n] for n in self._by_type.get(node_type, {})]
+
+    def remove_subtree(self, node_id: str) -> None:
+        """Delete ``node_id`` and its descendants and detach it from its parent."""
+
+        node = self.nodes.get(node_id)
+        if node is None:
+            return
+        if node.parent is not None and node.parent in self.edges:
+            siblings = self.edges[node.parent]
+            if node_id in siblings:
+                siblings.remove(node_id)
+        stack = [node_id]
+        while stack:
+            current = stack.pop()
+            removed = self.nodes.pop(current, None)
+            if removed is not None:
+                self._by_type.get(removed.type, {}).pop(current, None)
+            stack.extend(self.edges.pop(current, []))
+
+    def resolve(
+        self,
+        node_id: str,
+        modules: Sequence[object],
+        research: Sequence[ResearchResult] = (),
+    ) -> object | None:
+        """Return the content ``node_id`` represents.
+
+        Modules are matched by id, slides by number within their module and
+        research results by position. Structural nodes and nodes missing
+        from ``modules`` or ``research`` resolve to ``None``.
+        """
+
+        node = self.nodes.get(node_id)
+        if node is None:
+            return None
+        if node.type == "module":
+            return next((m for m in modules if getattr(m, "id", None) == node_id), None)
+        if node.type == "slide":
+            container = self.nodes.get(node.parent or "")
+            module = (
+                self.resolve(container.parent or "", modules) if container else None
+            )
+            number = node_id.rsplit("-slide-", 1)[-1]
+            slides = getattr(module, "slides", None) or []
+            return next(
+                (s for s in slides if str(getattr(s, "slide_number", "")) == number),
+                None,
+            )
+        if node.type in _SLIDE_PARTS:
+            slide = self.resolve(node.parent or "", modules)
+            return getattr(slide, _SLIDE_PARTS[node.type], None)
+        if node.type == "research_result":
+            index = int(node_id.split("-")[1])
+            return research[index] if index < len(research) else None
+        if node.type == "research_keywords":
+            result = self.resolve(node.parent or "", modules, research)
+            return getattr(result, "keywords", None)
+        return None
+
+    def mark_dirty(self, node_id: str) -> None:
+        """Flag ``node_id`` and every ancestor up to the root as dirty."""
+
+        current: str | None = node_id
+        while current is not None:
+            node = self.nodes.get(current)
+            if node is None or node.dirty:
+                break
+            node.dirty = True
+            current = node.parent
+
+    def dirty_nodes(self, node_type: str | None = None) -> List[DocumentNode]:
+        """Return dirty nodes, optionally restricted to ``node_type``."""
+
+        pool = self.nodes_of_type(node_type) if node_type else self.nodes.values()
+        return [node for node in pool if node.dirty]
+
+    def clear_dirty(self) -> None:
+        """Reset dirty flags once changes have been consumed."""
+
+        for node in self.nodes.values():
+            node.dirty = False
+
+    def _ensure_root(self) -> None:
+        if self.root not in self.nodes:
+            self.add_node(DocumentNode(id=self.root, type="document"))
+
+    def set_research(self, research: List[ResearchResult]) -> bool:
+        """Replace the research subtree if ``research`` changed.
+
+        Returns:
+            bool: ``True`` when the graph was modified.
+        """
+
+        digest = content_hash(research)
+        existing = self.nodes.get("research")
+        if existing is not None and existing.hash == digest:
+            return False
+        self._ensure_root()
+        self.remove_subtree("research")
+        self.add_node(DocumentNode(id="research", type="research", hash=digest))
+        self.edges[self.root].insert(0, "research")
+        self.nodes["research"].parent = self.root
+        for idx, res in enumerate(research):
+            res_id = f"research-{idx}"
+            self.add_node(
+                DocumentNode(id=res_id, type="research_result", hash=content_hash(res))
+            )
+            self.add_edge("research", res_id)
+            kw_id = f"{res_id}-keywords"
+            self.add_node(DocumentNode(id=kw_id, type="research_keywords"))
+            self.add_edge(res_id, kw_id)
+        self.mark_dirty("research")
+        return True
+
+    def _add_slide(self, container: str, slide_id: str, slide: object) -> None:
+        self.add_node(DocumentNode(id=slide_id, type="slide", hash=content_hash(slide)))
+        self.add_edge(container, slide_id)
+        parts = (
+            ("copy", "copy", "slide_copy"),
+            ("visualization", "visualization", "slide_visualization"),
+            ("speaker_notes", "speaker-notes", "slide_speaker_notes"),
+        )
+        for attr, suffix, node_type in parts:
+            value = getattr(slide, attr, None)
+            if value is None:
+                continue
+            part_id = f"{slide_id}-{suffix}"
+            self.add_node(
+                DocumentNode(id=part_id, type=node_type, hash=content_hash(value))
+            )
+            self.add_edge(slide_id, part_id)
+
+    def upsert_module(self, module: object) -> bool:
+        """Insert or update ``module``, rebuilding only slides that changed.
+
+        Returns:
+            bool: ``True`` when the graph was modified.
+        """
+
+        mod_id = getattr(module, "id", "")
+        digest = content_hash(module)
+        existing = self.nodes.get(mod_id)
+        if existing is not None and existing.hash == digest:
+            return False
+        if existing is None:
+            self._ensure_root()
+            self.add_node(DocumentNode(id=mod_id, type="module", hash=digest))
+            self.add_edge(self.root, mod_id)
+        else:
+            existing.hash = digest
+
+        container = f"{mod_id}-slides"
+        if container not in self.nodes:
+            self.add_node(DocumentNode(id=container, type="slides"))
+            self.add_edge(mod_id, container)
+        previous = list(self.edges[container])
+        order: List[str] = []
+        for slide in getattr(module, "slides", []) or []:
+            slide_num = getattr(slide, "slide_number", len(order) + 1)
+            slide_id = f"{mod_id}-slide-{slide_num}"
+            order.append(slide_id)
+            node = self.nodes.get(slide_id)
+            if node is not None and node.hash == content_hash(slide):
+                continue
+            self.remove_subtree(slide_id)
+            self._add_slide(container, slide_id, slide)
+            self.mark_dirty(slide_id)
+        for stale in set(previous) - set(order):
+            self.remove_subtree(stale)
+        self.edges[container] = order
+        self.mark_dirty(mod_id)
+        return True
+
+    def sync(
+        self, modules: List[object], research: List[ResearchResult] | None = None
+    ) -> List[str]:
+        """Bring the graph in line with ``modules`` and ``research``.
+
+        Unchanged modules are left untouched and modules that disappeared are
+        removed.
+
+        Returns:
+            List[str]: Identifiers of top-level nodes that changed.
+        """
+
+        self._ensure_root()
+        changed: List[str] = []
+        if research:
+            if self.set_research(research):
+                changed.append("research")
+        elif "research" in self.nodes:
+            self.remove_subtree("research")
+            self.mark_dirty(self.root)
+            changed.append("research")
+
+        module_ids: List[str] = []
+        for module in modules:
+            module_ids.append(getattr(module, "id", ""))
+            if self.upsert_module(module):
+                changed.append(module_ids[-1])
+        for node in self.children(self.root):
+            if node.type == "module" and node.id not in module_ids:
+                self.remove_subtree(node.id)
+                self.mark_dirty(self.root)
+                changed.append(node.id)
+        head = ["research"] if "research" in self.nodes else []
+        self.edges[self.root] = head + module_ids
+        return changed
+
 
 def build_document_dag(
     modules: List[object], research: List[ResearchResult] | None = None
@@ -70,67 +352,8 @@ def build_document_dag(
     """
 
     dag = DocumentDAG()
-    dag.add_node(DocumentNode(id=dag.root, type="document"))
-
-    if research:
-        dag.add_node(DocumentNode(id="research", type="research"))
-        dag.add_edge(dag.root, "research")
-        for idx, res in enumerate(research):
-            res_id = f"research-{idx}"
-            dag.add_node(DocumentNode(id=res_id, type="research_result", content=res))
-            dag.add_edge("research", res_id)
-            kw_id = f"{res_id}-keywords"
-            dag.add_node(
-                DocumentNode(id=kw_id, type="research_keywords", content=res.keywords)
-            )
-            dag.add_edge(res_id, kw_id)
-
-    for module in modules:
-        mod_id = getattr(module, "id", "")
-        mod_node = DocumentNode(id=mod_id, type="module", content=module)
-        dag.add_node(mod_node)
-        dag.add_edge(dag.root, mod_id)
-
-        slides_container = f"{mod_id}-slides"
-        dag.add_node(DocumentNode(id=slides_container, type="slides"))
-        dag.add_edge(mod_id, slides_container)
-
-        for slide in getattr(module, "slides", []) or []:
-            slide_num = getattr(
-                slide, "slide_number", len(dag.edges[slides_container]) + 1
-            )
-            slide_id = f"{mod_id}-slide-{slide_num}"
-            slide_node = DocumentNode(id=slide_id, type="slide", content=slide)
-            dag.add_node(slide_node)
-            dag.add_edge(slides_container, slide_id)
-
-            if getattr(slide, "copy", None) is not None:
-                copy_id = f"{slide_id}-copy"
-                dag.add_node(
-                    DocumentNode(id=copy_id, type="slide_copy", content=slide.copy)
-                )
-                dag.add_edge(slide_id, copy_id)
-            if getattr(slide, "visualization", None) is not None:
-                vis_id = f"{slide_id}-visualization"
-                dag.add_node(
-                    DocumentNode(
-                        id=vis_id,
-                        type="slide_visualization",
-                        content=slide.visualization,
-                    )
-                )
-                dag.add_edge(slide_id, vis_id)
-            if getattr(slide, "speaker_notes", None) is not None:
-                notes_id = f"{slide_id}-speaker-notes"
-                dag.add_node(
-                    DocumentNode(
-                        id=notes_id,
-                        type="slide_speaker_notes",
-                        content=slide.speaker_notes,
-                    )
-                )
-                dag.add_edge(slide_id, notes_id)
+    dag.sync(modules, research)
     return dag
 
 
-__all__ = ["DocumentNode", "DocumentDAG", "build_document_dag"]
+__all__ = ["DocumentNode", "DocumentDAG", "build_document_dag", "content_hash"]
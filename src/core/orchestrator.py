@@ -13,7 +13,6 @@ from time import perf_counter
 from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
 
 import logfire
-import tiktoken
 
 import config
 from agents.content_rewriter import run_content_rewriter
@@ -24,24 +23,28 @@ from agents.final_reviewer import run_final_reviewer
 from agents.learning_advisor import run_learning_advisor
 from agents.models import EditorFeedback
 from agents.planner import run_planner
+from agents.prompt_context import get_encoding
 from agents.researcher_web_node import run_researcher_web
+from agents.section_pipeline import (
+    cancel_sections,
+    run_pipelined_planner,
+    run_prefetching_planner,
+    run_section_weaver,
+)
 from agents.streaming import stream as publish
+from core.checkpoint import SqliteCheckpointManager
 from core.logging import get_logger
 from core.state import State
-from metrics.collector import MetricsCollector
-from metrics.repository import MetricsRepository
+from metrics.collector import get_metrics_collector
 from persistence import get_db_session
 from persistence.logs import compute_hash, log_action
 
 logger = get_logger()
 
-metrics = MetricsCollector(MetricsRepository(":memory:"))
+metrics = get_metrics_collector()
 
 settings = config.load_settings()
-try:
-    _ENCODING = tiktoken.encoding_for_model(settings.model_name)
-except KeyError:  # pragma: no cover - fallback for unknown models
-    _ENCODING = tiktoken.get_encoding("cl100k_base")
+_ENCODING = get_encoding(settings.model_name)
 
 
 def _token_count(payload: object) -> int:
@@ -146,20 +149,33 @@ PROGRESS_MESSAGES: Dict[str, str] = {
 
 
 def build_main_flow() -> List[Node]:
-    """Return the ordered list of nodes forming the primary pipeline."""
+    """Return the ordered list of nodes forming the primary pipeline.
+
+    With ``Settings.pipeline_sections`` the planner streams its outline and
+    sections are woven one module each, overlapping planning and weaving.
+    ``Settings.section_research`` also weaves one module per section, each
+    grounded in citations researched for that section in the background.
+    """
+
+    settings = config.load_settings()
+    planner, weaver = run_planner, run_content_weaver
+    if settings.pipeline_sections:
+        planner, weaver = run_pipelined_planner, run_section_weaver
+    elif settings.section_research:
+        planner, weaver = run_prefetching_planner, run_section_weaver
 
     def editor_condition(result: EditorFeedback, _state: State) -> Optional[str]:
         return "Content-Rewriter" if result.needs_revision else "Final-Reviewer"
 
     return [
         Node("Researcher-Web", wrap_with_tracing(run_researcher_web), "Planner"),
-        Node("Planner", wrap_with_tracing(run_planner), "Learning-Advisor"),
+        Node("Planner", wrap_with_tracing(planner), "Learning-Advisor"),
         Node(
             "Learning-Advisor",
             wrap_with_tracing(run_learning_advisor),
             "Content-Weaver",
         ),
-        Node("Content-Weaver", wrap_with_tracing(run_content_weaver), "Editor"),
+        Node("Content-Weaver", wrap_with_tracing(weaver), "Editor"),
         Node(
             "Editor",
             wrap_with_tracing(run_editor),
@@ -181,73 +197,153 @@ def build_main_flow() -> List[Node]:
 
 
 class GraphOrchestrator:
-    """Execute nodes sequentially according to the defined pipeline."""
+    """Execute nodes sequentially according to the defined pipeline.
+
+    Args:
+        flow: Ordered nodes forming the pipeline. The first node is the entry
+            point for fresh runs.
+        checkpointer: Optional checkpoint manager. When provided the state and
+            the name of each completed node are persisted in the background
+            after every node so that :meth:`resume` can pick up an interrupted
+            run.
+    """
 
-    def __init__(self, flow: List[Node]):
+    def __init__(
+        self,
+        flow: List[Node],
+        checkpointer: SqliteCheckpointManager | None = None,
+    ):
         self.flow = flow
         self._lookup: Dict[str, Node] = {n.name: n for n in self.flow}
+        self.checkpointer = checkpointer
 
-    async def run(self, state: State) -> State:
-        """Run the pipeline for ``state``."""
+    def _next_name(self, node: Node, result: Any, state: State) -> Optional[str]:
+        """Return the node following ``node`` and checkpoint the transition."""
 
-        current = self.flow[0]
-        while current:
+        next_name = node.next
+        if node.condition is not None:
             try:
-                result = await current.fn(state)
+                next_name = node.condition(result, state)
             except Exception:
-                logger.exception("Node %s failed", current.name)
+                logger.exception("Condition for %s failed", node.name)
                 raise
-            next_name = current.next
-            if current.condition is not None:
+        if self.checkpointer is not None:
+            self.checkpointer.save_in_background(
+                state, node=node.name, next_node=next_name
+            )
+        return next_name
+
+    def _start(self, start: Optional[str]) -> Node:
+        """Return the node named ``start`` or the flow's entry node."""
+
+        if start is None:
+            return self.flow[0]
+        return self._lookup[start]
+
+    async def run(self, state: State, start: Optional[str] = None) -> State:
+        """Run the pipeline for ``state``.
+
+        Section work started in the background by the planner is cancelled
+        when the run ends, whether it finished, failed or was cancelled.
+
+        Args:
+            state: Mutable state passed to every node.
+            start: Optional node name to begin from instead of the first node.
+        """
+
+        current: Optional[Node] = self._start(start)
+        try:
+            while current:
                 try:
-                    next_name = current.condition(result, state)
+                    result = await current.fn(state)
                 except Exception:
-                    logger.exception("Condition for %s failed", current.name)
+                    logger.exception("Node %s failed", current.name)
                     raise
-            if next_name is None:
-                break
-            current = self._lookup[next_name]
+                next_name = self._next_name(current, result, state)
+                if next_name is None:
+                    break
+                current = self._lookup[next_name]
+        finally:
+            cancel_sections(state)
+            if self.checkpointer is not None:
+                await self.checkpointer.flush()
         return state
 
-    async def stream(self, state: State):
+    async def resume(self, workspace_id: str) -> State:
+        """Continue the most recently checkpointed run for ``workspace_id``.
+
+        Execution restarts at the node following the last completed one. If
+        the checkpointed run had already finished the restored state is
+        returned unchanged.
+
+        Raises:
+            RuntimeError: If checkpointing is disabled or no checkpoint exists.
+        """
+
+        if self.checkpointer is None:
+            raise RuntimeError("Checkpointing is not enabled for this orchestrator")
+        state, next_node = await self.checkpointer.load_resume_point(workspace_id)
+        if next_node is None:
+            return state
+        logger.info("Resuming workspace %s at %s", workspace_id, next_node)
+        return await self.run(state, start=next_node)
+
+    async def stream(self, state: State, start: Optional[str] = None):
         """Yield progress events for each executed node.
 
         Events are also published to the in-process streaming broker so that
         subscribers receive real-time updates.
         """
 
-        current = self.flow[0]
+        current: Optional[Node] = self._start(start)
         workspace = getattr(state, "workspace_id", "default")
         topic = getattr(state, "prompt", "")
-        while current:
-            message_tpl = PROGRESS_MESSAGES.get(current.name)
-            if message_tpl:
-                text = message_tpl.format(topic=topic)
-                logger.info(text)
-                publish(f"{workspace}:messages", text)
-            publish(f"{workspace}:action", current.name)
-            yield {"type": "action", "payload": current.name}
-            try:
-                result = await current.fn(state)
-            except Exception:
-                logger.exception("Node %s failed", current.name)
-                raise
-            snapshot = state.to_dict()
-            publish(f"{workspace}:state", snapshot)
-            yield {"type": "state", "payload": snapshot}
-            next_name = current.next
-            if current.condition is not None:
+        try:
+            while current:
+                message_tpl = PROGRESS_MESSAGES.get(current.name)
+                if message_tpl:
+                    text = message_tpl.format(topic=topic)
+                    logger.info(text)
+                    publish(f"{workspace}:messages", text)
+                publish(f"{workspace}:action", current.name)
+                yield {"type": "action", "payload": current.name}
                 try:
-                    next_name = current.condition(result, state)
+                    result = await current.fn(state)
                 except Exception:
-                    logger.exception("Condition for %s failed", current.name)
+                    logger.exception("Node %s failed", current.name)
                     raise
-            if next_name is None:
-                break
-            current = self._lookup[next_name]
+                snapshot = state.to_dict()
+                publish(f"{workspace}:state", snapshot)
+                yield {"type": "state", "payload": snapshot}
+                next_name = self._next_name(current, result, state)
+                if next_name is None:
+                    break
+                current = self._lookup[next_name]
+        finally:
+            cancel_sections(state)
+            if self.checkpointer is not None:
+                await self.checkpointer.flush()
+
+
+def build_orchestrator(settings: config.Settings | None = None) -> GraphOrchestrator:
+    """Return an orchestrator for the main flow honouring ``settings``.
+
+    When ``enable_checkpoints`` is set, node checkpoints are written to
+    ``<data_dir>/checkpoints.db``.
+    """
+
+    settings = settings or config.load_settings()
+    checkpointer = None
+    if settings.enable_checkpoints:
+        settings.data_dir.mkdir(parents=True, exist_ok=True)
+        checkpointer = SqliteCheckpointManager(
+            str(settings.data_dir / "checkpoints.db"),
+            max_checkpoints=settings.max_checkpoints,
+        )
+    return GraphOrchestrator(build_main_flow(), checkpointer=checkpointer)
 
 
-graph_orchestrator = GraphOrchestrator(build_main_flow())
+graph_orchestrator = build_orchestrator(settings)
 
 graph = graph_orchestrator
 
@@ -255,6 +351,7 @@ __all__ = [
     "Node",
     "GraphOrchestrator",
     "build_main_flow",
+    "build_orchestrator",
     "graph_orchestrator",
     "graph",
     "metrics",
@@ -2,13 +2,19 @@
 
 from __future__ import annotations
 
-from typing import List, Literal
-from urllib.parse import urlparse
+from typing import Iterable, List, Literal, Protocol, TypeVar
 
 from agents.critics import CritiqueReport, FactCheckReport
+from agents.host_limits import canonical_url
 from agents.planner import PlanResult
-from core.state import Citation, State
-from web.researcher_web import CitationResult
+from core.state import State
+
+
+class _HasUrl(Protocol):
+    url: str
+
+
+ResultT = TypeVar("ResultT", bound=_HasUrl)
 
 
 def policy_retry_on_low_confidence(
@@ -82,29 +88,25 @@ def policy_retry_on_critic_failure(
     return should_retry
 
 
-def merge_research_results(results: List[CitationResult]) -> List[Citation]:
-    """Deduplicate and rank researcher web results.
+def merge_research_results(results: Iterable[ResultT]) -> List[ResultT]:
+    """Deduplicate researcher web results from parallel searches.
 
     Args:
-        results: List of raw :class:`CitationResult` objects from parallel
-            web searches.
+        results: Results carrying a ``url``, such as search drafts or fetched
+            :class:`~web.researcher_web.CitationResult` objects, concatenated
+            from several searches.
 
     Returns:
-        A list of unique :class:`Citation` instances preserving the first
-        occurrence order. URLs are canonicalized to avoid duplicates differing
-        only by scheme or trailing slashes.
+        The first result for each URL, preserving occurrence order. URLs are
+        compared by :func:`~agents.host_limits.canonical_url` so duplicates
+        differing only by scheme, ``www``, case, query or trailing slashes
+        collapse.
     """
 
-    seen: set[str] = set()
-    merged: list[Citation] = []
+    merged: dict[str, ResultT] = {}
     for item in results:
-        parsed = urlparse(item.url)
-        key = f"{parsed.netloc.lower()}{parsed.path.rstrip('/').lower()}"
-        if key in seen:
-            continue
-        seen.add(key)
-        merged.append(Citation(url=item.url))
-    return merged
+        merged.setdefault(canonical_url(str(item.url)), item)
+    return list(merged.values())
 
 
 def retry_tracker(state: State, agent_name: str) -> int:
@@ -1,36 +1,141 @@
-"""Utilities for selective content regeneration based on critic feedback."""
+"""Utilities for selective content regeneration based on critic feedback.
+
+Findings from the pedagogy critic and the fact checker are resolved to nodes
+of the :class:`~core.document_graph.DocumentDAG` (a module, a slide or a
+slide's speaker notes). Findings against a whole module re-weave that
+module; slide and speaker-note findings regenerate only the targeted
+slides, with their neighbours as context. All regeneration runs
+concurrently and the results are spliced back into ``state.modules`` in
+place. Afterwards only the checks whose inputs changed
+are re-run, and a lecture that was already exported is exported again.
+"""
 
 from __future__ import annotations
 
-from typing import List
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
 
-from agents.content_weaver import run_content_weaver
-from core.orchestrator import GraphOrchestrator, build_main_flow
-from core.state import State
+from agents.content_weaver import content_weaver, weave_slide
+from agents.editor import run_editor
+from agents.exporter import run_exporter
+from agents.fact_checker import run_fact_checker
+from agents.final_reviewer import run_final_reviewer
+from agents.models import Slide
+from agents.pedagogy_critic import run_pedagogy_critic
+from core.document_graph import build_document_dag
+from core.logging import get_logger
+from core.state import ActionLog, Module, State
 from models.critique_report import CritiqueReport
-from models.fact_check_report import FactCheckReport
+from models.fact_check_report import ClaimFlag, FactCheckReport, SentenceProbability
+
+logger = get_logger()
 
 SectionIdentifier = str
 MAX_RETRIES = 3
 
 
-def get_sections_to_regenerate(
-    report: CritiqueReport | FactCheckReport,
-) -> List[SectionIdentifier]:
-    """Extract identifiers for outline sections requiring regeneration.
+@dataclass(frozen=True, slots=True)
+class RegenerationTarget:
+    """A document node selected for regeneration.
 
-    Args:
-        report: Feedback report from a critic or fact checker.
+    Attributes:
+        node_id: DAG identifier, also used as the retry-count key.
+        module_id: Module containing the node.
+        kind: ``"module"``, ``"slide"`` or ``"speaker_notes"``.
+        slide_number: Slide within the module for slide-level targets.
+    """
 
-    Returns:
-        List of section identifiers derived from the report contents.
+    node_id: str
+    module_id: str
+    kind: str
+    slide_number: Optional[int] = None
+
+
+def _target(
+    module_id: str, slide_number: int | None, section: str | None
+) -> RegenerationTarget:
+    if slide_number is None or section == "summary":
+        return RegenerationTarget(module_id, module_id, "module")
+    slide_id = f"{module_id}-slide-{slide_number}"
+    if section == "speaker_notes":
+        return RegenerationTarget(
+            f"{slide_id}-speaker-notes", module_id, "speaker_notes", slide_number
+        )
+    return RegenerationTarget(slide_id, module_id, "slide", slide_number)
+
+
+def _finding_modules(
+    state: State, finding: SentenceProbability | ClaimFlag
+) -> List[str]:
+    """Return the ids of the modules ``finding`` points at.
+
+    Findings in woven content carry their module. Findings in the outline
+    are matched to the outline steps containing their text, and from there
+    to the module woven for each step.
+    """
+
+    if finding.module_id is not None:
+        return [finding.module_id]
+    text = getattr(finding, "sentence", None) or getattr(finding, "snippet", "")
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    steps = state.outline.steps if state.outline else []
+    return [
+        state.modules[index].id
+        for index, step in enumerate(steps[: len(state.modules)])
+        if any(line in step for line in lines)
+    ]
+
+
+def untargeted_findings(
+    state: State, report: FactCheckReport
+) -> List[SentenceProbability | ClaimFlag]:
+    """Return the findings of ``report`` that no module could be found for."""
+
+    return [
+        finding
+        for finding in [*report.hallucinations, *report.unsupported_claims]
+        if not _finding_modules(state, finding)
+    ]
+
+
+def resolve_targets(
+    state: State, report: CritiqueReport | FactCheckReport
+) -> List[RegenerationTarget]:
+    """Map report findings to the smallest affected document nodes.
+
+    Fact-check findings carry their module and slide; outline findings map
+    to the module of their outline step. Overloaded segments from the
+    pedagogy critic are matched to the module owning the activity. Slide
+    targets inside a module that is regenerated whole are dropped.
     """
+
+    targets: Dict[str, RegenerationTarget] = {}
     if isinstance(report, CritiqueReport):
-        return list(report.cognitive_load.overloaded_segments)
+        segments = set(report.cognitive_load.overloaded_segments)
+        for module in state.modules:
+            activities = getattr(module, "activities", None) or []
+            if any(act.description in segments for act in activities):
+                targets[module.id] = _target(module.id, None, None)
+    else:
+        for finding in [*report.hallucinations, *report.unsupported_claims]:
+            for module_id in _finding_modules(state, finding):
+                target = _target(module_id, finding.slide_number, finding.section)
+                targets.setdefault(target.node_id, target)
 
-    sections = {str(h.line_number) for h in report.hallucinations}
-    sections.update(str(c.line_number) for c in report.unsupported_claims)
-    return sorted(sections)
+    whole = {t.module_id for t in targets.values() if t.kind == "module"}
+    resolved = [
+        t for t in targets.values() if t.kind == "module" or t.module_id not in whole
+    ]
+    # Regenerating a slide already covers its speaker notes.
+    slides = {t.node_id for t in resolved if t.kind == "slide"}
+    return [
+        t
+        for t in resolved
+        if t.kind != "speaker_notes"
+        or t.node_id[: -len("-speaker-notes")] not in slides
+    ]
 
 
 def increment_retry_count(state: State, section_id: SectionIdentifier) -> None:
@@ -43,46 +148,171 @@ def has_exceeded_max_retries(state: State, section_id: SectionIdentifier) -> boo
     return state.retry_counts.get(section_id, 0) >= MAX_RETRIES
 
 
-async def apply_regeneration(state: State, sections: List[SectionIdentifier]) -> None:
-    """Invoke ``run_content_weaver`` for the specified sections."""
-    for section_id in sections:
-        try:
-            idx = int(section_id)
-        except ValueError:
-            continue
-        await run_content_weaver(state, section_id=idx)
+def _splice_slide(
+    slides: List[Slide], new: Slide | None, target: RegenerationTarget
+) -> List[Slide]:
+    if new is None:
+        return slides
+    result = []
+    for slide in slides:
+        if slide.slide_number != target.slide_number:
+            result.append(slide)
+        elif target.kind == "speaker_notes":
+            result.append(slide.model_copy(update={"speaker_notes": new.speaker_notes}))
+        else:
+            result.append(new.model_copy(update={"slide_number": slide.slide_number}))
+    return result
+
+
+async def _regenerate_module(
+    state: State, index: int, targets: Sequence[RegenerationTarget]
+) -> Module:
+    """Regenerate module ``index`` or only its targeted slides."""
+
+    module = state.modules[index]
+    if any(t.kind == "module" for t in targets):
+        steps = state.outline.steps if state.outline else []
+        section_id = index if index < len(steps) else None
+        weave = await content_weaver(state, section_id=section_id)
+        return Module(id=module.id, **weave.model_dump())
+    numbers = {slide.slide_number for slide in module.slides or []}
+    targets = [t for t in targets if t.slide_number in numbers]
+    fresh = await asyncio.gather(
+        *(
+            weave_slide(
+                state,
+                module,
+                t.slide_number,  # type: ignore[arg-type]
+                notes_only=t.kind == "speaker_notes",
+            )
+            for t in targets
+        )
+    )
+    slides = list(module.slides or [])
+    for target, slide in zip(targets, fresh):
+        slides = _splice_slide(slides, slide, target)
+    return module.model_copy(update={"slides": slides})
+
+
+async def apply_regeneration(
+    state: State, targets: Sequence[RegenerationTarget]
+) -> List[str]:
+    """Regenerate ``targets`` concurrently and replace modules in place.
+
+    Returns:
+        List[str]: Identifiers of modules whose content changed.
+    """
+
+    by_module: Dict[str, List[RegenerationTarget]] = {}
+    for target in targets:
+        by_module.setdefault(target.module_id, []).append(target)
+    if state.document_graph is None:
+        state.document_graph = build_document_dag(state.modules, state.research_results)
+        state.document_graph.clear_dirty()
+    positions = {m.id: i for i, m in enumerate(state.modules)}
+    jobs = [
+        (positions[mid], group) for mid, group in by_module.items() if mid in positions
+    ]
+    results = await asyncio.gather(
+        *(_regenerate_module(state, index, group) for index, group in jobs)
+    )
+    changed: List[str] = []
+    for (index, _), module in zip(jobs, results):
+        state.modules[index] = module
+        if state.document_graph.upsert_module(module):
+            changed.append(module.id)
+    return changed
+
+
+def _digest(parts: Sequence[str]) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _content_inputs(state: State) -> str:
+    return _digest([m.model_dump_json() for m in state.modules])
+
+
+def _pedagogy_inputs(state: State) -> str:
+    return _digest(
+        [
+            m.model_dump_json(include={"learning_objectives", "duration_min"})
+            + repr(getattr(m, "activities", None))
+            for m in state.modules
+        ]
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class DownstreamCheck:
+    """Check re-run after regeneration when the inputs it reads change.
+
+    Attributes:
+        name: Pipeline node name.
+        run: Coroutine function executing the check.
+        inputs: Digest of the state the check reads.
+        output: ``State`` attribute holding its result; checks that never
+            ran (attribute unset) are not started by regeneration.
+    """
+
+    name: str
+    run: Callable[[State], Awaitable[object]]
+    inputs: Callable[[State], str]
+    output: str
+
+
+DOWNSTREAM_CHECKS: List[DownstreamCheck] = [
+    DownstreamCheck("Editor", run_editor, _content_inputs, "editor_feedback"),
+    DownstreamCheck(
+        "Fact-Checker", run_fact_checker, _content_inputs, "factcheck_report"
+    ),
+    DownstreamCheck(
+        "Pedagogy-Critic", run_pedagogy_critic, _pedagogy_inputs, "critique_report"
+    ),
+    DownstreamCheck("Final-Reviewer", run_final_reviewer, _content_inputs, "qa_report"),
+]
 
 
 async def orchestrate_regeneration(
     state: State, report: CritiqueReport | FactCheckReport
 ) -> State:
-    """Select sections for rewriting and trigger regeneration.
+    """Select document nodes for rewriting and trigger regeneration.
 
     Args:
         state: Current application state.
-        report: Critic or fact-checker output used to choose sections.
+        report: Critic or fact-checker output used to choose nodes.
+
+    Findings that cannot be mapped to a module, such as outline findings
+    before any module was woven, are logged and recorded in ``state.log``.
 
     Returns:
-        Updated state after any regeneration triggers.
+        Updated state after any regeneration and re-run checks.
     """
-    sections = get_sections_to_regenerate(report)
-    to_regenerate: List[SectionIdentifier] = []
-    for section in sections:
-        if has_exceeded_max_retries(state, section):
+    if isinstance(report, FactCheckReport):
+        for finding in untargeted_findings(state, report):
+            text = getattr(finding, "sentence", None) or getattr(finding, "snippet", "")
+            logger.warning("Finding not targeted for regeneration: {}", text)
+            state.log.append(
+                ActionLog(message=f"Finding not targeted for regeneration: {text}")
+            )
+    to_regenerate: List[RegenerationTarget] = []
+    for target in resolve_targets(state, report):
+        if has_exceeded_max_retries(state, target.node_id):
             continue
-        increment_retry_count(state, section)
-        to_regenerate.append(section)
+        increment_retry_count(state, target.node_id)
+        to_regenerate.append(target)
     if not to_regenerate:
         return state
 
-    await apply_regeneration(state, to_regenerate)
-
-    flow = build_main_flow()
-    start_idx = next(
-        (i for i, node in enumerate(flow) if node.name == "Editor"),
-        None,
+    checks = [c for c in DOWNSTREAM_CHECKS if getattr(state, c.output) is not None]
+    before = {check.name: check.inputs(state) for check in checks}
+    changed = await apply_regeneration(state, to_regenerate)
+    await asyncio.gather(
+        *(
+            check.run(state)
+            for check in checks
+            if check.inputs(state) != before[check.name]
+        )
     )
-    if start_idx is not None:
-        regen_flow = flow[start_idx:]
-        await GraphOrchestrator(regen_flow).run(state)
+    if changed and getattr(state, "exports", None):
+        await run_exporter(state)
     return state
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from dataclasses import field as dc_field
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING, Dict, List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field, HttpUrl
 from pydantic.dataclasses import dataclass
@@ -17,11 +17,9 @@ from agents.models import (
     ResearchResult,
     WeaveResult,
 )
+from core.document_graph import DocumentDAG
 from models import CritiqueReport, FactCheckReport
 
-if TYPE_CHECKING:
-    from core.document_graph import DocumentDAG
-
 
 class Citation(BaseModel):
     """Reference to an external information source.
@@ -31,12 +29,16 @@ class Citation(BaseModel):
         title: Human readable name for the source.
         licence: Usage licence for the material.
         retrieved_at: ISO8601 timestamp when the source was accessed.
+        status_code: HTTP status returned when the URL was last verified.
+        verified_at: ISO8601 timestamp of that verification.
     """
 
     url: HttpUrl
     title: str | None = None
     licence: str | None = None
     retrieved_at: str | None = None
+    status_code: int | None = None
+    verified_at: str | None = None
 
 
 class Module(WeaveResult):
@@ -172,8 +174,6 @@ class State:
         Returns:
             State: New instance populated with ``raw`` values.
         """
-        from core.document_graph import DocumentDAG
-
         return cls(
             prompt=raw.get("prompt", ""),
             sources=[Citation(**c) for c in raw.get("sources", [])],
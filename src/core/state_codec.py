@@ -0,0 +1,209 @@
+"""Compact binary encoding for persisted :class:`~core.state.State` snapshots.
+
+Encoded payloads are laid out as::
+
+    MAGIC (4 bytes) | schema (1) | compression (1) | header length (4) |
+    header JSON | body
+
+The small uncompressed header carries ``prompt`` and ``version`` so callers
+listing snapshots can read them via :func:`read_header` without touching the
+(potentially multi-megabyte) body. The body holds the full
+:meth:`State.to_dict` payload, compressed with ``zstandard`` when installed
+and :mod:`zlib` otherwise. ``orjson`` is used for JSON encoding when
+available.
+
+Legacy rows written as plain ``json.dumps(state.to_dict())`` text are still
+accepted by :func:`decode_state` and :func:`read_header`, and can be rewritten
+in the new format with :func:`upgrade_payload`.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from core.state import State
+
+try:  # pragma: no cover - exercised when the optional dependency is present
+    import orjson
+except ImportError:  # pragma: no cover - fallback path
+    orjson = None  # type: ignore[assignment]
+
+try:  # pragma: no cover - exercised when the optional dependency is present
+    import zstandard
+except ImportError:  # pragma: no cover - fallback path
+    zstandard = None  # type: ignore[assignment]
+
+MAGIC = b"AGST"
+SCHEMA_VERSION = 1
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+
+_PREFIX = struct.Struct(">4sBBI")
+
+
+@dataclass(slots=True)
+class StateHeader:
+    """Metadata readable without decoding the full snapshot."""
+
+    prompt: str
+    version: int
+    schema: int
+
+
+def _dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, default=str)
+    return json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _compressor(compress: bool) -> tuple[int, Callable[[bytes], bytes]]:
+    if not compress:
+        return COMPRESSION_NONE, lambda data: data
+    if zstandard is not None:
+        return COMPRESSION_ZSTD, zstandard.ZstdCompressor(level=3).compress
+    return COMPRESSION_ZLIB, lambda data: zlib.compress(data, 6)
+
+
+def _decompress(method: int, data: bytes) -> bytes:
+    if method == COMPRESSION_NONE:
+        return data
+    if method == COMPRESSION_ZLIB:
+        return zlib.decompress(data)
+    if method == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise ValueError("payload is zstd-compressed but zstandard is missing")
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"unknown state compression {method}")
+
+
+def is_encoded(payload: bytes | str) -> bool:
+    """Return ``True`` if ``payload`` uses the binary snapshot format."""
+
+    if not isinstance(payload, (bytes, bytearray, memoryview)):
+        return False
+    return bytes(payload[:4]) == MAGIC
+
+
+def encode_state(state: State, *, compress: bool = True) -> bytes:
+    """Serialise ``state`` into the versioned binary snapshot format."""
+
+    return encode_dict(state.to_dict(), compress=compress)
+
+
+def encode_dict(raw: dict, *, compress: bool = True) -> bytes:
+    """Encode an already materialised :meth:`State.to_dict` payload."""
+
+    return encode_payload(
+        raw,
+        prompt=raw.get("prompt", ""),
+        version=raw.get("version", 1),
+        compress=compress,
+    )
+
+
+def encode_payload(
+    body: Any, *, prompt: str, version: int, compress: bool = True
+) -> bytes:
+    """Frame an arbitrary JSON ``body`` behind a ``prompt``/``version`` header.
+
+    Used for full snapshots and for the structural deltas written between
+    them, which share the header so version listings never need the body.
+    """
+
+    header = _dumps({"prompt": prompt, "version": version})
+    method, compressor = _compressor(compress)
+    data = compressor(_dumps(body))
+    return _PREFIX.pack(MAGIC, SCHEMA_VERSION, method, len(header)) + header + data
+
+
+def to_plain(raw: Any) -> Any:
+    """Return ``raw`` as the plain JSON types a decoded payload would hold."""
+
+    return _loads(_dumps(raw))
+
+
+def _split(payload: bytes) -> tuple[int, int, bytes, bytes]:
+    magic, schema, method, header_len = _PREFIX.unpack_from(payload)
+    if magic != MAGIC:
+        raise ValueError("payload is not an encoded state snapshot")
+    if schema > SCHEMA_VERSION:
+        raise ValueError(f"unsupported state schema {schema}")
+    start = _PREFIX.size
+    header = payload[start : start + header_len]
+    body = payload[start + header_len :]
+    return schema, method, header, body
+
+
+def read_header(payload: bytes | str) -> StateHeader:
+    """Return ``prompt`` and ``version`` without decoding the body.
+
+    Legacy JSON payloads are fully parsed since they carry no header.
+    """
+
+    if not is_encoded(payload):
+        raw = _loads(payload)
+        return StateHeader(
+            prompt=raw.get("prompt", ""), version=raw.get("version", 1), schema=0
+        )
+    schema, _, header, _ = _split(bytes(payload))
+    data = _loads(header)
+    return StateHeader(
+        prompt=data.get("prompt", ""), version=data.get("version", 1), schema=schema
+    )
+
+
+def decode_dict(payload: bytes | str) -> Any:
+    """Return the JSON body stored in ``payload``.
+
+    For full snapshots this is the raw :meth:`State.to_dict` mapping.
+    """
+
+    if not is_encoded(payload):
+        return _loads(payload)
+    _, method, _, body = _split(bytes(payload))
+    return _loads(_decompress(method, body))
+
+
+def decode_state(payload: bytes | str) -> State:
+    """Rehydrate a :class:`State` from a binary or legacy JSON payload."""
+
+    return State.from_dict(decode_dict(payload))
+
+
+def upgrade_payload(payload: bytes | str, *, compress: bool = True) -> bytes:
+    """Return ``payload`` in the current binary format.
+
+    Payloads already in the current schema are returned unchanged.
+    """
+
+    if is_encoded(payload) and read_header(payload).schema == SCHEMA_VERSION:
+        return bytes(payload)
+    return encode_dict(decode_dict(payload), compress=compress)
+
+
+__all__ = [
+    "MAGIC",
+    "SCHEMA_VERSION",
+    "StateHeader",
+    "decode_dict",
+    "decode_state",
+    "encode_dict",
+    "encode_payload",
+    "encode_state",
+    "is_encoded",
+    "read_header",
+    "to_plain",
+    "upgrade_payload",
+]
@@ -0,0 +1,113 @@
+"""Structural diffs between serialised :class:`~core.state.State` payloads.
+
+Deltas are expressed as a subset of RFC 6902 JSON Patch (``add``, ``remove``
+and ``replace``) over the plain mappings produced by
+:meth:`State.to_dict`. Lists that only grow, the common case as nodes append
+modules and research results, are encoded as appends rather than copies.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+PatchOp = Dict[str, Any]
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _diff_lists(old: list, new: list, path: str) -> List[PatchOp]:
+    common = min(len(old), len(new))
+    changed = sum(1 for i in range(common) if old[i] != new[i])
+    if common and changed * 2 > common:
+        # Mostly rewritten (e.g. an insertion shifting every element).
+        return [{"op": "replace", "path": path, "value": new}]
+    ops: List[PatchOp] = []
+    for idx in range(common):
+        ops.extend(diff(old[idx], new[idx], f"{path}/{idx}"))
+    for item in new[common:]:
+        ops.append({"op": "add", "path": f"{path}/-", "value": item})
+    for idx in range(len(old) - 1, common - 1, -1):
+        ops.append({"op": "remove", "path": f"{path}/{idx}"})
+    return ops
+
+
+def diff(old: Any, new: Any, path: str = "") -> List[PatchOp]:
+    """Return JSON Patch operations turning ``old`` into ``new``.
+
+    Both values must be plain JSON types, e.g. the output of
+    :func:`core.state_codec.to_plain`.
+    """
+
+    if old == new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: List[PatchOp] = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(diff(old[key], value, child))
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        return _diff_lists(old, new, path)
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def _resolve(doc: Any, tokens: List[str]) -> Any:
+    target = doc
+    for token in tokens:
+        target = target[int(token)] if isinstance(target, list) else target[token]
+    return target
+
+
+def apply(doc: Any, ops: List[PatchOp]) -> Any:
+    """Apply ``ops`` to ``doc`` in place and return the patched document.
+
+    Values are inserted without copying, so ``ops`` should not be reused.
+    """
+
+    result = doc
+    for op in ops:
+        path = op["path"]
+        if path == "":
+            if op["op"] == "remove":
+                raise ValueError("cannot remove the document root")
+            result = op["value"]
+            continue
+        tokens = [_unescape(t) for t in path.split("/")[1:]]
+        parent = _resolve(result, tokens[:-1])
+        last = tokens[-1]
+        kind = op["op"]
+        if isinstance(parent, list):
+            if kind == "add":
+                if last == "-":
+                    parent.append(op["value"])
+                else:
+                    parent.insert(int(last), op["value"])
+            elif kind == "remove":
+                del parent[int(last)]
+            elif kind == "replace":
+                parent[int(last)] = op["value"]
+            else:
+                raise ValueError(f"unsupported patch op {kind}")
+        else:
+            if kind in {"add", "replace"}:
+                parent[last] = op["value"]
+            elif kind == "remove":
+                del parent[last]
+            else:
+                raise ValueError(f"unsupported patch op {kind}")
+    return result
+
+
+__all__ = ["PatchOp", "apply", "diff"]
@@ -3,14 +3,14 @@
 from __future__ import annotations
 
 import io
-import json
-import sqlite3
 from typing import List
 
 from docx import Document as DocumentFactory
 from docx.document import Document
 
-from agents.models import AssessmentItem, Citation, Slide, WeaveResult
+from agents.models import Citation, WeaveResult
+
+from .lecture_loader import get_lecture_loader
 
 
 class DocxExporter:
@@ -22,8 +22,7 @@ class DocxExporter:
     def export(self, workspace_id: str) -> bytes:
         """Return a DOCX document for ``workspace_id`` as bytes."""
 
-        with sqlite3.connect(self._db_path) as conn:
-            lecture = self._load_lecture(conn, workspace_id)
+        lecture = get_lecture_loader(str(self._db_path)).load(workspace_id)
 
         doc = DocumentFactory()
         self.generate_cover_page(doc, lecture)
@@ -34,36 +33,6 @@ class DocxExporter:
         doc.save(buf)
         return buf.getvalue()
 
-    @staticmethod
-    def _load_lecture(conn: sqlite3.Connection, workspace_id: str) -> WeaveResult:
-        cur = conn.execute(
-            "SELECT lecture_json FROM lectures WHERE workspace_id = ? ORDER BY"
-            " created_at DESC LIMIT 1",
-            (workspace_id,),
-        )
-        row = cur.fetchone()
-        cur.close()
-        if row is None:
-            raise ValueError("lecture not found")
-        data = json.loads(row[0])
-        slides = [Slide(**s) for s in data.get("slides", [])]
-        assessment = [AssessmentItem(**a) for a in data.get("assessment", [])]
-        references = [Citation(**c) for c in data.get("references", [])]
-        return WeaveResult(
-            title=data["title"],
-            learning_objectives=data.get("learning_objectives", []),
-            duration_min=data.get("duration_min", 0),
-            author=data.get("author"),
-            date=data.get("date"),
-            version=data.get("version"),
-            summary=data.get("summary"),
-            tags=data.get("tags"),
-            prerequisites=data.get("prerequisites"),
-            slides=slides or None,
-            assessment=assessment or None,
-            references=references or None,
-        )
-
     @staticmethod
     def generate_cover_page(doc: Document, lecture: WeaveResult) -> None:
         """Insert a simple title page based on ``lecture``."""
@@ -0,0 +1,120 @@
+"""Shared lookup of the latest persisted lecture for a workspace."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Optional, Tuple
+
+from agents.models import AssessmentItem, Citation, Slide, WeaveResult
+
+
+def parse_lecture(data: dict[str, Any]) -> WeaveResult:
+    """Build a :class:`WeaveResult` from a stored ``lecture_json`` mapping."""
+
+    slides = [Slide(**s) for s in data.get("slides", [])]
+    assessment = [AssessmentItem(**a) for a in data.get("assessment", [])]
+    references = [Citation(**c) for c in data.get("references", [])]
+    return WeaveResult(
+        title=data["title"],
+        learning_objectives=data.get("learning_objectives", []),
+        duration_min=data.get("duration_min", 0),
+        author=data.get("author"),
+        date=data.get("date"),
+        version=data.get("version"),
+        summary=data.get("summary"),
+        tags=data.get("tags"),
+        prerequisites=data.get("prerequisites"),
+        slides=slides or None,
+        assessment=assessment or None,
+        references=references or None,
+    )
+
+
+class LectureLoader:
+    """Load lectures from ``db_path`` with a parsed-result cache.
+
+    Lectures are append-only, so the ``rowid`` of the newest row identifies
+    its content. :meth:`latest_id` answers from the
+    ``(workspace_id, created_at)`` index without touching ``lecture_json``;
+    :meth:`load` parses a lecture once and serves repeat exports from memory.
+    Cached results are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 64) -> None:
+        self._db_path = db_path
+        self._max_entries = max_entries
+        self._cache: OrderedDict[Tuple[str, int], WeaveResult] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def latest_id(self, workspace_id: str) -> Optional[int]:
+        """Return the id of the newest lecture for ``workspace_id``, if any."""
+
+        with sqlite3.connect(self._db_path) as conn:
+            return self._latest_id(conn, workspace_id)
+
+    @staticmethod
+    def _latest_id(conn: sqlite3.Connection, workspace_id: str) -> Optional[int]:
+        cur = conn.execute(
+            "SELECT rowid FROM lectures WHERE workspace_id = ?"
+            " ORDER BY created_at DESC, rowid DESC LIMIT 1",
+            (workspace_id,),
+        )
+        row = cur.fetchone()
+        cur.close()
+        return None if row is None else int(row[0])
+
+    def load(self, workspace_id: str) -> WeaveResult:
+        """Return the newest lecture for ``workspace_id``.
+
+        Raises:
+            ValueError: If the workspace has no stored lecture.
+        """
+
+        with sqlite3.connect(self._db_path) as conn:
+            lecture_id = self._latest_id(conn, workspace_id)
+            if lecture_id is None:
+                raise ValueError("lecture not found")
+            key = (workspace_id, lecture_id)
+            with self._lock:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    return cached
+            cur = conn.execute(
+                "SELECT lecture_json FROM lectures WHERE rowid = ?", (lecture_id,)
+            )
+            row = cur.fetchone()
+            cur.close()
+        if row is None:
+            raise ValueError("lecture not found")
+        lecture = parse_lecture(json.loads(row[0]))
+        with self._lock:
+            self._cache[key] = lecture
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+        return lecture
+
+    def invalidate(self, workspace_id: Optional[str] = None) -> None:
+        """Drop cached lectures for ``workspace_id`` or for every workspace."""
+
+        with self._lock:
+            if workspace_id is None:
+                self._cache.clear()
+                return
+            for key in [k for k in self._cache if k[0] == workspace_id]:
+                del self._cache[key]
+
+
+@lru_cache(maxsize=None)
+def get_lecture_loader(db_path: str) -> LectureLoader:
+    """Return the process-wide :class:`LectureLoader` for ``db_path``."""
+
+    return LectureLoader(db_path)
+
+
+__all__ = ["LectureLoader", "get_lecture_loader", "parse_lecture"]
@@ -11,8 +11,9 @@ def export_citations_json(db_path: str, workspace_id: str) -> bytes:
     """Serialize citation records for ``workspace_id`` to JSON bytes."""
     with sqlite3.connect(db_path) as conn:
         cur = conn.execute(
-            "SELECT url, title, retrieved_at, licence FROM citations WHERE workspace_id"
-            " = ? ORDER BY rowid",
+            "SELECT s.url, s.title, s.retrieved_at, s.licence"
+            " FROM workspace_citations w JOIN sources s ON s.id = w.source_id"
+            " WHERE w.workspace_id = ? ORDER BY w.id",
             (workspace_id,),
         )
         rows = cur.fetchall()
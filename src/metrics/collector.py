@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from datetime import datetime
+from functools import lru_cache
 from typing import List
 
 from .models import MetricRecord
@@ -33,3 +34,10 @@ class MetricsCollector:
         for record in self._buffer:
             self._repo.save(record)
         self._buffer.clear()
+
+
+@lru_cache(maxsize=1)
+def get_metrics_collector() -> MetricsCollector:
+    """Return the process-wide collector shared by nodes and agents."""
+
+    return MetricsCollector(MetricsRepository(":memory:"))
@@ -3,26 +3,39 @@
 from __future__ import annotations
 
 from dataclasses import asdict, field
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
 
 from pydantic.dataclasses import dataclass
 
 
 @dataclass(slots=True)
 class SentenceProbability:
-    """Confidence score for a sentence."""
+    """Confidence score for a sentence.
+
+    ``module_id``, ``slide_number`` and ``section`` locate the sentence in
+    woven content; they are ``None`` for free text such as outline steps.
+    """
 
     line_number: int
     sentence: str
     probability: float
+    module_id: Optional[str] = None
+    slide_number: Optional[int] = None
+    section: Optional[str] = None
 
 
 @dataclass(slots=True)
 class ClaimFlag:
-    """Marker for a potential unsupported claim."""
+    """Marker for a potential unsupported claim.
+
+    Location fields mirror those on :class:`SentenceProbability`.
+    """
 
     line_number: int
     snippet: str
+    module_id: Optional[str] = None
+    slide_number: Optional[int] = None
+    section: Optional[str] = None
 
 
 @dataclass(slots=True)
@@ -1,11 +1,19 @@
-"""SQLite-backed action log utilities."""
+"""SQLite-backed action log utilities.
+
+Action logs are append-only. Queries filter on the raw ``timestamp`` column
+so they are served by the composite ``(workspace_id, timestamp)`` index, and
+large result sets are paged or streamed by keyset on ``(timestamp, id)``
+rather than loaded at once.
+"""
 
 from __future__ import annotations
 
+import base64
 import hashlib
 import json
-from datetime import date, datetime
-from typing import Any, List
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
 import aiosqlite
 
@@ -57,34 +65,193 @@ async def log_action(
     await conn.commit()
 
 
+# Columns returned by every log query, in ``ActionLog`` field order.
+_COLUMNS = "workspace_id, agent_name, input_hash, output_hash, tokens, cost, timestamp"
+
+
+@dataclass(slots=True)
+class LogPage:
+    """One page of action logs.
+
+    Attributes:
+        entries: Logs in chronological order.
+        next_cursor: Token for the following page, or ``None`` on the last one.
+    """
+
+    entries: List[ActionLog]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(timestamp: str, row_id: int) -> str:
+    """Return an opaque token resuming after the log at ``timestamp``/``row_id``."""
+
+    raw = json.dumps([timestamp, row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[str, int]:
+    """Return the ``(timestamp, id)`` position encoded in ``token``.
+
+    Raises:
+        ValueError: If ``token`` was not produced by :func:`encode_cursor`.
+    """
+
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        timestamp, row_id = json.loads(raw)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("invalid log cursor") from exc
+    if not isinstance(timestamp, str) or not isinstance(row_id, int):
+        raise ValueError("invalid log cursor")
+    return timestamp, row_id
+
+
+def _bound(value: date | datetime) -> str:
+    """Return ``value`` in the ISO format timestamps are stored in.
+
+    Stored timestamps are naive UTC, so aware datetimes are converted to UTC
+    and stripped of their offset before comparison.
+    """
+
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+def _filters(
+    workspace_id: str,
+    start: date | datetime | None,
+    end: date | datetime | None,
+    agent: str | None,
+    after: Tuple[str, int] | None,
+) -> Tuple[str, List[Any]]:
+    """Return a ``WHERE`` clause and its parameters for a log query.
+
+    Every condition compares the raw ``timestamp`` column, so lookups use
+    the ``(workspace_id, timestamp)`` and ``(workspace_id, agent_name,
+    timestamp)`` indexes. ``start`` is inclusive and ``end`` exclusive.
+    """
+
+    clauses = ["workspace_id = ?"]
+    params: List[Any] = [workspace_id]
+    if agent is not None:
+        clauses.append("agent_name = ?")
+        params.append(agent)
+    if start is not None:
+        clauses.append("timestamp >= ?")
+        params.append(_bound(start))
+    if end is not None:
+        clauses.append("timestamp < ?")
+        params.append(_bound(end))
+    if after is not None:
+        clauses.append("(timestamp, id) > (?, ?)")
+        params.extend(after)
+    return " AND ".join(clauses), params
+
+
+def _to_log(row: Sequence[Any]) -> ActionLog:
+    return ActionLog(
+        workspace_id=row[0],
+        agent_name=row[1],
+        input_hash=row[2],
+        output_hash=row[3],
+        tokens=row[4],
+        cost=row[5],
+        timestamp=datetime.fromisoformat(row[6]),
+    )
+
+
+async def query_logs(
+    conn: aiosqlite.Connection,
+    workspace_id: str,
+    *,
+    start: date | datetime | None = None,
+    end: date | datetime | None = None,
+    agent: str | None = None,
+    cursor: str | None = None,
+    limit: int = 100,
+) -> LogPage:
+    """Return one page of logs for ``workspace_id`` in chronological order.
+
+    Pages are addressed by keyset: ``cursor`` is the ``next_cursor`` of the
+    previous page, so every page costs the same however deep it is.
+
+    Raises:
+        ValueError: If ``cursor`` is malformed.
+    """
+
+    after = decode_cursor(cursor) if cursor else None
+    where, params = _filters(workspace_id, start, end, agent, after)
+    cur = await conn.execute(
+        f"SELECT {_COLUMNS}, id FROM action_logs WHERE {where}"
+        " ORDER BY timestamp, id LIMIT ?",
+        (*params, limit + 1),
+    )
+    rows = await cur.fetchall()
+    await cur.close()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][6], rows[-1][7])
+    return LogPage(entries=[_to_log(row) for row in rows], next_cursor=next_cursor)
+
+
+async def iter_logs(
+    conn: aiosqlite.Connection,
+    workspace_id: str,
+    *,
+    start: date | datetime | None = None,
+    end: date | datetime | None = None,
+    agent: str | None = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield matching logs as plain dicts, oldest first.
+
+    Rows are read in keyset batches of ``batch_size``, so memory use does not
+    depend on how many logs match.
+    """
+
+    after: Tuple[str, int] | None = None
+    while True:
+        where, params = _filters(workspace_id, start, end, agent, after)
+        cur = await conn.execute(
+            f"SELECT {_COLUMNS}, id FROM action_logs WHERE {where}"
+            " ORDER BY timestamp, id LIMIT ?",
+            (*params, batch_size),
+        )
+        rows = await cur.fetchall()
+        await cur.close()
+        for row in rows:
+            yield {
+                "id": row[7],
+                "workspace_id": row[0],
+                "agent_name": row[1],
+                "input_hash": row[2],
+                "output_hash": row[3],
+                "tokens": row[4],
+                "cost": row[5],
+                "timestamp": row[6],
+            }
+        if len(rows) < batch_size:
+            return
+        after = (rows[-1][6], rows[-1][7])
+
+
 async def get_logs(
     conn: aiosqlite.Connection,
     workspace_id: str,
     date_from: date,
     date_to: date,
 ) -> List[ActionLog]:
-    """Return logs for ``workspace_id`` within the date range."""
+    """Return logs for ``workspace_id`` within the date range (inclusive)."""
 
+    where, params = _filters(
+        workspace_id, date_from, date_to + timedelta(days=1), None, None
+    )
     cur = await conn.execute(
-        """
-        SELECT workspace_id, agent_name, input_hash, output_hash, tokens, cost, timestamp
-        FROM action_logs
-        WHERE workspace_id = ? AND date(timestamp) BETWEEN ? AND ?
-        ORDER BY timestamp
-        """,
-        (workspace_id, date_from.isoformat(), date_to.isoformat()),
+        f"SELECT {_COLUMNS} FROM action_logs WHERE {where} ORDER BY timestamp, id",
+        params,
     )
     rows = await cur.fetchall()
     await cur.close()
-    return [
-        ActionLog(
-            workspace_id=row[0],
-            agent_name=row[1],
-            input_hash=row[2],
-            output_hash=row[3],
-            tokens=row[4],
-            cost=row[5],
-            timestamp=datetime.fromisoformat(row[6]),
-        )
-        for row in rows
-    ]
+    return [_to_log(row) for row in rows]
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
 from typing import Optional, Tuple
 
@@ -10,6 +11,7 @@ import aiosqlite
 from config import Settings
 from core.state import Outline, State
 
+from .parquet_archive import LectureArchive
 from .parquet_serializer import ParquetSerializer
 from .repos.document_repo import DocumentRepo
 from .repos.state_repo import StateRepo
@@ -27,6 +29,7 @@ class PersistenceManager:
             raise ValueError("PersistenceManager supports only SQLite.")
         self._db_path: Path = Path(db_url.replace("sqlite:///", ""))
         self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._archive = LectureArchive(settings.data_dir / "archive")
 
     async def checkpoint(self, state: State, outline: Outline) -> None:
         """Persist ``state`` and ``outline`` as a new version."""
@@ -50,3 +53,16 @@ class PersistenceManager:
             blob = await doc_repo.load_latest_document(version)
             outline = ParquetSerializer.deserialize_outline(blob)
             return state, outline
+
+    async def archive(self, state: State, lecture_id: str) -> dict[str, int]:
+        """Append ``state`` to the columnar lecture archive.
+
+        Returns:
+            dict[str, int]: Rows written per archive table.
+        """
+        return await asyncio.to_thread(
+            self._archive.write,
+            state,
+            workspace_id=getattr(state, "workspace_id", "default"),
+            lecture_id=lecture_id,
+        )
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel, HttpUrl
 
@@ -15,6 +15,8 @@ class Citation(BaseModel):
     title: str
     retrieved_at: datetime
     licence: str
+    status_code: Optional[int] = None
+    verified_at: Optional[datetime] = None
 
 
 class CachedSearchResult(BaseModel):
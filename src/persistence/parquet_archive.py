@@ -0,0 +1,215 @@
+"""Columnar Parquet archive of generated lecture content.
+
+Each archived lecture is flattened into five typed tables (modules, slides,
+activities, research results and citations) defined in
+:mod:`persistence.parquet_schema`. Tables are written as Hive-partitioned
+datasets under ``<root>/<table>/workspace_id=<id>/lecture_id=<id>/`` so
+analytical queries only open the files for the workspaces they ask for, and
+filters on the remaining columns, including the archive ``date``, are pushed
+down to Parquet row group statistics. Archiving a lecture again replaces its
+partition, so each lecture is stored once with its latest content.
+"""
+
+from __future__ import annotations
+
+import shutil
+import uuid
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from core.state import State
+
+from .parquet_schema import ARCHIVE_SCHEMAS
+
+_PARTITIONING = ds.partitioning(
+    pa.schema([("workspace_id", pa.string()), ("lecture_id", pa.string())]),
+    flavor="hive",
+)
+
+
+def _module_rows(state: State) -> Dict[str, List[Dict[str, Any]]]:
+    rows: Dict[str, List[Dict[str, Any]]] = {
+        "modules": [],
+        "slides": [],
+        "activities": [],
+    }
+    for module in state.modules:
+        slides = module.slides or []
+        rows["modules"].append(
+            {
+                "module_id": module.id,
+                "title": module.title,
+                "session_type": module.session_type,
+                "duration_min": module.duration_min,
+                "summary": module.summary,
+                "learning_objectives": module.learning_objectives,
+                "tags": module.tags,
+                "slide_count": len(slides),
+            }
+        )
+        for slide in slides:
+            rows["slides"].append(
+                {
+                    "module_id": module.id,
+                    "slide_number": slide.slide_number,
+                    "bullet_points": slide.copy.bullet_points if slide.copy else [],
+                    "visualization": (
+                        slide.visualization.notes if slide.visualization else None
+                    ),
+                    "speaker_notes": (
+                        slide.speaker_notes.notes if slide.speaker_notes else None
+                    ),
+                }
+            )
+        for activity in getattr(module, "activities", None) or []:
+            rows["activities"].append({"module_id": module.id, **activity.model_dump()})
+    return rows
+
+
+def _state_rows(state: State) -> Dict[str, List[Dict[str, Any]]]:
+    rows = _module_rows(state)
+    rows["research_results"] = [r.model_dump() for r in state.research_results]
+    rows["citations"] = [
+        {
+            "url": str(c.url),
+            "title": c.title,
+            "licence": c.licence,
+            "retrieved_at": c.retrieved_at,
+        }
+        for c in state.sources
+    ]
+    return rows
+
+
+class LectureArchive:
+    """Write and query the partitioned lecture archive rooted at ``root``."""
+
+    def __init__(self, root: Path | str) -> None:
+        self._root = Path(root)
+
+    def write(
+        self,
+        state: State,
+        *,
+        workspace_id: str,
+        lecture_id: str,
+        archived_at: Optional[datetime] = None,
+    ) -> Dict[str, int]:
+        """Write the content of ``state`` to every archive table.
+
+        Rows previously archived for ``lecture_id`` are replaced.
+
+        Args:
+            state: Completed pipeline state to archive.
+            workspace_id: Workspace partition the rows belong to.
+            lecture_id: Persisted lecture the rows belong to; one partition
+                per lecture.
+            archived_at: Timestamp recorded on each row. Defaults to now.
+
+        Returns:
+            Dict[str, int]: Number of rows written per table.
+        """
+        stamp = archived_at or datetime.now(timezone.utc)
+        keys = {
+            "workspace_id": workspace_id,
+            "date": stamp.date().isoformat(),
+            "lecture_id": lecture_id,
+            "archived_at": stamp,
+        }
+        written: Dict[str, int] = {}
+        for name, rows in _state_rows(state).items():
+            written[name] = len(rows)
+            if not rows:
+                # Nothing replaces the old rows, so drop the stale partition.
+                shutil.rmtree(
+                    self._root
+                    / name
+                    / f"workspace_id={workspace_id}"
+                    / f"lecture_id={lecture_id}",
+                    ignore_errors=True,
+                )
+                continue
+            table = pa.Table.from_pylist(
+                [{**keys, **row} for row in rows], schema=ARCHIVE_SCHEMAS[name]
+            )
+            ds.write_dataset(
+                table,
+                self._root / name,
+                format="parquet",
+                partitioning=_PARTITIONING,
+                basename_template=f"{uuid.uuid4().hex}-{{i}}.parquet",
+                existing_data_behavior="delete_matching",
+            )
+        return written
+
+    def dataset(self, name: str) -> ds.Dataset:
+        """Return the Arrow dataset backing archive table ``name``."""
+        schema = ARCHIVE_SCHEMAS[name]
+        path = self._root / name
+        if not path.exists():
+            return ds.dataset(pa.Table.from_pylist([], schema=schema))
+        return ds.dataset(
+            path, schema=schema, format="parquet", partitioning=_PARTITIONING
+        )
+
+    def scan(
+        self,
+        name: str,
+        *,
+        workspace_id: Optional[str] = None,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        filter: Optional[ds.Expression] = None,
+        columns: Optional[Iterable[str]] = None,
+    ) -> pa.Table:
+        """Read rows from ``name`` matching the given predicates.
+
+        ``workspace_id`` prunes partition directories; the ``since``/``until``
+        dates and ``filter``, an Arrow expression, are pushed down into the
+        Parquet scan.
+        """
+        expr = filter
+        clauses = []
+        if workspace_id is not None:
+            clauses.append(ds.field("workspace_id") == workspace_id)
+        if since is not None:
+            clauses.append(ds.field("date") >= since.isoformat())
+        if until is not None:
+            clauses.append(ds.field("date") <= until.isoformat())
+        for clause in clauses:
+            expr = clause if expr is None else expr & clause
+        return self.dataset(name).to_table(
+            columns=list(columns) if columns is not None else None, filter=expr
+        )
+
+    def slides_mentioning(
+        self, term: str, *, workspace_id: Optional[str] = None
+    ) -> pa.Table:
+        """Return slides whose bullet points or speaker notes mention ``term``.
+
+        Matching is case-insensitive.
+        """
+        table = self.scan("slides", workspace_id=workspace_id)
+        if table.num_rows == 0:
+            return table
+        notes = pc.fill_null(
+            pc.match_substring(table["speaker_notes"], term, ignore_case=True),
+            False,
+        )
+        bullets = pc.list_flatten(table["bullet_points"])
+        hits = pc.match_substring(bullets, term, ignore_case=True)
+        parents = pc.list_parent_indices(table["bullet_points"])
+        matched = pc.unique(pc.filter(parents, hits)).to_pylist()
+        in_bullets = pc.is_in(
+            pa.array(range(table.num_rows), pa.int64()),
+            value_set=pa.array(matched, pa.int64()),
+        )
+        return table.filter(pc.or_(notes, in_bullets))
+
+
+__all__ = ["LectureArchive"]
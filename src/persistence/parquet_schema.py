@@ -11,3 +11,78 @@ OUTLINE_SCHEMA = pa.schema(
         ("steps", pa.list_(pa.string())),
     ]
 )
+
+# Columns shared by every archive table. ``workspace_id`` and ``lecture_id``
+# are written as Hive-style partition directories rather than stored in the
+# files.
+_ARCHIVE_KEYS = [
+    ("workspace_id", pa.string()),
+    ("date", pa.string()),
+    ("lecture_id", pa.string()),
+    ("archived_at", pa.timestamp("us", tz="UTC")),
+]
+
+MODULE_SCHEMA = pa.schema(
+    _ARCHIVE_KEYS
+    + [
+        ("module_id", pa.string()),
+        ("title", pa.string()),
+        ("session_type", pa.string()),
+        ("duration_min", pa.int32()),
+        ("summary", pa.string()),
+        ("learning_objectives", pa.list_(pa.string())),
+        ("tags", pa.list_(pa.string())),
+        ("slide_count", pa.int32()),
+    ]
+)
+
+SLIDE_SCHEMA = pa.schema(
+    _ARCHIVE_KEYS
+    + [
+        ("module_id", pa.string()),
+        ("slide_number", pa.int32()),
+        ("bullet_points", pa.list_(pa.string())),
+        ("visualization", pa.string()),
+        ("speaker_notes", pa.string()),
+    ]
+)
+
+ACTIVITY_SCHEMA = pa.schema(
+    _ARCHIVE_KEYS
+    + [
+        ("module_id", pa.string()),
+        ("type", pa.string()),
+        ("description", pa.string()),
+        ("duration_min", pa.int32()),
+        ("learning_objectives", pa.list_(pa.string())),
+    ]
+)
+
+RESEARCH_SCHEMA = pa.schema(
+    _ARCHIVE_KEYS
+    + [
+        ("url", pa.string()),
+        ("title", pa.string()),
+        ("snippet", pa.string()),
+        ("keywords", pa.list_(pa.string())),
+    ]
+)
+
+CITATION_SCHEMA = pa.schema(
+    _ARCHIVE_KEYS
+    + [
+        ("url", pa.string()),
+        ("title", pa.string()),
+        ("licence", pa.string()),
+        ("retrieved_at", pa.string()),
+    ]
+)
+
+# Archive table name -> schema, in the order tables are written.
+ARCHIVE_SCHEMAS = {
+    "modules": MODULE_SCHEMA,
+    "slides": SLIDE_SCHEMA,
+    "activities": ACTIVITY_SCHEMA,
+    "research_results": RESEARCH_SCHEMA,
+    "citations": CITATION_SCHEMA,
+}
@@ -28,8 +28,10 @@ class ParquetSerializer:
     def deserialize_outline(blob: bytes) -> Outline:
         """Deserialise ``blob`` back into an :class:`Outline` using the fixed schema."""
         source = io.BytesIO(blob)
-        table = pq.read_table(source)
-        table = table.cast(OUTLINE_SCHEMA)
+        # Outline blobs hold a single row, so only the first row group and
+        # the ``steps`` column need decoding.
+        table = pq.ParquetFile(source).read_row_group(0, columns=["steps"])
+        table = table.slice(0, 1).cast(OUTLINE_SCHEMA)
         data: Any = table.to_pylist()[0]
         steps = data.get("steps", [])
         return Outline(steps=steps)
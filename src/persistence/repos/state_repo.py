@@ -2,16 +2,29 @@
 
 from __future__ import annotations
 
-import json
 from datetime import datetime
 
 import aiosqlite
 
-from ...core.state import State
+from core.state import State
+from core.state_codec import (
+    StateHeader,
+    decode_state,
+    encode_state,
+    is_encoded,
+    read_header,
+    upgrade_payload,
+)
 
 
 class StateRepo:
-    """CRUD helpers for the ``state`` table."""
+    """CRUD helpers for the ``state`` table.
+
+    Payloads are written in the binary format from :mod:`core.state_codec`.
+    The ``payload_json`` column keeps its historical name; rows written before
+    the codec existed still decode and can be converted with
+    :meth:`migrate_legacy_payloads`.
+    """
 
     def __init__(self, conn: aiosqlite.Connection) -> None:
         self._conn = conn
@@ -22,7 +35,7 @@ class StateRepo:
         The state's ``version`` is used as both the ``id`` and ``version``
         columns, enabling deterministic lookups.
         """
-        payload = json.dumps(state.to_dict())
+        payload = encode_state(state)
         now = datetime.utcnow().isoformat()
         await self._conn.execute(
             """
@@ -47,8 +60,7 @@ class StateRepo:
         await cur.close()
         if row is None:
             raise ValueError("no state rows found")
-        data = json.loads(row[0])
-        return State.from_dict(data)
+        return decode_state(row[0])
 
     async def get_state_by_version(self, version: int) -> State:
         """Load a specific state version."""
@@ -60,8 +72,7 @@ class StateRepo:
         await cur.close()
         if row is None:
             raise ValueError(f"state version {version} not found")
-        data = json.loads(row[0])
-        return State.from_dict(data)
+        return decode_state(row[0])
 
     async def list_versions(self) -> list[int]:
         """Return all persisted state versions sorted ascending."""
@@ -69,3 +80,32 @@ class StateRepo:
         rows = await cur.fetchall()
         await cur.close()
         return [row[0] for row in rows]
+
+    async def get_header(self, version: int) -> StateHeader:
+        """Return ``prompt`` and ``version`` for ``version`` without a full load."""
+        cur = await self._conn.execute(
+            "SELECT payload_json FROM state WHERE version = ?",
+            (version,),
+        )
+        row = await cur.fetchone()
+        await cur.close()
+        if row is None:
+            raise ValueError(f"state version {version} not found")
+        return read_header(row[0])
+
+    async def migrate_legacy_payloads(self) -> int:
+        """Re-encode JSON payloads in the binary format and return the count."""
+        cur = await self._conn.execute("SELECT id, payload_json FROM state")
+        rows = await cur.fetchall()
+        await cur.close()
+        converted = 0
+        for row_id, payload in rows:
+            if is_encoded(payload):
+                continue
+            await self._conn.execute(
+                "UPDATE state SET payload_json = ? WHERE id = ?",
+                (upgrade_payload(payload), row_id),
+            )
+            converted += 1
+        await self._conn.commit()
+        return converted
@@ -1,82 +1,147 @@
-"""Repository for managing citations."""
+"""Repository for managing citations.
+
+Source metadata is stored once per URL in the ``sources`` table, keyed by
+:func:`~agents.host_limits.source_key` in its ``source_key`` column, and
+shared by every workspace; ``workspace_citations`` records which sources
+each workspace cites, in the order they were first added.
+"""
 
 from __future__ import annotations
 
-import asyncio
-import sqlite3
 from datetime import datetime
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
+
+import aiosqlite
+
+from agents.host_limits import source_key
 
 from ..models import Citation
 
+_COLUMNS = (
+    "s.id, s.url, s.title, s.retrieved_at, s.licence, s.status_code, s.verified_at"
+)
+
+# Refreshes a known source without losing a resolved licence or an earlier
+# verification when the new record lacks them.
+_UPSERT_SOURCE = """
+INSERT INTO sources
+    (source_key, url, title, licence, retrieved_at, status_code, verified_at)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(source_key) DO UPDATE SET
+    url = excluded.url,
+    title = excluded.title,
+    licence = CASE WHEN excluded.licence = 'unknown'
+        THEN sources.licence ELSE excluded.licence END,
+    retrieved_at = excluded.retrieved_at,
+    status_code = COALESCE(excluded.status_code, sources.status_code),
+    verified_at = COALESCE(excluded.verified_at, sources.verified_at)
+"""
+
+_LINK_SOURCE = """
+INSERT OR IGNORE INTO workspace_citations (workspace_id, source_id, added_at)
+SELECT ?, id, ? FROM sources WHERE source_key = ?
+"""
+
+
+def _to_citation(row: Tuple) -> Tuple[int, Citation]:
+    return row[0], Citation(
+        url=row[1],
+        title=row[2],
+        retrieved_at=datetime.fromisoformat(row[3]),
+        licence=row[4],
+        status_code=row[5],
+        verified_at=datetime.fromisoformat(row[6]) if row[6] else None,
+    )
+
 
 class CitationRepo:
-    """Provide CRUD operations for :class:`Citation` records."""
+    """Provide CRUD operations for :class:`Citation` records of a workspace."""
 
-    def __init__(self, conn: sqlite3.Connection, workspace_id: str) -> None:
+    def __init__(self, conn: aiosqlite.Connection, workspace_id: str) -> None:
         self._conn = conn
         self._workspace_id = workspace_id
 
     async def insert(self, citation: Citation) -> None:
-        """Insert or replace a citation record."""
-
-        self._conn.execute(
-            """
-            INSERT OR REPLACE INTO citations (workspace_id, url, title, retrieved_at, licence)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (
-                self._workspace_id,
-                str(citation.url),
-                citation.title,
-                citation.retrieved_at.isoformat(),
-                citation.licence,
-            ),
-        )
-        self._conn.commit()
-        await asyncio.sleep(0)
+        """Store ``citation`` and link it to the workspace."""
 
-    async def get_by_url(self, url: str) -> Optional[Citation]:
-        """Return a citation matching ``url`` if present."""
-
-        cur = self._conn.execute(
-            """
-            SELECT url, title, retrieved_at, licence FROM citations
-            WHERE workspace_id = ? AND url = ?
-            """,
-            (self._workspace_id, url),
+        await self.upsert_many([citation])
+
+    async def upsert_many(self, citations: Iterable[Citation]) -> None:
+        """Store ``citations`` and link them to the workspace in one transaction.
+
+        Sources already known under the same source key are updated in
+        place, so workspaces citing the same page share a single row.
+        """
+
+        now = datetime.utcnow().isoformat()
+        sources = []
+        links = []
+        for citation in citations:
+            key = source_key(str(citation.url))
+            sources.append(
+                (
+                    key,
+                    str(citation.url),
+                    citation.title,
+                    citation.licence,
+                    citation.retrieved_at.isoformat(),
+                    citation.status_code,
+                    citation.verified_at.isoformat() if citation.verified_at else None,
+                )
+            )
+            links.append((self._workspace_id, now, key))
+        if not sources:
+            return
+        await self._conn.executemany(_UPSERT_SOURCE, sources)
+        await self._conn.executemany(_LINK_SOURCE, links)
+        await self._conn.commit()
+
+    async def record_verification(
+        self, url: str, status_code: Optional[int], verified_at: datetime
+    ) -> None:
+        """Store the outcome of verifying ``url`` on its source row."""
+
+        await self._conn.execute(
+            "UPDATE sources SET status_code = ?, verified_at = ?"
+            " WHERE source_key = ?",
+            (status_code, verified_at.isoformat(), source_key(url)),
         )
-        row = cur.fetchone()
-        cur.close()
-        await asyncio.sleep(0)
-        if row is None:
-            return None
-        return Citation(
-            url=row[0],
-            title=row[1],
-            retrieved_at=datetime.fromisoformat(row[2]),
-            licence=row[3],
+        await self._conn.commit()
+
+    async def _fetch(self, where: str, params: Tuple) -> List[Tuple[int, Citation]]:
+        cur = await self._conn.execute(
+            f"SELECT {_COLUMNS} FROM workspace_citations w"
+            " JOIN sources s ON s.id = w.source_id"
+            f" WHERE w.workspace_id = ? {where} ORDER BY w.id",
+            (self._workspace_id, *params),
         )
+        rows = await cur.fetchall()
+        await cur.close()
+        return [_to_citation(row) for row in rows]
+
+    async def get_by_url(self, url: str) -> Optional[Citation]:
+        """Return the workspace's citation of ``url`` if present."""
+
+        found = await self._fetch("AND s.source_key = ?", (source_key(url),))
+        return found[0][1] if found else None
+
+    async def get(self, source_id: int) -> Optional[Citation]:
+        """Return the workspace's citation of source ``source_id`` if present."""
+
+        found = await self._fetch("AND s.id = ?", (source_id,))
+        return found[0][1] if found else None
+
+    async def list_citations(self) -> List[Tuple[int, Citation]]:
+        """Return ``(source id, citation)`` pairs in the order they were added.
+
+        Served from the ``(workspace_id, id)`` index on the link table, so
+        the cost grows with the workspace rather than the whole store.
+        """
+
+        return await self._fetch("", ())
 
     async def list_by_workspace(self, workspace_id: str) -> List[Citation]:
         """List all citations for ``workspace_id``."""
 
-        cur = self._conn.execute(
-            """
-            SELECT url, title, retrieved_at, licence FROM citations
-            WHERE workspace_id = ?
-            """,
-            (workspace_id,),
-        )
-        rows = cur.fetchall()
-        cur.close()
-        await asyncio.sleep(0)
-        return [
-            Citation(
-                url=row[0],
-                title=row[1],
-                retrieved_at=datetime.fromisoformat(row[2]),
-                licence=row[3],
-            )
-            for row in rows
-        ]
+        repo = CitationRepo(self._conn, workspace_id)
+        return [citation for _, citation in await repo.list_citations()]
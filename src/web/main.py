@@ -144,7 +144,7 @@ def register_routes(app: FastAPI) -> None:
     from .auth import verify_jwt
     from .health_endpoint import healthz, readyz
     from .metrics_endpoint import get_metrics
-    from .routes import citation, control, entries, export, poll, stream
+    from .routes import citation, control, entries, export, logs, poll, stream
 
     # SSE routes are mounted directly to avoid JWT requirements on EventSource.
     app.include_router(stream.router)
@@ -153,6 +153,7 @@ def register_routes(app: FastAPI) -> None:
     api_router.include_router(control.router)
     api_router.include_router(export.router)
     api_router.include_router(citation.router)
+    api_router.include_router(logs.router)
     api_router.include_router(entries.router)
     api_router.include_router(poll.router)
     api_router.add_api_route("/alerts/{workspace_id}", post_alerts, methods=["POST"])
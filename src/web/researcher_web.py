@@ -3,10 +3,11 @@
 from __future__ import annotations
 
 import asyncio
-import urllib.request
 from dataclasses import dataclass
 from typing import Awaitable, Callable, Iterable, List
-from urllib.parse import urlparse
+
+from agents.host_limits import canonical_url
+from agents.page_fetcher import get_page_fetcher
 
 
 @dataclass(slots=True)
@@ -23,59 +24,37 @@ class CitationResult:
 
 
 async def _fetch(url: str) -> CitationResult:
-    """Fetch the contents of ``url`` asynchronously."""
-
-    def blocking_fetch() -> str:
-        with urllib.request.urlopen(url) as response:  # nosec B310
-            return response.read().decode("utf-8")  # pragma: no cover - network
-
-    content = await asyncio.to_thread(blocking_fetch)
-    return CitationResult(url=url, content=content)
-
-
-def _canonical(url: str) -> str:
-    """Return a canonical form of ``url`` for deduplication.
-
-    The canonical form strips scheme, query, and fragment components,
-    lower-cases the hostname and path, and removes any leading ``www``.
-    """
+    """Fetch the contents of ``url`` through the shared page fetcher."""
 
-    parsed = urlparse(url)
-    netloc = parsed.netloc.lower()
-    if netloc.startswith("www."):
-        netloc = netloc[4:]
-    path = parsed.path.lower().rstrip("/")
-    return f"{netloc}{path}"
+    page = await get_page_fetcher().fetch(url)
+    return CitationResult(url=url, content=page.content)
 
 
 async def researcher_web(
     urls: Iterable[str],
     fetch: Callable[[str], Awaitable[CitationResult]] | None = None,
 ) -> List[CitationResult]:
-    """Fetch multiple URLs concurrently and deduplicate results.
+    """Fetch multiple URLs concurrently, skipping near-duplicates.
 
     Args:
         urls: Iterable of URLs to fetch.
-        fetch: Optional coroutine to fetch a single URL. Defaults to an internal
-            implementation using :func:`asyncio.to_thread` and ``urllib``.
+        fetch: Optional coroutine to fetch a single URL. Defaults to the shared
+            :class:`~agents.page_fetcher.PageFetcher`, which bounds concurrency
+            per host and caches pages on disk.
 
     Returns:
-        Deduplicated list of :class:`CitationResult` objects preserving input order.
-        Only the first result for each *similar* URL is retained.
+        List of :class:`CitationResult` objects preserving input order. URLs are
+        deduplicated by canonical form before fetching, so only the first of
+        several *similar* URLs is requested.
 
     Exceptions are suppressed; failed fetches are omitted from the results.
     """
 
     fetch = fetch or _fetch
-    tasks = [fetch(url) for url in urls]
+    unique: dict[str, str] = {}
+    for url in urls:
+        unique.setdefault(canonical_url(url), url)
     responses: List[CitationResult | BaseException] = await asyncio.gather(
-        *tasks, return_exceptions=True
+        *(fetch(url) for url in unique.values()), return_exceptions=True
     )
-    deduped: dict[str, CitationResult] = {}
-    for result in responses:
-        if isinstance(result, BaseException):
-            continue
-        key = _canonical(result.url)
-        if key not in deduped:
-            deduped[key] = result
-    return list(deduped.values())
+    return [r for r in responses if not isinstance(r, BaseException)]
@@ -1,32 +1,47 @@
-"""Citation related routes."""
+"""Citation related routes.
+
+Citations are served from the shared ``sources`` store through the
+workspace's ``workspace_citations`` links; a citation's id is the id of its
+source and is therefore stable across workspaces.
+"""
 
 from __future__ import annotations
 
-from fastapi import APIRouter
+from pathlib import Path
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Request, status
+
+from persistence import Citation, CitationRepo, get_db_session
 
 router = APIRouter(prefix="/workspaces/{workspace_id}/citations")
 
 
-@router.get("")
-async def list_citations(workspace_id: str) -> list[dict[str, str]]:
-    """Return stored citations for ``workspace_id``.
+def _payload(source_id: int, citation: Citation) -> dict[str, Any]:
+    return {"id": source_id, **citation.model_dump(mode="json")}
 
-    The implementation is a placeholder that returns an empty list.
-    """
 
-    return []
+@router.get("")
+async def list_citations(request: Request, workspace_id: str) -> list[dict[str, Any]]:
+    """Return stored citations for ``workspace_id`` in the order they were added."""
+
+    async with get_db_session(Path(request.app.state.db_path)) as conn:
+        rows = await CitationRepo(conn, workspace_id).list_citations()
+    return [_payload(source_id, citation) for source_id, citation in rows]
 
 
 @router.get("/{citation_id}")
-async def get_citation(workspace_id: str, citation_id: str) -> dict[str, str]:
+async def get_citation(
+    request: Request, workspace_id: str, citation_id: int
+) -> dict[str, Any]:
     """Return citation ``citation_id`` for ``workspace_id``.
 
-    The implementation is a placeholder that returns minimal metadata.
+    Raises:
+        HTTPException: ``404`` if the workspace does not cite that source.
     """
 
-    return {
-        "url": f"https://example.org/{citation_id}",
-        "title": "Placeholder",
-        "retrieved_at": "1970-01-01",
-        "licence": "unknown",
-    }
+    async with get_db_session(Path(request.app.state.db_path)) as conn:
+        citation = await CitationRepo(conn, workspace_id).get(citation_id)
+    if citation is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Citation not found")
+    return _payload(citation_id, citation)
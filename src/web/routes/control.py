@@ -3,14 +3,39 @@
 from __future__ import annotations
 
 import asyncio
+from typing import Any, Coroutine, Set
 
-from fastapi import APIRouter, Body, Request
+from fastapi import APIRouter, Body, HTTPException, Request, status
 
+from core.logging import get_logger
 from core.orchestrator import GraphOrchestrator
 from core.state import State
 
 TopicBody = Body(..., embed=True)
 router = APIRouter(prefix="/workspaces/{workspace_id}")
+logger = get_logger()
+
+# Jobs started by these routes. Holding a reference keeps the event loop from
+# garbage-collecting a running task.
+_JOBS: Set[asyncio.Task[Any]] = set()
+
+
+def _start_job(job: Coroutine[Any, Any, Any], workspace_id: str) -> None:
+    """Run ``job`` in the background and log how it ended."""
+
+    task = asyncio.create_task(job)
+    _JOBS.add(task)
+
+    def finished(task: asyncio.Task[Any]) -> None:
+        _JOBS.discard(task)
+        if task.cancelled():
+            logger.warning("Job for workspace {} was cancelled", workspace_id)
+        elif task.exception() is not None:
+            logger.opt(exception=task.exception()).error(
+                "Job for workspace {} failed", workspace_id
+            )
+
+    task.add_done_callback(finished)
 
 
 @router.post("/run", status_code=201)
@@ -31,10 +56,33 @@ async def run(
     state = State(prompt=topic)
     state.workspace_id = workspace_id
     graph: GraphOrchestrator = request.app.state.graph
-    asyncio.create_task(graph.run(state))
+    _start_job(graph.run(state), workspace_id)
     return {"job_id": workspace_id, "workspace_id": workspace_id}
 
 
+@router.post("/resume", status_code=202)
+async def resume(request: Request, workspace_id: str) -> dict[str, str]:
+    """Resume the last checkpointed run for ``workspace_id``.
+
+    Raises:
+        HTTPException: ``409`` when the server runs without checkpointing and
+            ``404`` when the workspace has no checkpoint.
+    """
+
+    graph: GraphOrchestrator = request.app.state.graph
+    checkpointer = getattr(graph, "checkpointer", None)
+    if checkpointer is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Checkpointing disabled"
+        )
+    if await checkpointer.latest_header(workspace_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="No checkpoint to resume"
+        )
+    _start_job(graph.resume(workspace_id), workspace_id)
+    return {"workspace_id": workspace_id, "status": "resuming"}
+
+
 @router.post("/retry")
 async def retry(workspace_id: str) -> dict[str, str]:
     """Retry the graph using the last inputs for a workspace."""
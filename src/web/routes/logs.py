@@ -0,0 +1,93 @@
+"""Audit log query and export routes.
+
+``GET /workspaces/{id}/logs`` returns one page of action logs together with
+a ``next_cursor`` token for the following page. ``GET
+/workspaces/{id}/logs/export.ndjson`` streams every matching log as
+newline-delimited JSON, reading the table in batches so exports of any size
+run in constant memory.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from persistence import get_db_session
+from persistence.logs import iter_logs, query_logs
+
+router = APIRouter(prefix="/workspaces/{workspace_id}/logs")
+
+# Largest page a client may request.
+MAX_PAGE_SIZE = 1000
+
+
+@router.get("")
+async def list_logs(
+    request: Request,
+    workspace_id: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    agent: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+) -> dict[str, Any]:
+    """Return action logs for ``workspace_id`` oldest first.
+
+    ``start`` is inclusive and ``end`` exclusive. Pass the returned
+    ``next_cursor`` as ``cursor`` to fetch the next page.
+
+    Raises:
+        HTTPException: ``400`` if ``cursor`` is malformed.
+    """
+
+    async with get_db_session(Path(request.app.state.db_path)) as conn:
+        try:
+            page = await query_logs(
+                conn,
+                workspace_id,
+                start=start,
+                end=end,
+                agent=agent,
+                cursor=cursor,
+                limit=limit,
+            )
+        except ValueError as exc:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    entries = [
+        {**asdict(entry), "timestamp": entry.timestamp.isoformat()}
+        for entry in page.entries
+    ]
+    return {"entries": entries, "next_cursor": page.next_cursor}
+
+
+@router.get("/export.ndjson")
+async def export_logs(
+    request: Request,
+    workspace_id: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    agent: str | None = None,
+) -> StreamingResponse:
+    """Stream every matching action log as newline-delimited JSON."""
+
+    db_path = Path(request.app.state.db_path)
+
+    async def lines() -> AsyncIterator[bytes]:
+        async with get_db_session(db_path) as conn:
+            async for row in iter_logs(
+                conn, workspace_id, start=start, end=end, agent=agent
+            ):
+                yield json.dumps(row).encode("utf-8") + b"\n"
+
+    filename = f"{workspace_id}-action-logs.ndjson"
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
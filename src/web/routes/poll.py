@@ -1,37 +1,114 @@
-"""Polling endpoints for retrieving latest streamed events."""
+"""Polling endpoints for retrieving latest streamed events.
+
+Every response carries the channel version (the broker event id) in the body
+and as an ``ETag``. Clients can revalidate with ``If-None-Match`` to get
+``304`` for unchanged data, or long-poll with ``since=<version>`` so the
+request is held until a newer payload arrives or ``wait`` seconds pass. A
+long poll that times out is answered like a plain poll: ``304`` when the
+client's ``If-None-Match`` matches the latest version, otherwise that
+(unchanged) latest payload.
+
+Event ids restart with the server process. ETags therefore include a
+per-process epoch, and a ``since`` above the newest id issued by this
+process is treated as stale: the latest payload is returned immediately.
+"""
 
 from __future__ import annotations
 
+import uuid
 from datetime import datetime, timezone
+from typing import Any
 
-from fastapi import APIRouter, Response
+from fastapi import APIRouter, Request, Response
 
-from agents.streaming import get_latest
+from agents.streaming import get_latest_event, last_event_id, wait_for_event
 from web.schemas.sse import SseEvent
 
 router = APIRouter(prefix="/poll")
 
+# Upper bound for how long a long-poll request may be held open.
+MAX_WAIT_SECONDS = 30.0
+
+# Distinguishes ETags issued by this process from those of earlier ones.
+_EPOCH = uuid.uuid4().hex[:8]
+
+
+def _event(channel: str, payload: object, version: int | None = None) -> SseEvent:
+    return SseEvent(
+        type=channel,
+        payload=payload,
+        timestamp=datetime.now(timezone.utc),
+        id=version,
+    )
+
+
+def _etag(version: int) -> str:
+    return f'"{_EPOCH}-{version}"'
+
 
-def _event(channel: str, payload: object) -> SseEvent:
-    return SseEvent(type=channel, payload=payload, timestamp=datetime.now(timezone.utc))
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    """Return whether an ``If-None-Match`` header matches ``etag``.
+
+    The header may list several tags separated by commas; weak tags
+    (``W/"..."``) are compared by their opaque value and ``*`` matches any.
+    """
+
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+async def _poll(
+    channel: str,
+    event_type: str,
+    request: Request,
+    response: Response,
+    since: int | None,
+    wait: float,
+) -> Any:
+    latest = None
+    if since is not None and since <= last_event_id():
+        timeout = min(max(wait, 0.0), MAX_WAIT_SECONDS)
+        latest = await wait_for_event(channel, since, timeout)
+    if latest is None:
+        latest = get_latest_event(channel)
+    if latest is None:
+        return Response(status_code=204)
+    version, payload = latest
+    etag = _etag(version)
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return _event(event_type, payload, version)
 
 
 @router.get("/{event_type}", response_model=SseEvent | None)
-async def poll_event(event_type: str):
+async def poll_event(
+    event_type: str,
+    request: Request,
+    response: Response,
+    since: int | None = None,
+    wait: float = MAX_WAIT_SECONDS,
+):
     """Return the latest global ``event_type`` payload or ``204`` if absent."""
 
-    payload = get_latest(event_type)
-    if payload is None:
-        return Response(status_code=204)
-    return _event(event_type, payload)
+    return await _poll(event_type, event_type, request, response, since, wait)
 
 
 @router.get("/{workspace_id}/{event_type}", response_model=SseEvent | None)
-async def poll_workspace_event(workspace_id: str, event_type: str):
+async def poll_workspace_event(
+    workspace_id: str,
+    event_type: str,
+    request: Request,
+    response: Response,
+    since: int | None = None,
+    wait: float = MAX_WAIT_SECONDS,
+):
     """Return latest workspace event or ``204`` if none available."""
 
     channel = f"{workspace_id}:{event_type}"
-    payload = get_latest(channel)
-    if payload is None:
-        return Response(status_code=204)
-    return _event(event_type, payload)
+    return await _poll(channel, event_type, request, response, since, wait)
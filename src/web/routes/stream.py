@@ -19,10 +19,14 @@ from web.auth import verify_jwt  # type: ignore[import-not-found]
 from web.sse import (  # type: ignore[import-not-found]
     stream_events,
     stream_workspace_events,
+    stream_workspace_multiplex,
 )
 
 router = APIRouter()
 
+# Workspace channels that can be combined on the multiplexed stream.
+WORKSPACE_CHANNELS = ("messages", "updates", "values", "debug", "action", "state")
+
 SSE_HEADERS: Dict[str, str] = {
     "Cache-Control": "no-store",
     "X-Accel-Buffering": "no",
@@ -171,3 +175,39 @@ async def stream_workspace_debug(
     """Stream diagnostic messages for a workspace."""
 
     return _workspace_event_response(workspace_id, "debug", request)
+
+
+# Registered last so the fixed ``/stream/<channel>`` routes above take priority.
+@router.get(
+    "/stream/{workspace_id}",
+    response_model=None,
+    dependencies=[Depends(verify_stream_token)],
+)
+async def stream_workspace(
+    workspace_id: str,
+    request: Request,
+    channels: str = ",".join(WORKSPACE_CHANNELS),
+    last_event_id: int | None = None,
+) -> EventSourceResponse:
+    """Stream several workspace channels over a single connection.
+
+    ``channels`` is a comma-separated subset of :data:`WORKSPACE_CHANNELS`.
+    Events are named after their channel and carry ids; clients resume with
+    the ``Last-Event-ID`` header that ``EventSource`` sends on reconnect, or
+    the ``last_event_id`` query parameter.
+    """
+
+    selected = [name.strip() for name in channels.split(",") if name.strip()]
+    unknown = sorted(set(selected) - set(WORKSPACE_CHANNELS))
+    if not selected or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown channels: {', '.join(unknown) or '(none given)'}",
+        )
+    header = request.headers.get("last-event-id", "")
+    if last_event_id is None and header.isdigit():
+        last_event_id = int(header)
+    return EventSourceResponse(
+        stream_workspace_multiplex(workspace_id, selected, last_event_id),
+        headers=SSE_HEADERS,
+    )
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Any
 
 from pydantic import BaseModel
 
@@ -11,5 +12,6 @@ class SseEvent(BaseModel):
     """Structure of an SSE message."""
 
     type: str
-    payload: dict
+    payload: Any
     timestamp: datetime
+    id: int | None = None
@@ -3,13 +3,13 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Sequence
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Optional
 
 from fastapi import Request  # type: ignore[import-not-found]
 
-from agents.streaming import subscribe
+from agents.streaming import subscribe, subscribe_many
 from web.schemas.sse import SseEvent  # type: ignore[import-not-found]
 from web.telemetry import SSE_CLIENTS
 
@@ -59,4 +59,41 @@ async def stream_workspace_events(
         SSE_CLIENTS.add(-1)
 
 
-__all__ = ["stream_events", "stream_workspace_events"]
+async def stream_workspace_multiplex(
+    workspace_id: str,
+    event_types: Sequence[str],
+    last_event_id: Optional[int] = None,
+) -> AsyncGenerator[dict[str, Any], None]:
+    """Yield workspace events for every type in ``event_types`` on one stream.
+
+    Each SSE event is named after its channel and carries the broker event
+    id, so a reconnecting ``EventSource`` resumes via ``Last-Event-ID``.
+    Client disconnects cancel the generator, so no per-event polling is
+    needed.
+    """
+    prefix = f"{workspace_id}:"
+    channels = [prefix + event_type for event_type in event_types]
+    SSE_CLIENTS.add(1)
+    try:
+        async for channel, event_id, payload in subscribe_many(
+            channels, last_event_id=last_event_id
+        ):
+            event_type = channel[len(prefix) :]
+            event = SseEvent(
+                type=event_type,
+                payload=payload,
+                timestamp=datetime.now(timezone.utc),
+            )
+            yield {
+                "event": event_type,
+                "id": str(event_id),
+                "data": event.model_dump_json(),
+            }
+    except asyncio.CancelledError:
+        # Client disconnected; exit quietly
+        pass
+    finally:
+        SSE_CLIENTS.add(-1)
+
+
+__all__ = ["stream_events", "stream_workspace_events", "stream_workspace_multiplex"]
@@ -15,7 +15,7 @@ from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, List
+from typing import Any, List, Optional
 
 import agents  # type: ignore  # noqa: E402,F401
 
@@ -93,9 +93,17 @@ class _Logger(types.SimpleNamespace):  # pragma: no cover - simple logger stub
     def bind(self, *a, **k):  # type: ignore[override]
         return self
 
+    def opt(self, *a, **k):  # type: ignore[override]
+        return self
+
 
 loguru_stub.logger = _Logger(  # type: ignore[attr-defined]
-    info=lambda *a, **k: None, add=lambda *a, **k: None, remove=lambda *a, **k: None
+    info=lambda *a, **k: None,
+    warning=lambda *a, **k: None,
+    error=lambda *a, **k: None,
+    exception=lambda *a, **k: None,
+    add=lambda *a, **k: None,
+    remove=lambda *a, **k: None,
 )
 sys.modules.setdefault("loguru", loguru_stub)
 
@@ -127,7 +135,7 @@ sys.modules["agents.critics"] = critics_stub
 # Simplified persistence layer used by the orchestrator when logging actions.
 
 
-async def get_db_session():  # pragma: no cover - helper for tests
+def get_db_session(*_a, **_k):  # pragma: no cover - helper for tests
     class _Ctx:
         async def __aenter__(self):
             return self
@@ -149,6 +157,8 @@ class Citation:  # pragma: no cover - simple container
     title: str
     retrieved_at: datetime = datetime.utcnow()
     licence: str = ""
+    status_code: Optional[int] = None
+    verified_at: Optional[datetime] = None
 
 
 class CitationRepo:  # pragma: no cover - minimal stub
@@ -158,6 +168,9 @@ class CitationRepo:  # pragma: no cover - minimal stub
     async def insert(self, *_a, **_k):
         pass
 
+    async def upsert_many(self, *_a, **_k):
+        pass
+
 
 class RetrievalCacheRepo:  # pragma: no cover - minimal cache
     def __init__(self, *_a, **_k):
@@ -199,9 +212,31 @@ async def log_action(*_a, **_k):  # pragma: no cover - helper for tests
     pass
 
 
+async def query_logs(*_a, **_k):  # pragma: no cover - helper for tests
+    return types.SimpleNamespace(entries=[], next_cursor=None)
+
+
+async def iter_logs(*_a, **_k):  # pragma: no cover - helper for tests
+    return
+    yield
+
+
 persistence_logs_stub.log_action = log_action  # type: ignore[attr-defined]
+persistence_logs_stub.query_logs = query_logs  # type: ignore[attr-defined]
+persistence_logs_stub.iter_logs = iter_logs  # type: ignore[attr-defined]
 sys.modules.setdefault("persistence.logs", persistence_logs_stub)
 
+persistence_manager_stub = types.ModuleType("persistence.manager")
+
+
+class PersistenceManager:  # pragma: no cover - minimal stub
+    async def archive(self, *_a, **_k):
+        return {}
+
+
+persistence_manager_stub.PersistenceManager = PersistenceManager  # type: ignore[attr-defined]
+sys.modules.setdefault("persistence.manager", persistence_manager_stub)
+
 # Lightweight weasyprint stub
 weasyprint_stub = types.ModuleType("weasyprint")
 
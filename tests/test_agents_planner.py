@@ -0,0 +1,44 @@
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# ``agents.planner`` is stubbed in conftest, so load the real module while its
+# dependencies are still the real ones.
+_path = Path(__file__).resolve().parents[1] / "src" / "agents" / "planner.py"
+_spec = importlib.util.spec_from_file_location("agents._planner_real", _path)
+assert _spec and _spec.loader
+planner = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = planner
+_spec.loader.exec_module(planner)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "```json\n" + json.dumps({"steps": ["Intro", "Laws", "Quiz"]}) + "\n```",
+        "Plan:\n- Intro\n2. Laws\n* Quiz",
+    ],
+)
+def test_outline_stream_emits_steps_incrementally(text: str) -> None:
+    for size in (1, 4, len(text)):
+        parser = planner.OutlineStream()
+        steps = []
+        for start in range(0, len(text), size):
+            steps.extend(parser.feed(text[start : start + size]))
+        steps.extend(parser.finish())
+        assert steps == ["Intro", "Laws", "Quiz"]
+
+
+def test_outline_stream_returns_json_steps_before_document_ends() -> None:
+    parser = planner.OutlineStream()
+    assert parser.feed('{"steps": ["Intro", "La') == ["Intro"]
+    assert parser.feed('ws"') == ["Laws"]
+
+
+def test_plan_confidence_grows_with_steps() -> None:
+    outline = planner.parse_outline("- a\n- b\n- c")
+    assert planner.plan_confidence(outline) == 0.8
+    assert planner.plan_confidence(planner.parse_outline("")) == 0.0
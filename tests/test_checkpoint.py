@@ -1,6 +1,10 @@
+import json
+import threading
+
 import aiosqlite
 import pytest
 
+from core import checkpoint
 from core.checkpoint import SqliteCheckpointManager
 from core.state import State
 
@@ -28,3 +32,150 @@ async def test_checkpoint_retention(tmp_path):
     assert row[0] == 2
     loaded = await manager.load_checkpoint()
     assert loaded.prompt == "p2"
+
+
+@pytest.mark.asyncio
+async def test_resume_point_records_next_node_per_workspace(tmp_path):
+    manager = SqliteCheckpointManager(str(tmp_path / "checkpoints.db"))
+    first = State(prompt="a")
+    first.workspace_id = "ws1"
+    second = State(prompt="b")
+    second.workspace_id = "ws2"
+    await manager.save_checkpoint(first, node="Planner", next_node="Editor")
+    await manager.save_checkpoint(second, node="Exporter", next_node=None)
+    state, next_node = await manager.load_resume_point("ws1")
+    assert state.prompt == "a"
+    assert state.workspace_id == "ws1"
+    assert next_node == "Editor"
+    _, finished = await manager.load_resume_point("ws2")
+    assert finished is None
+
+
+@pytest.mark.asyncio
+async def test_background_saves_snapshot_before_mutation(tmp_path):
+    manager = SqliteCheckpointManager(str(tmp_path / "checkpoints.db"))
+    state = State(prompt="before")
+    manager.save_in_background(state, node="A", next_node="B")
+    state.prompt = "after"
+    await manager.flush()
+    loaded = await manager.load_checkpoint()
+    assert loaded.prompt == "before"
+
+
+@pytest.mark.asyncio
+async def test_legacy_checkpoint_table_is_upgraded(tmp_path):
+    db_path = tmp_path / "checkpoints.db"
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(
+            "CREATE TABLE checkpoints"
+            " (id INTEGER PRIMARY KEY AUTOINCREMENT, state TEXT NOT NULL)"
+        )
+        await db.commit()
+    manager = SqliteCheckpointManager(str(db_path))
+    await manager.save_checkpoint(State(prompt="legacy"), node="A", next_node="B")
+    _, next_node = await manager.load_resume_point()
+    assert next_node == "B"
+
+
+@pytest.mark.asyncio
+async def test_list_versions_and_legacy_migration(tmp_path):
+    db_path = tmp_path / "checkpoints.db"
+    legacy = State(prompt="old")
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(
+            "CREATE TABLE checkpoints"
+            " (id INTEGER PRIMARY KEY AUTOINCREMENT, state TEXT NOT NULL)"
+        )
+        await db.execute(
+            "INSERT INTO checkpoints (state) VALUES (?)",
+            (json.dumps(legacy.to_dict()),),
+        )
+        await db.commit()
+    manager = SqliteCheckpointManager(str(db_path))
+    await manager.save_checkpoint(State(prompt="new"))
+    headers = await manager.list_versions("default")
+    assert [h.prompt for h in headers] == ["old", "new"]
+    assert await manager.migrate_legacy() == 1
+    assert await manager.migrate_legacy() == 0
+    assert (await manager.load_checkpoint()).prompt == "new"
+
+
+@pytest.mark.asyncio
+async def test_deltas_between_full_snapshots_reconstruct(tmp_path):
+    db_path = tmp_path / "checkpoints.db"
+    manager = SqliteCheckpointManager(str(db_path), snapshot_interval=3)
+    state = State(prompt="topic")
+    for i in range(5):
+        state.learning_objectives.append(f"s{i}")
+        await manager.save_checkpoint(state, node=f"n{i}")
+    async with aiosqlite.connect(db_path) as db:
+        cur = await db.execute("SELECT kind FROM checkpoints ORDER BY id")
+        kinds = [row[0] for row in await cur.fetchall()]
+    assert kinds == ["full", "delta", "delta", "full", "delta"]
+    latest = await manager.load_checkpoint()
+    assert latest == state
+    middle = await manager.load_version("default", 4)
+    assert middle.learning_objectives == ["s0", "s1", "s2"]
+
+
+@pytest.mark.asyncio
+async def test_retention_folds_delta_into_full_snapshot(tmp_path):
+    db_path = tmp_path / "checkpoints.db"
+    manager = SqliteCheckpointManager(str(db_path), max_checkpoints=2)
+    state = State(prompt="topic")
+    for i in range(4):
+        state.learning_objectives.append(f"s{i}")
+        await manager.save_checkpoint(state)
+    async with aiosqlite.connect(db_path) as db:
+        cur = await db.execute("SELECT kind FROM checkpoints ORDER BY id")
+        kinds = [row[0] for row in await cur.fetchall()]
+    assert kinds == ["full", "delta"]
+    loaded = await manager.load_checkpoint()
+    assert loaded.learning_objectives == ["s0", "s1", "s2", "s3"]
+    assert [h.version for h in await manager.list_versions("default")] == [4, 5]
+
+
+@pytest.mark.asyncio
+async def test_new_manager_starts_with_full_snapshot(tmp_path):
+    db_path = tmp_path / "checkpoints.db"
+    state = State(prompt="topic")
+    await SqliteCheckpointManager(str(db_path)).save_checkpoint(state)
+    state.learning_objectives.append("late")
+    await SqliteCheckpointManager(str(db_path)).save_checkpoint(state)
+    async with aiosqlite.connect(db_path) as db:
+        cur = await db.execute("SELECT kind FROM checkpoints ORDER BY id")
+        kinds = [row[0] for row in await cur.fetchall()]
+    assert kinds == ["full", "full"]
+
+
+@pytest.mark.asyncio
+async def test_latest_header_per_workspace(tmp_path):
+    manager = SqliteCheckpointManager(str(tmp_path / "checkpoints.db"))
+    assert await manager.latest_header("ws") is None
+    state = State(prompt="a")
+    state.workspace_id = "ws"
+    await manager.save_checkpoint(state)
+    await manager.save_checkpoint(state)
+    header = await manager.latest_header("ws")
+    assert (header.prompt, header.version) == ("a", 3)
+    assert await manager.latest_header("other") is None
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_are_encoded_off_the_event_loop(tmp_path, monkeypatch):
+    threads = []
+    encode_dict = checkpoint.encode_dict
+
+    def recording_encode(raw):
+        threads.append(threading.current_thread())
+        return encode_dict(raw)
+
+    monkeypatch.setattr(checkpoint, "encode_dict", recording_encode)
+    manager = SqliteCheckpointManager(str(tmp_path / "checkpoints.db"))
+    state = State(prompt="topic")
+    manager.save_in_background(state, node="A")
+    state.learning_objectives.append("later")
+    await manager.save_checkpoint(state, node="B")
+    assert threads and threading.main_thread() not in threads
+    assert (await manager.load_version("default", 2)).learning_objectives == []
+    assert (await manager.load_checkpoint()).learning_objectives == ["later"]
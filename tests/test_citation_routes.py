@@ -1,12 +1,21 @@
 """Tests for citation API routes."""
 
 import importlib.util  # noqa: E402
+import json
+import sqlite3
 import sys
+from contextlib import asynccontextmanager
+from datetime import datetime
 from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
 
+import aiosqlite
+import pytest
 from fastapi import APIRouter, Depends, FastAPI  # noqa: E402
 from fastapi.testclient import TestClient  # noqa: E402
 
+from export.metadata_exporter import export_citations_json
 from web.auth import verify_jwt  # noqa: E402
 
 repo_src = Path(__file__).resolve().parents[1] / "src"
@@ -15,19 +24,71 @@ if str(repo_src) in sys.path:
 
 sys.path.insert(0, str(repo_src))
 
+SCHEMA = """
+CREATE TABLE sources (
+    id INTEGER PRIMARY KEY,
+    source_key TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    licence TEXT NOT NULL,
+    retrieved_at TEXT NOT NULL,
+    status_code INTEGER,
+    verified_at TEXT
+);
+CREATE TABLE workspace_citations (
+    id INTEGER PRIMARY KEY,
+    workspace_id TEXT NOT NULL,
+    source_id INTEGER NOT NULL REFERENCES sources(id),
+    added_at TEXT NOT NULL,
+    UNIQUE (workspace_id, source_id)
+);
+CREATE INDEX ix_workspace_citations_workspace
+    ON workspace_citations (workspace_id, id);
+"""
 
-spec = importlib.util.spec_from_file_location(
-    "citation", repo_src / "web" / "routes" / "citation.py"
-)
-assert spec and spec.loader
-citation_routes = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(citation_routes)
 
+def _load(name: str, path: Path) -> Any:
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
 
-def create_app() -> FastAPI:
+
+citation_routes = _load("citation", repo_src / "web" / "routes" / "citation.py")
+
+
+@pytest.fixture
+def store(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    """Create the citation schema and wire the real repository into the routes."""
+
+    # ``persistence`` is stubbed in conftest; load the real model and repo.
+    models = _load("persistence.models", repo_src / "persistence" / "models.py")
+    monkeypatch.setitem(sys.modules, "persistence.models", models)
+    repo = _load(
+        "persistence.repositories.citation_repo",
+        repo_src / "persistence" / "repositories" / "citation_repo.py",
+    )
+
+    @asynccontextmanager
+    async def get_db_session(path: Path):
+        async with aiosqlite.connect(path) as conn:
+            yield conn
+
+    monkeypatch.setattr(citation_routes, "CitationRepo", repo.CitationRepo)
+    monkeypatch.setattr(citation_routes, "get_db_session", get_db_session)
+
+    path = tmp_path / "workspace.db"
+    with sqlite3.connect(path) as conn:
+        conn.executescript(SCHEMA)
+    return SimpleNamespace(path=path, Citation=models.Citation, Repo=repo.CitationRepo)
+
+
+def create_app(db_path: Path) -> FastAPI:
     """Create a FastAPI app with the citation router."""
 
     app = FastAPI()
+    app.state.db_path = str(db_path)
     api = APIRouter(prefix="/api", dependencies=[Depends(verify_jwt)])
     api.include_router(citation_routes.router)
     app.include_router(api)
@@ -35,16 +96,73 @@ def create_app() -> FastAPI:
     return app
 
 
-def test_list_and_get_citation() -> None:
-    """Ensure citation routes respond with placeholders."""
+async def _cite(store: SimpleNamespace, workspace_id: str, *items: tuple) -> None:
+    citations = [
+        store.Citation(
+            url=url, title=title, retrieved_at=datetime(2024, 1, 1), licence=licence
+        )
+        for url, title, licence in items
+    ]
+    async with aiosqlite.connect(store.path) as conn:
+        await store.Repo(conn, workspace_id).upsert_many(citations)
 
-    client = TestClient(create_app())
-    resp = client.get("/api/workspaces/abc/citations")
-    assert resp.status_code == 200
-    assert resp.json() == []
 
-    resp = client.get("/api/workspaces/abc/citations/123")
+@pytest.mark.asyncio
+async def test_workspaces_share_sources_by_url(store: SimpleNamespace) -> None:
+    """Citing a URL in one workspace no longer takes it from another."""
+
+    await _cite(store, "a", ("https://example.edu/x?b=2&a=1#intro", "X", "CC BY"))
+    await _cite(
+        store,
+        "b",
+        ("https://example.edu/y", "Y", "CC BY"),
+        ("HTTPS://Example.edu:443/x?a=1&b=2", "X2", "unknown"),
+    )
+
+    with sqlite3.connect(store.path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM sources").fetchone() == (2,)
+
+    client = TestClient(create_app(store.path))
+    listed_a = client.get("/api/workspaces/a/citations").json()
+    listed_b = client.get("/api/workspaces/b/citations").json()
+    assert [c["title"] for c in listed_a] == ["X2"]
+    assert [c["title"] for c in listed_b] == ["Y", "X2"]
+    # An unresolved licence does not overwrite a known one.
+    assert listed_b[1]["licence"] == "CC BY"
+    assert listed_a[0]["id"] == listed_b[1]["id"]
+
+    exported = json.loads(export_citations_json(str(store.path), "b"))
+    assert [c["title"] for c in exported] == ["Y", "X2"]
+
+
+@pytest.mark.asyncio
+async def test_sources_keep_query_and_scheme(store: SimpleNamespace) -> None:
+    """Pages differing only in query or scheme are stored separately."""
+
+    await _cite(
+        store,
+        "a",
+        ("https://www.youtube.com/watch?v=A", "A", "unknown"),
+        ("https://www.youtube.com/watch?v=B", "B", "unknown"),
+        ("http://www.youtube.com/watch?v=A", "A (http)", "unknown"),
+    )
+    client = TestClient(create_app(store.path))
+    listed = client.get("/api/workspaces/a/citations").json()
+    assert [c["title"] for c in listed] == ["A", "B", "A (http)"]
+
+
+@pytest.mark.asyncio
+async def test_get_citation_is_scoped_to_workspace(store: SimpleNamespace) -> None:
+    """A citation is only returned for workspaces that cite it."""
+
+    await _cite(store, "a", ("https://example.edu/x", "X", "CC BY"))
+    client = TestClient(create_app(store.path))
+    (listed,) = client.get("/api/workspaces/a/citations").json()
+
+    resp = client.get(f"/api/workspaces/a/citations/{listed['id']}")
     assert resp.status_code == 200
-    data = resp.json()
-    assert data["url"].endswith("/123")
-    assert data["title"] == "Placeholder"
+    assert resp.json()["url"] == "https://example.edu/x"
+
+    resp = client.get(f"/api/workspaces/other/citations/{listed['id']}")
+    assert resp.status_code == 404
+    assert client.get("/api/workspaces/other/citations").json() == []
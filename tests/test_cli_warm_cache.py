@@ -0,0 +1,70 @@
+import pytest
+
+from agents.offline_cache import load_cached_results
+from agents.researcher_web import RawSearchResult
+from cli import warm_cache
+
+
+def test_build_queries_matches_researcher_queries() -> None:
+    queries = warm_cache.build_queries(
+        ["Gravity", "Gravity"], ["STEM", "Education"], limit=2
+    )
+    assert queries == [
+        "Gravity for STEM",
+        "Gravity for STEM overview",
+        "Gravity for Education",
+        "Gravity for Education overview",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_warm_cache_fills_corpus_and_dedups_licences(
+    tmp_path, monkeypatch
+) -> None:
+    monkeypatch.setattr(
+        "agents.offline_cache.corpus_path", lambda: tmp_path / "corpus.db"
+    )
+
+    async def fake_search(query: str, _client):
+        if "broken" in query:
+            raise RuntimeError("boom")
+        return [
+            RawSearchResult(
+                url="https://en.wikipedia.org/wiki/Gravity", title="G", snippet=query
+            ),
+            RawSearchResult(
+                url="https://www.en.wikipedia.org/wiki/gravity/", title="G", snippet=""
+            ),
+        ]
+
+    resolved = []
+
+    class FakeResolver:
+        async def resolve_many(self, urls):
+            urls = list(urls)
+            resolved.extend(urls)
+            return ["CC BY-SA 4.0" for _ in urls]
+
+    monkeypatch.setattr(warm_cache, "cached_search", fake_search)
+    monkeypatch.setattr(warm_cache, "get_licence_resolver", FakeResolver)
+
+    summary = await warm_cache.warm_cache(
+        ["Gravity for STEM", "Gravity for Education", "broken"], client=None
+    )
+    assert summary.queries == 2
+    assert summary.failed == ["broken"]
+    assert summary.sources == 1
+    assert resolved == ["https://en.wikipedia.org/wiki/Gravity"]
+    cached = load_cached_results("Gravity for STEM")
+    assert cached is not None and len(cached) == 2
+
+
+def test_main_imports_exported_corpus(tmp_path, monkeypatch, capsys) -> None:
+    monkeypatch.setattr(
+        "agents.offline_cache.corpus_path", lambda: tmp_path / "corpus.db"
+    )
+    dump = tmp_path / "corpus.jsonl"
+    dump.write_text('{"query": "q", "results": []}\n')
+    warm_cache.main(["--import", str(dump)])
+    assert "Imported 1 queries" in capsys.readouterr().out
+    assert load_cached_results("q") == []
@@ -62,6 +62,15 @@ def test_model_falls_back_to_default(monkeypatch):
     assert settings.model == MODEL
 
 
+def test_node_models_are_opt_in(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "key1")
+    monkeypatch.setenv("MODEL", "anthropic:claude-sonnet-4-0")
+    monkeypatch.delenv("NODE_MODELS", raising=False)
+    assert Settings().node_models == {}
+    monkeypatch.setenv("NODE_MODELS", '{"Planner": "openai:gpt-4.1-mini"}')
+    assert Settings().node_models == {"Planner": "openai:gpt-4.1-mini"}
+
+
 def test_offline_mode_toggle(monkeypatch):
     monkeypatch.setenv("OPENAI_API_KEY", "key1")
     monkeypatch.setenv("OFFLINE_MODE", "1")
@@ -0,0 +1,156 @@
+import pytest
+
+from agents.models import Slide, SlideCopy, SlideSpeakerNotes, WeaveResult
+from core import regenerator
+from core.document_graph import build_document_dag
+from core.state import Module, State
+from models.fact_check_report import ClaimFlag, FactCheckReport, SentenceProbability
+
+
+def _slide(number: int, notes: str) -> Slide:
+    return Slide(slide_number=number, speaker_notes=SlideSpeakerNotes(notes=notes))
+
+
+def _module(module_id: str) -> Module:
+    return Module(
+        id=module_id,
+        title=module_id,
+        learning_objectives=[],
+        duration_min=10,
+        slides=[_slide(1, "keep"), _slide(2, "Experts say so")],
+    )
+
+
+def _report() -> FactCheckReport:
+    return FactCheckReport(
+        hallucinations=[
+            SentenceProbability(
+                line_number=1,
+                sentence="x",
+                probability=0.4,
+                module_id="m1",
+                slide_number=2,
+                section="speaker_notes",
+            )
+        ],
+        unsupported_claims=[
+            ClaimFlag(
+                line_number=1,
+                snippet="x",
+                module_id="m1",
+                slide_number=2,
+                section="speaker_notes",
+            )
+        ],
+        hallucination_count=1,
+        unsupported_claims_count=1,
+    )
+
+
+def test_resolve_targets_collapses_nested_findings():
+    state = State(prompt="topic")
+    state.modules.extend([_module("m1"), _module("m2")])
+    report = _report()
+    report.unsupported_claims.append(
+        ClaimFlag(line_number=1, snippet="y", module_id="m1", section="summary")
+    )
+    report.unsupported_claims.append(
+        ClaimFlag(line_number=1, snippet="z", module_id="m2", slide_number=1)
+    )
+    targets = regenerator.resolve_targets(state, report)
+    assert [(t.node_id, t.kind) for t in targets] == [
+        ("m1", "module"),
+        ("m2-slide-1", "slide"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_regeneration_splices_notes_and_reruns_changed_checks(monkeypatch):
+    calls = []
+
+    async def fake_weaver(state, section_id=None):
+        raise AssertionError("slide findings must not re-weave the module")
+
+    async def fake_slide(state, module, slide_number, *, notes_only=False):
+        calls.append((module.id, slide_number, notes_only))
+        return Slide(
+            slide_number=slide_number,
+            copy=SlideCopy(bullet_points=["new"]),
+            speaker_notes=SlideSpeakerNotes(notes="Cited fact [1]"),
+        )
+
+    monkeypatch.setattr(regenerator, "content_weaver", fake_weaver)
+    monkeypatch.setattr(regenerator, "weave_slide", fake_slide)
+    state = State(prompt="topic")
+    untouched = _module("m2")
+    state.modules.extend([_module("m1"), untouched])
+    state.factcheck_report = _report()
+    state.document_graph = build_document_dag(state.modules)
+    state.document_graph.clear_dirty()
+
+    await regenerator.orchestrate_regeneration(state, state.factcheck_report)
+
+    assert calls == [("m1", 2, True)]
+    assert len(state.modules) == 2
+    first = state.modules[0]
+    assert first.title == "m1"
+    assert first.slides[0].speaker_notes.notes == "keep"
+    assert first.slides[1].speaker_notes.notes == "Cited fact [1]"
+    assert first.slides[1].copy is None
+    assert state.modules[1] is untouched
+    flagged = {c.module_id for c in state.factcheck_report.unsupported_claims}
+    assert flagged == {"m2"}
+    assert state.critique_report is None
+    assert state.retry_counts == {"m1-slide-2-speaker-notes": 1}
+    assert [n.id for n in state.document_graph.dirty_nodes("slide")] == ["m1-slide-2"]
+
+
+def test_outline_findings_map_to_the_module_of_their_step():
+    state = State(prompt="topic")
+    state.outline.steps = ["Intro", "Studies show energy is conserved"]
+    state.modules.extend([_module("m1"), _module("m2")])
+    report = FactCheckReport(
+        unsupported_claims=[
+            ClaimFlag(line_number=2, snippet="Studies show energy is conserved"),
+            ClaimFlag(line_number=3, snippet="Experts say nothing else"),
+        ],
+        unsupported_claims_count=2,
+    )
+    targets = regenerator.resolve_targets(state, report)
+    assert [(t.node_id, t.kind) for t in targets] == [("m2", "module")]
+    untargeted = regenerator.untargeted_findings(state, report)
+    assert [f.snippet for f in untargeted] == ["Experts say nothing else"]
+
+
+@pytest.mark.asyncio
+async def test_regeneration_reports_untargeted_and_reexports(monkeypatch):
+    async def fake_weaver(state, section_id=None):
+        return WeaveResult(title="new", learning_objectives=[], duration_min=10)
+
+    exported = []
+
+    async def fake_exporter(state):
+        exported.append(state)
+
+    monkeypatch.setattr(regenerator, "content_weaver", fake_weaver)
+    monkeypatch.setattr(regenerator, "run_exporter", fake_exporter)
+    state = State(prompt="topic")
+    state.outline.steps = ["Maybe intro."]
+    state.modules.append(_module("m1"))
+    state.exports = {"markdown": "lecture.md"}
+    report = FactCheckReport(
+        hallucinations=[
+            SentenceProbability(line_number=1, sentence="Maybe intro", probability=0.4)
+        ],
+        unsupported_claims=[ClaimFlag(line_number=4, snippet="Experts say")],
+        hallucination_count=1,
+        unsupported_claims_count=1,
+    )
+
+    await regenerator.orchestrate_regeneration(state, report)
+
+    assert state.modules[0].title == "new"
+    assert [entry.message for entry in state.log] == [
+        "Finding not targeted for regeneration: Experts say"
+    ]
+    assert exported == [state]
@@ -14,6 +14,7 @@ from pydantic import ValidationError
 from agents import content_weaver
 from agents.content_weaver import RetryableError, WeaveResult
 from agents.models import AssessmentItem, Slide, SlideCopy, SlideSpeakerNotes
+from agents.prompt_context import schema_instruction
 from prompts import get_prompt
 
 
@@ -56,14 +57,16 @@ def test_call_openai_function_supplies_schema(monkeypatch: Any) -> None:
     monkeypatch.setattr(
         WeaveResult, "model_json_schema", staticmethod(lambda: schema_marker)
     )
+    schema_instruction.cache_clear()
 
     async def run() -> None:
         stream = await content_weaver.call_openai_function("topic")
         _ = [token async for token in stream]
 
     asyncio.run(run())
+    schema_instruction.cache_clear()
 
-    schema_str = json.dumps(schema_marker, indent=2)
+    schema_str = json.dumps(schema_marker, separators=(",", ":"))
     instructions = captured.get("instructions", [])
     assert any(schema_str in instr for instr in instructions)
     assert get_prompt("content_weaver_duration_rule") in instructions
@@ -301,3 +304,86 @@ def test_run_content_weaver_preserves_full_output(monkeypatch: Any) -> None:
     assert module.summary == "sum"
     assert module.session_type == "lecture"
     assert state.modules[0].slides[0].copy.bullet_points == ["b"]
+
+
+def test_content_weaver_streams_slides_and_retries_off_schema(
+    monkeypatch: Any,
+) -> None:
+    """Slides are published as they close and invalid slides abort the attempt."""
+
+    from core.state import State
+
+    good = json.dumps(
+        {
+            "title": "T",
+            "learning_objectives": [],
+            "duration_min": 0,
+            "slides": [{"slide_number": 1}, {"slide_number": 2}],
+        }
+    )
+    outputs = [['{"slides": [{"slide_number": "one"}', "never read"], [good]]
+    consumed: list[str] = []
+
+    async def fake_call(prompt: str, *_a, **_k) -> Any:
+        chunks = outputs.pop(0)
+
+        async def gen() -> Any:
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield chunk
+
+        return gen()
+
+    published: list[Any] = []
+    monkeypatch.setattr(content_weaver, "call_openai_function", fake_call)
+    monkeypatch.setattr(
+        content_weaver, "publish", lambda channel, payload: published.append(payload)
+    )
+
+    state = State(prompt="topic")
+    weave = asyncio.run(content_weaver.content_weaver(state))
+
+    assert "never read" not in consumed
+    assert [p["slide"]["slide_number"] for p in published] == [1, 2]
+    assert all(p["attempt"] == 1 for p in published)
+    assert len(weave.slides) == 2
+
+
+def test_weave_slide_generates_one_slide_with_neighbours(monkeypatch: Any) -> None:
+    """Only the targeted slide is requested, with its neighbours as context."""
+
+    from core.state import Module, State
+
+    seen: list[tuple[str, Any]] = []
+
+    async def fake_call(prompt: str, *_a, **kwargs) -> Any:
+        seen.append((prompt, kwargs["system"]))
+
+        async def gen() -> Any:
+            yield json.dumps({"slide_number": 9, "copy": {"bullet_points": ["n"]}})
+
+        return gen()
+
+    monkeypatch.setattr(content_weaver, "call_openai_function", fake_call)
+    module = Module(
+        id="m1",
+        title="Forces",
+        learning_objectives=["Explain inertia"],
+        duration_min=10,
+        slides=[Slide(slide_number=n) for n in (1, 2, 3, 4)],
+    )
+
+    slide = asyncio.run(content_weaver.weave_slide(State(prompt="topic"), module, 2))
+
+    assert slide.slide_number == 2
+    assert slide.copy.bullet_points == ["n"]
+    ((prompt, system),) = seen
+    context = json.loads(prompt.split("\n", 1)[1])
+    assert context["previous_slide"] == {"slide_number": 1}
+    assert context["next_slide"] == {"slide_number": 3}
+    assert system == [
+        get_prompt("content_weaver_slide_system"),
+        schema_instruction(Slide),
+    ]
+    with pytest.raises(KeyError):
+        asyncio.run(content_weaver.weave_slide(State(prompt="topic"), module, 7))
@@ -1,8 +1,11 @@
 """Tests for control API routes."""
 
+import asyncio
 import importlib.util  # noqa: E402
 import sys
 from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
 
 from fastapi import APIRouter, Depends, FastAPI  # noqa: E402
 from fastapi.testclient import TestClient  # noqa: E402
@@ -24,15 +27,31 @@ control_routes = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(control_routes)
 
 
-def create_app() -> FastAPI:
-    """Create a FastAPI app with the control router."""
+class DummyGraph:
+    checkpointer: Any = None
+
+    def __init__(self) -> None:
+        self.resumed: list[str] = []
+
+    async def run(self, _state):
+        return _state
+
+    async def resume(self, workspace_id: str):
+        self.resumed.append(workspace_id)
 
-    class DummyGraph:
-        async def run(self, _state):
-            return _state
+
+class DummyCheckpointer:
+    async def latest_header(self, workspace_id: str):
+        if workspace_id == "saved":
+            return SimpleNamespace(prompt="topic", version=3, schema=1)
+        return None
+
+
+def create_app(graph: Any = None) -> FastAPI:
+    """Create a FastAPI app with the control router."""
 
     app = FastAPI()
-    app.state.graph = DummyGraph()
+    app.state.graph = graph or DummyGraph()
     api = APIRouter(prefix="/api", dependencies=[Depends(verify_jwt)])
     api.include_router(control_routes.router)
     app.include_router(api)
@@ -52,3 +71,55 @@ def test_control_endpoints() -> None:
     resp = client.post("/api/workspaces/abc/retry")
     assert resp.status_code == 200
     assert resp.json() == {"workspace_id": "abc", "status": "retried"}
+
+
+def test_resume_requires_checkpointing() -> None:
+    """Resuming without a checkpointer is rejected."""
+
+    client = TestClient(create_app())
+    resp = client.post("/api/workspaces/abc/resume")
+    assert resp.status_code == 409
+
+
+def test_resume_requires_a_checkpoint() -> None:
+    """Resuming a workspace without checkpoints is a 404, not a silent no-op."""
+
+    graph = DummyGraph()
+    graph.checkpointer = DummyCheckpointer()
+    client = TestClient(create_app(graph))
+
+    resp = client.post("/api/workspaces/none/resume")
+    assert resp.status_code == 404
+
+    resp = client.post("/api/workspaces/saved/resume")
+    assert resp.status_code == 202
+    assert graph.resumed == ["saved"]
+
+
+def test_background_jobs_are_kept_and_failures_logged(monkeypatch) -> None:
+    """Jobs stay referenced while running and their errors are logged."""
+
+    errors: list[Any] = []
+
+    class Logger:
+        def opt(self, exception=None):
+            errors.append(exception)
+            return self
+
+        def error(self, *_a) -> None:
+            pass
+
+    monkeypatch.setattr(control_routes, "logger", Logger())
+
+    async def main() -> None:
+        async def fail() -> None:
+            raise RuntimeError("boom")
+
+        control_routes._start_job(fail(), "abc")
+        assert len(control_routes._JOBS) == 1
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert not control_routes._JOBS
+    assert [str(exc) for exc in errors] == ["boom"]
@@ -45,3 +45,61 @@ def test_build_document_dag_includes_slide_components() -> None:
         "m1-slide-1-visualization",
         "m1-slide-1-speaker-notes",
     ]
+
+
+def test_sync_rebuilds_only_changed_slides() -> None:
+    """Unchanged modules are skipped and edits mark ancestors dirty."""
+
+    first = Slide(slide_number=1, copy=SlideCopy(bullet_points=["a"]))
+    second = Slide(slide_number=2, copy=SlideCopy(bullet_points=["b"]))
+    dag = document_graph.build_document_dag(
+        [Module(id="m1", slides=[first, second]), Module(id="m2", slides=[])]
+    )
+    kept = dag.nodes["m1-slide-1"]
+    dag.clear_dirty()
+
+    assert dag.sync([Module(id="m1", slides=[first, second]), Module("m2", [])]) == []
+    edited = Slide(slide_number=2, copy=SlideCopy(bullet_points=["changed"]))
+    assert dag.sync([Module(id="m1", slides=[first, edited])]) == ["m1", "m2"]
+
+    assert dag.nodes["m1-slide-1"] is kept
+    assert not kept.dirty
+    assert [n.id for n in dag.dirty_nodes("slide")] == ["m1-slide-2"]
+    assert dag.nodes[dag.root].dirty
+    assert "m2" not in dag.nodes
+    assert [n.id for n in dag.nodes_of_type("module")] == ["m1"]
+    assert dag.parent_of("m1-slide-2-copy").id == "m1-slide-2"
+
+
+def test_parent_pointers_restored_from_serialised_graph() -> None:
+    """Graphs loaded from older payloads regain parents and type indexes."""
+
+    dag = document_graph.build_document_dag([Module(id="m1", slides=[])])
+    raw = dag.model_dump()
+    for node in raw["nodes"].values():
+        node.pop("parent")
+    restored = document_graph.DocumentDAG(**raw)
+    assert restored.parent_of("m1-slides").id == "m1"
+    assert [n.id for n in restored.nodes_of_type("slides")] == ["m1-slides"]
+
+
+def test_nodes_resolve_content_without_serialising_it() -> None:
+    """The graph stores ids and hashes; content comes from the modules."""
+
+    notes = SlideSpeakerNotes(notes="spk")
+    slide = Slide(slide_number=3, speaker_notes=notes)
+    module = Module(id="m1", slides=[slide])
+    research = [ResearchResult(url="u", title="t", snippet="s", keywords=["foo"])]
+    dag = document_graph.build_document_dag([module], research)
+
+    raw = dag.model_dump()
+    assert all("content" not in node for node in raw["nodes"].values())
+    restored = document_graph.DocumentDAG(**raw)
+
+    assert restored.resolve("m1", [module]) is module
+    assert restored.resolve("m1-slide-3", [module]) is slide
+    assert restored.resolve("m1-slide-3-speaker-notes", [module]) is notes
+    assert restored.resolve("research-0", [], research) is research[0]
+    assert restored.resolve("research-0-keywords", [], research) == ["foo"]
+    assert restored.resolve("m1-slides", [module]) is None
+    assert restored.resolve("m1", []) is None
@@ -0,0 +1,150 @@
+import importlib.util
+import sqlite3
+import sys
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+
+import aiosqlite
+import httpx
+import pytest
+
+from agents import fact_checker
+from agents.fact_checker import (
+    assess_hallucination_probabilities,
+    run_fact_checker,
+    scan_module,
+    scan_unsupported_claims,
+)
+from agents.models import Slide, SlideCopy, SlideSpeakerNotes
+from agents.url_verifier import UrlVerifier
+from core.state import Module, State
+
+repo_src = Path(__file__).resolve().parents[1] / "src"
+
+
+def _load(name: str, path: Path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _module(notes: str) -> Module:
+    return Module(
+        id="m1",
+        title="Intro",
+        learning_objectives=[],
+        duration_min=10,
+        summary="Maybe this works.",
+        slides=[
+            Slide(
+                slide_number=2,
+                copy=SlideCopy(bullet_points=["Facts", "Experts say so"]),
+                speaker_notes=SlideSpeakerNotes(notes=notes),
+            )
+        ],
+    )
+
+
+def test_text_scanners_keep_sentence_and_line_numbers():
+    text = "Clear fact. I think so!\nStudies show X\nResearch indicates Y [1]"
+    hedged = assess_hallucination_probabilities(text)
+    assert [(h.line_number, h.sentence) for h in hedged] == [(2, "I think so")]
+    claims = scan_unsupported_claims(text)
+    assert [(c.line_number, c.snippet) for c in claims] == [(2, "Studies show X")]
+
+
+def test_scan_module_maps_findings_to_slides():
+    hedged, claims = scan_module(_module("It is probably fine. Done."))
+    assert [(h.section, h.slide_number) for h in hedged] == [
+        ("summary", None),
+        ("speaker_notes", 2),
+    ]
+    assert claims[0].module_id == "m1"
+    assert claims[0].section == "bullet_points"
+    assert claims[0].line_number == 2
+
+
+def test_scan_module_reuses_results_for_unchanged_content():
+    first = scan_module(_module("Unchanged notes."))
+    assert scan_module(_module("Unchanged notes.")) is first
+    assert scan_module(_module("Edited notes.")) is not first
+
+
+@pytest.mark.asyncio
+async def test_run_fact_checker_scans_modules_without_outline():
+    state = State(prompt="topic")
+    state.modules.append(_module("Notes."))
+    report = await run_fact_checker(state)
+    assert report.hallucination_count == 1
+    assert report.unsupported_claims_count == 1
+
+
+@pytest.mark.asyncio
+async def test_run_fact_checker_stores_source_verification(tmp_path, monkeypatch):
+    # ``persistence`` is stubbed in conftest; use the real model and repo.
+    models = _load("persistence.models", repo_src / "persistence" / "models.py")
+    monkeypatch.setitem(sys.modules, "persistence.models", models)
+    repo = _load(
+        "persistence.repositories.citation_repo",
+        repo_src / "persistence" / "repositories" / "citation_repo.py",
+    )
+    path = tmp_path / "workspace.db"
+    with sqlite3.connect(path) as conn:
+        conn.executescript(
+            """
+            CREATE TABLE sources (
+                id INTEGER PRIMARY KEY,
+                source_key TEXT NOT NULL UNIQUE,
+                url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                licence TEXT NOT NULL,
+                retrieved_at TEXT NOT NULL,
+                status_code INTEGER,
+                verified_at TEXT
+            );
+            CREATE TABLE workspace_citations (
+                id INTEGER PRIMARY KEY,
+                workspace_id TEXT NOT NULL,
+                source_id INTEGER NOT NULL,
+                added_at TEXT NOT NULL,
+                UNIQUE (workspace_id, source_id)
+            );
+            """
+        )
+    citation = models.Citation(
+        url="https://a.example/page",
+        title="A",
+        retrieved_at=datetime(2024, 1, 1),
+        licence="MIT",
+    )
+    async with aiosqlite.connect(path) as conn:
+        await repo.CitationRepo(conn, "default").upsert_many([citation])
+
+    @asynccontextmanager
+    async def session():
+        async with aiosqlite.connect(path) as conn:
+            yield conn
+
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(404))
+    )
+    verifier = UrlVerifier(tmp_path / "checks.db", delay=0, client=client)
+    monkeypatch.setattr(fact_checker, "get_db_session", session)
+    monkeypatch.setattr(fact_checker, "CitationRepo", repo.CitationRepo)
+    monkeypatch.setattr(fact_checker, "get_url_verifier", lambda: verifier)
+
+    state = State(prompt="topic")
+    state.modules.append(_module("Notes."))
+    state.sources.append(citation)
+    await run_fact_checker(state)
+
+    async with aiosqlite.connect(path) as conn:
+        stored = await repo.CitationRepo(conn, "default").get_by_url(
+            "https://a.example/page"
+        )
+    assert stored is not None
+    assert stored.status_code == 404
+    assert stored.verified_at is not None
@@ -0,0 +1,132 @@
+"""Tests for hedged, deadline-bounded LLM requests."""
+
+from __future__ import annotations
+
+import asyncio
+import types
+from typing import Any, AsyncIterator
+
+import pytest
+
+from agents import hedging
+from agents.hedging import (
+    RequestPolicy,
+    RequestTimeout,
+    hedged_call,
+    hedged_stream,
+    policy_for,
+)
+from config import DEFAULT_NODE_POLICIES, Settings
+
+
+def test_hedged_stream_takes_fastest_and_closes_loser() -> None:
+    """A slow first stream is raced, then cancelled once the hedge wins."""
+
+    closed: list[str] = []
+    delays = iter([1.0, 0.0])
+
+    async def start() -> AsyncIterator[str]:
+        delay = next(delays)
+        name = "slow" if delay else "fast"
+
+        async def gen() -> AsyncIterator[str]:
+            try:
+                await asyncio.sleep(delay)
+                yield name
+                yield "done"
+            finally:
+                closed.append(name)
+
+        return gen()
+
+    policy = RequestPolicy(hedge=True, hedge_after=0.01)
+
+    async def run() -> list[str]:
+        return [chunk async for chunk in hedged_stream("test", start, policy)]
+
+    assert asyncio.run(run()) == ["fast", "done"]
+    assert sorted(closed) == ["fast", "slow"]
+
+
+def test_hedged_stream_enforces_first_token_timeout() -> None:
+    """A stream that stays silent past its first-token timeout fails."""
+
+    async def start() -> AsyncIterator[str]:
+        async def gen() -> AsyncIterator[str]:
+            await asyncio.sleep(1)
+            yield "late"
+
+        return gen()
+
+    policy = RequestPolicy(first_token_timeout=0.01)
+
+    async def run() -> None:
+        async for _ in hedged_stream("test", start, policy):
+            pass
+
+    with pytest.raises(RequestTimeout):
+        asyncio.run(run())
+
+
+def test_hedged_call_falls_back_to_hedge_when_primary_fails() -> None:
+    """A failed attempt does not win while another is still running."""
+
+    calls: list[int] = []
+
+    async def func() -> Any:
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(0.02)
+            raise RuntimeError("primary failed")
+        await asyncio.sleep(0.05)
+        return "hedged"
+
+    policy = RequestPolicy(deadline=1, hedge=True, hedge_after=0.01)
+    assert asyncio.run(hedged_call("test", func, policy)) == "hedged"
+
+
+def test_policies_come_from_settings(monkeypatch: Any) -> None:
+    """Node policies are read from ``Settings.node_policies``."""
+
+    settings = types.SimpleNamespace(
+        node_policies={"Planner": {"deadline": 5, "hedge": True}}
+    )
+    monkeypatch.setattr(hedging.config, "load_settings", lambda: settings)
+    assert policy_for("Planner") == RequestPolicy(deadline=5, hedge=True)
+    assert policy_for("Editor") == RequestPolicy()
+
+
+def test_default_node_policies_keep_previous_limits(monkeypatch: Any) -> None:
+    monkeypatch.delenv("NODE_POLICIES", raising=False)
+    policies = Settings().node_policies
+    assert policies == DEFAULT_NODE_POLICIES
+    assert RequestPolicy(**policies["Content-Weaver"]) == RequestPolicy(
+        deadline=600, first_token_timeout=90, hedge=True, hedge_after=30.0
+    )
+    monkeypatch.setenv("NODE_POLICIES", '{"Planner": {"timeout": 1}}')
+    with pytest.raises(ValueError):
+        Settings()
+
+
+def test_only_streams_feed_the_hedge_threshold(monkeypatch: Any) -> None:
+    """Non-streaming latencies are kept out of the first-token samples."""
+
+    monkeypatch.setattr(hedging, "_LATENCIES", {})
+
+    async def func() -> str:
+        return "done"
+
+    async def start() -> AsyncIterator[str]:
+        async def gen() -> AsyncIterator[str]:
+            yield "chunk"
+
+        return gen()
+
+    async def run() -> None:
+        await hedged_call("metrics", func, RequestPolicy())
+        assert "metrics" not in hedging._LATENCIES
+        async for _ in hedged_stream("metrics", start, RequestPolicy()):
+            pass
+
+    asyncio.run(run())
+    assert len(hedging._LATENCIES["metrics"]) == 1
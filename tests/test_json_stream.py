@@ -0,0 +1,57 @@
+"""Tests for the incremental JSON item scanner."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from agents.json_stream import JsonItemStream, OffSchemaError
+
+
+def test_items_emitted_as_they_close_across_chunk_boundaries() -> None:
+    """Array elements are returned once complete, whatever the chunking."""
+
+    doc = {
+        "title": 'He said "{not a slide}" \\ ok',
+        "slides": [
+            {"slide_number": 1, "copy": {"bullet_points": ["a, b", "]}"]}},
+            {"slide_number": 2},
+        ],
+        "tags": [{"ignored": True}],
+    }
+    text = "```json\n" + json.dumps(doc) + "\n``` trailing"
+    for size in (1, 3, 7, len(text)):
+        scanner = JsonItemStream(["slides"])
+        items = []
+        for start in range(0, len(text), size):
+            items.extend(scanner.feed(text[start : start + size]))
+        assert items == [("slides", s) for s in doc["slides"]]
+        assert scanner.done
+
+
+def test_first_slide_available_before_document_ends() -> None:
+    """A slide is emitted while later content is still streaming."""
+
+    scanner = JsonItemStream(["slides"])
+    assert scanner.feed('{"slides": [{"slide_number": 1}') == [
+        ("slides", {"slide_number": 1})
+    ]
+    assert not scanner.done
+
+
+def test_string_elements_emitted_when_closed() -> None:
+    """Scalar string elements are returned as soon as their quote closes."""
+
+    scanner = JsonItemStream(["steps"])
+    assert scanner.feed('{"steps": ["Intro", "Mo') == [("steps", "Intro")]
+    assert scanner.feed('tion \\"laws\\""]}') == [("steps", 'Motion "laws"')]
+    assert scanner.done
+
+
+@pytest.mark.parametrize("text", ['["not", "an object"]', '{"slides": [}'])
+def test_off_schema_output_is_rejected_early(text: str) -> None:
+    """Non-object output and mismatched brackets raise immediately."""
+
+    with pytest.raises(OffSchemaError):
+        JsonItemStream(["slides"]).feed(text)
@@ -0,0 +1,59 @@
+"""Tests for the shared lecture loader used by exporters."""
+
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from export.lecture_loader import LectureLoader
+
+
+def _db(tmp_path: Path) -> Path:
+    db_path = tmp_path / "lecture.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE lectures (workspace_id TEXT, lecture_json TEXT, created_at TEXT)"
+    )
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def _insert(db_path: Path, workspace_id: str, title: str, created_at: str) -> None:
+    lecture = {"title": title, "learning_objectives": [], "duration_min": 5}
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO lectures VALUES (?,?,?)",
+            (workspace_id, json.dumps(lecture), created_at),
+        )
+
+
+def test_latest_id_tracks_newest_lecture(tmp_path: Path) -> None:
+    db_path = _db(tmp_path)
+    loader = LectureLoader(str(db_path))
+    assert loader.latest_id("ws") is None
+    _insert(db_path, "ws", "Old", "2024-01-01")
+    _insert(db_path, "other", "Other", "2024-03-01")
+    first = loader.latest_id("ws")
+    _insert(db_path, "ws", "New", "2024-02-01")
+    assert loader.latest_id("ws") != first
+    assert loader.load("ws").title == "New"
+
+
+def test_load_reuses_parsed_lecture_until_new_row(tmp_path: Path) -> None:
+    db_path = _db(tmp_path)
+    _insert(db_path, "ws", "Demo", "2024-01-01")
+    loader = LectureLoader(str(db_path))
+    first = loader.load("ws")
+    assert loader.load("ws") is first
+    _insert(db_path, "ws", "Demo v2", "2024-01-02")
+    assert loader.load("ws").title == "Demo v2"
+    loader.invalidate("ws")
+    assert loader.load("ws") is not first
+
+
+def test_load_missing_workspace_raises(tmp_path: Path) -> None:
+    loader = LectureLoader(str(_db(tmp_path)))
+    with pytest.raises(ValueError):
+        loader.load("missing")
@@ -0,0 +1,82 @@
+import httpx
+import pytest
+
+from agents.licence_resolver import LicenceResolver, infer_licence
+from agents.url_verifier import UrlVerifier
+
+
+def _verifier(path, calls, licences, **kwargs):
+    return UrlVerifier(path, delay=0, client=_client(calls, licences), **kwargs)
+
+
+def _client(calls, licences):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(str(request.url))
+        licence = licences.get(str(request.url))
+        if licence is None:
+            raise httpx.ConnectError("boom", request=request)
+        return httpx.Response(200, headers={"License": licence})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_domain_rules_match_subdomains():
+    assert infer_licence("https://en.wikipedia.org/wiki/X") == "CC BY-SA 4.0"
+    assert infer_licence("https://notwikipedia.org/x") is None
+
+
+@pytest.mark.asyncio
+async def test_known_domains_skip_network(tmp_path):
+    calls = []
+    resolver = LicenceResolver(
+        tmp_path / "licences.db",
+        verifier=_verifier(tmp_path / "licences_urls.db", calls, {}),
+    )
+    assert await resolver.resolve("https://en.wikipedia.org/wiki/X") == ("CC BY-SA 4.0")
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_results_are_cached_per_url(tmp_path):
+    calls = []
+    licences = {"https://example.edu/a": "MIT", "https://example.edu/b": "CC0"}
+    resolver = LicenceResolver(
+        tmp_path / "licences.db",
+        verifier=_verifier(tmp_path / "licences_urls.db", calls, licences),
+    )
+    results = await resolver.resolve_many(
+        ["https://example.edu/a", "https://example.edu/a"]
+    )
+    assert results == ["MIT", "MIT"]
+    assert calls == ["https://example.edu/a"]
+    # A header hit on one page says nothing about other pages on the host.
+    assert await resolver.resolve("https://example.edu/b") == "CC0"
+    assert calls == ["https://example.edu/a", "https://example.edu/b"]
+
+    reopened = LicenceResolver(
+        tmp_path / "licences.db",
+        verifier=_verifier(tmp_path / "licences_urls.db", calls, {}),
+    )
+    assert await reopened.resolve("https://example.edu/a") == "MIT"
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_failures_are_negatively_cached(tmp_path):
+    calls = []
+    resolver = LicenceResolver(
+        tmp_path / "licences.db",
+        verifier=_verifier(tmp_path / "licences_urls.db", calls, {}),
+    )
+    assert await resolver.resolve("https://broken.example/x") == ""
+    assert await resolver.resolve("https://broken.example/x") == ""
+    assert len(calls) == 1
+
+    expired = LicenceResolver(
+        tmp_path / "expired.db",
+        verifier=_verifier(tmp_path / "expired_urls.db", calls, {}, error_ttl=-1),
+        negative_ttl=-1,
+    )
+    await expired.resolve("https://broken.example/x")
+    await expired.resolve("https://broken.example/x")
+    assert len(calls) == 3
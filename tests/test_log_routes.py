@@ -0,0 +1,187 @@
+"""Tests for the audit log query and export routes."""
+
+import importlib.util  # noqa: E402
+import json
+import sqlite3
+import sys
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import aiosqlite
+import pytest
+from fastapi import APIRouter, Depends, FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from web.auth import verify_jwt  # noqa: E402
+
+repo_src = Path(__file__).resolve().parents[1] / "src"
+if str(repo_src) in sys.path:
+    sys.path.remove(str(repo_src))
+
+sys.path.insert(0, str(repo_src))
+
+SCHEMA = """
+CREATE TABLE action_logs (
+    id INTEGER PRIMARY KEY,
+    workspace_id TEXT NOT NULL,
+    agent_name TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    output_hash TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    cost REAL NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX ix_action_logs_workspace_timestamp
+    ON action_logs (workspace_id, timestamp);
+CREATE INDEX ix_action_logs_workspace_agent_timestamp
+    ON action_logs (workspace_id, agent_name, timestamp);
+"""
+
+
+def _load(name: str, path: Path) -> Any:
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    # Slots dataclasses look their module up while the class is created.
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# ``persistence.logs`` is stubbed in conftest; exercise the real module.
+logs = _load("real_persistence_logs", repo_src / "persistence" / "logs.py")
+with pytest.MonkeyPatch.context() as patch:
+    patch.setitem(sys.modules, "persistence.logs", logs)
+    log_routes = _load("log_routes", repo_src / "web" / "routes" / "logs.py")
+
+
+@asynccontextmanager
+async def _session(path: Path):
+    async with aiosqlite.connect(path) as conn:
+        yield conn
+
+
+@pytest.fixture
+def db_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Create an action log table holding logs across three days."""
+
+    monkeypatch.setattr(log_routes, "get_db_session", _session)
+
+    path = tmp_path / "workspace.db"
+    start = datetime(2024, 1, 1, 22)
+    with sqlite3.connect(path) as conn:
+        conn.executescript(SCHEMA)
+        for i in range(6):
+            for workspace_id in ("ws", "other"):
+                conn.execute(
+                    "INSERT INTO action_logs (workspace_id, agent_name, input_hash,"
+                    " output_hash, tokens, cost, timestamp)"
+                    " VALUES (?, ?, 'in', 'out', ?, 0.0, ?)",
+                    (
+                        workspace_id,
+                        "Planner" if i % 2 else "Editor",
+                        i,
+                        (start + timedelta(hours=i)).isoformat(),
+                    ),
+                )
+        # Two logs sharing a timestamp must not be split or repeated by paging.
+        conn.execute(
+            "INSERT INTO action_logs (workspace_id, agent_name, input_hash,"
+            " output_hash, tokens, cost, timestamp)"
+            " VALUES ('ws', 'Editor', 'in', 'out', 6, 0.0, ?)",
+            ((start + timedelta(hours=5)).isoformat(),),
+        )
+    return path
+
+
+def create_app(db_path: Path) -> FastAPI:
+    """Create a FastAPI app with the log router."""
+
+    app = FastAPI()
+    app.state.db_path = str(db_path)
+    api = APIRouter(prefix="/api", dependencies=[Depends(verify_jwt)])
+    api.include_router(log_routes.router)
+    app.include_router(api)
+    app.dependency_overrides[verify_jwt] = lambda: {"role": "user"}
+    return app
+
+
+def test_pages_follow_cursor_without_gaps(db_path: Path) -> None:
+    """Keyset pages cover every log exactly once, in order."""
+
+    client = TestClient(create_app(db_path))
+    tokens: list[int] = []
+    cursor = None
+    pages = 0
+    while True:
+        params: dict[str, Any] = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/api/workspaces/ws/logs", params=params).json()
+        tokens += [entry["tokens"] for entry in body["entries"]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert tokens == [0, 1, 2, 3, 4, 5, 6]
+    assert pages == 4
+
+
+def test_filters_by_time_and_agent(db_path: Path) -> None:
+    client = TestClient(create_app(db_path))
+    body = client.get(
+        "/api/workspaces/ws/logs",
+        params={"start": "2024-01-02T00:00:00", "end": "2024-01-02T03:00:00"},
+    ).json()
+    assert [entry["tokens"] for entry in body["entries"]] == [2, 3, 4]
+
+    body = client.get("/api/workspaces/ws/logs", params={"agent": "Planner"}).json()
+    assert [entry["tokens"] for entry in body["entries"]] == [1, 3, 5]
+
+
+def test_aware_bounds_are_compared_in_utc(db_path: Path) -> None:
+    """Offsets in ``start``/``end`` are converted to the stored naive UTC."""
+
+    client = TestClient(create_app(db_path))
+    body = client.get(
+        "/api/workspaces/ws/logs",
+        params={
+            "start": "2024-01-02T02:00:00+02:00",
+            "end": "2024-01-02T04:00:00+02:00",
+        },
+    ).json()
+    assert [entry["tokens"] for entry in body["entries"]] == [2, 3]
+
+
+def test_rejects_malformed_cursor(db_path: Path) -> None:
+    client = TestClient(create_app(db_path))
+    resp = client.get("/api/workspaces/ws/logs", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
+
+
+def test_export_streams_ndjson(db_path: Path) -> None:
+    client = TestClient(create_app(db_path))
+    resp = client.get("/api/workspaces/ws/logs/export.ndjson")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert [row["tokens"] for row in rows] == [0, 1, 2, 3, 4, 5, 6]
+    assert {row["workspace_id"] for row in rows} == {"ws"}
+
+
+@pytest.mark.asyncio
+async def test_iter_logs_reads_in_batches(db_path: Path) -> None:
+    async with aiosqlite.connect(db_path) as conn:
+        rows = [row async for row in logs.iter_logs(conn, "ws", batch_size=3)]
+        assert [row["tokens"] for row in rows] == [0, 1, 2, 3, 4, 5, 6]
+
+
+@pytest.mark.asyncio
+async def test_get_logs_includes_whole_end_day(db_path: Path) -> None:
+    async with aiosqlite.connect(db_path) as conn:
+        found = await logs.get_logs(conn, "ws", date(2024, 1, 1), date(2024, 1, 1))
+        assert [entry.tokens for entry in found] == [0, 1]
+        found = await logs.get_logs(conn, "ws", date(2024, 1, 2), date(2024, 1, 2))
+        assert [entry.tokens for entry in found] == [2, 3, 4, 5, 6]
@@ -8,6 +8,7 @@ from pathlib import Path
 
 import pytest
 
+from agents import exporter
 from agents.exporter import run_exporter
 from agents.models import (
     AssessmentItem,
@@ -163,3 +164,35 @@ async def test_run_exporter_reraises_unexpected_errors(
     with pytest.raises(RuntimeError):
         await run_exporter(state)
     assert any("Export failed" in entry.message for entry in state.log)
+
+
+@pytest.mark.asyncio
+async def test_run_exporter_archives_exported_lecture(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Every export archives the lecture under its persisted lecture id."""
+
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    monkeypatch.setattr(MarkdownExporter, "export", lambda _self, _ws: "# Lecture")
+    monkeypatch.setattr(exporter.DocxExporter, "export", lambda _self, _ws: b"docx")
+    monkeypatch.setattr(exporter.PdfExporter, "export", lambda _self, _ws: b"pdf")
+    archived = []
+
+    class Manager:
+        async def archive(self, state: State, lecture_id: str) -> dict[str, int]:
+            archived.append((state, lecture_id))
+            return {}
+
+    class Loader:
+        def latest_id(self, workspace_id: str) -> int:
+            return 7
+
+    monkeypatch.setattr(exporter, "PersistenceManager", Manager)
+    monkeypatch.setattr(exporter, "get_lecture_loader", lambda _path: Loader())
+    state = State(prompt="p")
+    state.workspace_id = "ws"
+    status = await run_exporter(state)
+    assert status.success
+    await run_exporter(state)
+    assert archived == [(state, "7"), (state, "7")]
+    assert state.log[-1].message == "Archived lecture 7"
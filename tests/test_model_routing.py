@@ -0,0 +1,65 @@
+"""Tests for per-node model routing."""
+
+from __future__ import annotations
+
+import asyncio
+import types
+from typing import Any
+
+import pytest
+
+from agents import model_routing
+from agents.model_routing import StructuredOutputError, run_routed
+from metrics.collector import MetricsCollector
+from metrics.repository import MetricsRepository
+
+
+@pytest.fixture
+def collector(monkeypatch: Any) -> MetricsCollector:
+    settings = types.SimpleNamespace(
+        model="openai:o4-mini", node_models={"Planner": "openai:gpt-4.1-mini"}
+    )
+    monkeypatch.setattr(model_routing.config, "load_settings", lambda: settings)
+    collector = MetricsCollector(MetricsRepository(":memory:"))
+    monkeypatch.setattr(model_routing, "get_metrics_collector", lambda: collector)
+    return collector
+
+
+def _names(collector: MetricsCollector) -> list[str]:
+    return [record.name for record in collector._buffer]
+
+
+def test_routed_node_falls_back_to_primary_on_parse_failure(
+    collector: MetricsCollector,
+) -> None:
+    """A structured-output failure on the small model retries on the primary."""
+
+    seen: list[str] = []
+
+    async def call(model_id: str) -> str:
+        seen.append(model_id)
+        if model_id == "openai:gpt-4.1-mini":
+            raise StructuredOutputError("unparseable")
+        return "- step"
+
+    result = asyncio.run(run_routed("Planner", call, prompt="topic"))
+
+    assert result == "- step"
+    assert seen == ["openai:gpt-4.1-mini", "openai:o4-mini"]
+    names = _names(collector)
+    assert "Planner.fallback" in names
+    assert "Planner.route.o4-mini" in names
+    assert "model.o4-mini.cost_usd" in names
+
+
+def test_unrouted_node_uses_primary_without_fallback(
+    collector: MetricsCollector,
+) -> None:
+    """Nodes without a routing entry call the primary model once."""
+
+    async def call(model_id: str) -> str:
+        raise StructuredOutputError(model_id)
+
+    with pytest.raises(StructuredOutputError, match="openai:o4-mini"):
+        asyncio.run(run_routed("Content-Weaver", call))
+    assert _names(collector) == []
@@ -0,0 +1,134 @@
+import json
+
+import pytest
+
+from agents import offline_cache
+from agents.cache_backed_researcher import CacheBackedResearcher
+from agents.offline_cache import (
+    export_corpus,
+    import_corpus,
+    load_cached_results,
+    save_cached_results,
+    search_cached_results,
+)
+from agents.researcher_web import RawSearchResult
+
+
+def _result(url: str, title: str, snippet: str) -> RawSearchResult:
+    return RawSearchResult(url=url, title=title, snippet=snippet)
+
+
+def test_save_and_load_exact_query(tmp_path) -> None:
+    db = tmp_path / "corpus.db"
+    results = [
+        _result("https://a.example", "Photosynthesis", "Plants convert light"),
+        _result("https://b.example", "Chlorophyll", "Green pigment"),
+    ]
+    save_cached_results("photo synthesis?", results, path=db)
+    assert load_cached_results("photo synthesis?", path=db) == results
+    # Queries that sanitise to the same file name no longer collide.
+    assert load_cached_results("photo synthesis!", path=db) is None
+
+
+def test_search_ranks_matches_across_queries(tmp_path) -> None:
+    db = tmp_path / "corpus.db"
+    save_cached_results(
+        "plants",
+        [_result("https://a.example", "Photosynthesis", "Plants convert light")],
+        path=db,
+    )
+    save_cached_results(
+        "cells",
+        [
+            _result("https://b.example", "Cell biology", "Light microscopy of cells"),
+            _result("https://c.example", "Mitosis", "Cell division"),
+        ],
+        path=db,
+    )
+    found = search_cached_results("photosynthesis and light", path=db)
+    assert [r.url for r in found] == ["https://a.example", "https://b.example"]
+    assert search_cached_results("???", path=db) == []
+
+
+def test_import_export_round_trip(tmp_path) -> None:
+    legacy = tmp_path / "legacy"
+    legacy.mkdir()
+    (legacy / "gravity.json").write_text(
+        json.dumps([{"url": "https://g.example", "title": "Gravity", "snippet": "g"}])
+    )
+    first = tmp_path / "first.db"
+    assert import_corpus(legacy, path=first) == 1
+
+    dump = tmp_path / "corpus.jsonl"
+    assert export_corpus(dump, path=first) == 1
+    second = tmp_path / "second.db"
+    assert import_corpus(dump, path=second) == 1
+    assert load_cached_results("gravity", path=second) == [
+        _result("https://g.example", "Gravity", "g")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cache_backed_researcher_falls_back_to_nearest(
+    tmp_path, monkeypatch
+) -> None:
+    monkeypatch.setattr(
+        "agents.offline_cache.corpus_path", lambda: tmp_path / "corpus.db"
+    )
+    save_cached_results(
+        "plants", [_result("https://a.example", "Photosynthesis", "Plants")]
+    )
+    researcher = CacheBackedResearcher()
+    results = await researcher.search("how does photosynthesis work")
+    assert [r.url for r in results] == ["https://a.example"]
+    with pytest.raises(FileNotFoundError):
+        await researcher.search("quantum chromodynamics")
+
+
+def test_default_corpus_imports_legacy_files_once(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(
+        "agents.offline_cache.corpus_path", lambda: tmp_path / "corpus.db"
+    )
+    legacy = tmp_path / "gravity.json"
+    legacy.write_text(
+        json.dumps([{"url": "https://g.example", "title": "Gravity", "snippet": "g"}])
+    )
+    (tmp_path / "broken.json").write_text("{")
+    assert load_cached_results("gravity") == [
+        _result("https://g.example", "Gravity", "g")
+    ]
+    assert load_cached_results("broken") is None
+
+    # Later edits to the legacy files are not re-imported.
+    legacy.write_text("[]")
+    offline_cache._READY.clear()
+    assert len(load_cached_results("gravity") or []) == 1
+
+
+def test_legacy_import_reads_query_and_skips_bad_records(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(
+        "agents.offline_cache.corpus_path", lambda: tmp_path / "corpus.db"
+    )
+    (tmp_path / "what_is_light_.json").write_text(
+        json.dumps(
+            {
+                "query": "what is light?",
+                "results": [
+                    {"url": "https://l.example", "title": "Light", "snippet": "l"}
+                ],
+            }
+        )
+    )
+    (tmp_path / "missing.json").write_text(
+        json.dumps(
+            [{"url": "https://m.example", "title": "Missing", "snippet": "m"}, {}]
+        )
+    )
+    (tmp_path / "wrong.json").write_text(json.dumps(["not a result"]))
+
+    assert load_cached_results("what is light?") == [
+        _result("https://l.example", "Light", "l")
+    ]
+    assert load_cached_results("missing") is None
+    assert load_cached_results("wrong") is None
+    assert search_cached_results("missing") == []
@@ -99,3 +99,86 @@ def test_orchestrator_condition_branching() -> None:
 
     messages = asyncio.run(run_flow())
     assert messages == ["first", "second", "third"]
+
+
+def test_orchestrator_resumes_after_last_checkpointed_node(
+    tmp_path, monkeypatch
+) -> None:
+    """A crashed run restarts at the node following the last checkpoint."""
+
+    import logging
+
+    import core.orchestrator as orchestrator_module
+    from core.checkpoint import SqliteCheckpointManager
+
+    monkeypatch.setattr(orchestrator_module, "logger", logging.getLogger("test"))
+
+    calls: list[str] = []
+
+    async def _record(name: str, state: State) -> None:
+        calls.append(name)
+        state.log.append(ActionLog(message=name))
+
+    async def _a(state: State) -> None:
+        await _record("a", state)
+
+    async def _b(state: State) -> None:
+        await _record("b", state)
+        if len(calls) == 2:
+            raise RuntimeError("deploy killed the run")
+
+    async def _c(state: State) -> None:
+        await _record("c", state)
+
+    flow = [Node("a", _a, "b"), Node("b", _b, "c"), Node("c", _c, None)]
+    checkpointer = SqliteCheckpointManager(str(tmp_path / "cp.db"))
+    orch = GraphOrchestrator(flow, checkpointer=checkpointer)
+    state = State(prompt="topic")
+    state.workspace_id = "ws"
+
+    async def scenario() -> State:
+        try:
+            await orch.run(state)
+        except RuntimeError:
+            pass
+        return await orch.resume("ws")
+
+    resumed = asyncio.run(scenario())
+    assert calls == ["a", "b", "b", "c"]
+    assert [entry.message for entry in resumed.log] == ["a", "b", "c"]
+
+
+def test_failed_run_cancels_background_sections() -> None:
+    """Sections the planner started do not outlive a failed run."""
+
+    from agents import section_pipeline, section_research
+
+    started: list[asyncio.Task] = []
+
+    async def plan(state: State) -> None:
+        workspace = state.workspace_id
+        weave = asyncio.create_task(asyncio.sleep(60))
+        search = asyncio.create_task(asyncio.sleep(60))
+        section_pipeline._PENDING[workspace] = [weave]
+        section_research._PREFETCH[workspace] = {0: search}
+        started.extend([weave, search])
+
+    async def advise(_state: State) -> None:
+        raise RuntimeError("advisor failed")
+
+    async def main() -> None:
+        orch = GraphOrchestrator(
+            [Node("Planner", plan, "Advisor"), Node("Advisor", advise, None)]
+        )
+        state = State(prompt="topic")
+        state.workspace_id = "ws-cancel"
+        try:
+            await orch.run(state)
+        except RuntimeError:
+            pass
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert [task.cancelled() for task in started] == [True, True]
+    assert "ws-cancel" not in section_pipeline._PENDING
+    assert "ws-cancel" not in section_research._PREFETCH
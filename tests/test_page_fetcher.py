@@ -0,0 +1,105 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+from agents.page_fetcher import PageFetcher, detect_charset
+
+
+def _client(requests, responses):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        status, headers, body = responses[str(request.url)]
+        return httpx.Response(status, headers=headers, content=body)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_detect_charset_prefers_header_then_meta() -> None:
+    body = b'<html><head><meta charset="iso-8859-1"></head>'
+    assert detect_charset(body, "utf-8") == "utf-8"
+    assert detect_charset(body) == "iso8859-1"
+    assert detect_charset(b"<p>plain</p>") == "utf-8"
+    assert detect_charset(b"", "no-such-codec") == "utf-8"
+
+
+@pytest.mark.asyncio
+async def test_fetch_caps_body_and_decodes_declared_charset(tmp_path) -> None:
+    requests = []
+    body = "café ".encode("latin-1") * 10
+    responses = {
+        "https://a.example/": (
+            200,
+            {"Content-Type": "text/html; charset=latin-1"},
+            body,
+        )
+    }
+    fetcher = PageFetcher(
+        tmp_path / "pages.db",
+        max_bytes=12,
+        delay=0,
+        client=_client(requests, responses),
+    )
+    page = await fetcher.fetch("https://a.example/")
+    assert page.content == "café café ca"
+    assert page.truncated
+
+
+@pytest.mark.asyncio
+async def test_stale_pages_revalidate_conditionally(tmp_path) -> None:
+    requests = []
+    responses = {"https://a.example/": (200, {"ETag": '"v1"'}, b"hello")}
+    first = PageFetcher(
+        tmp_path / "pages.db", delay=0, client=_client(requests, responses)
+    )
+    await first.fetch("https://a.example/")
+    await first.fetch("https://a.example/")
+    assert len(requests) == 1
+
+    responses["https://a.example/"] = (304, {}, b"")
+    stale = PageFetcher(
+        tmp_path / "pages.db", ttl=-1, delay=0, client=_client(requests, responses)
+    )
+    page = await stale.fetch("https://a.example/")
+    assert requests[-1].headers["If-None-Match"] == '"v1"'
+    assert page.content == "hello"
+
+
+@pytest.mark.asyncio
+async def test_researcher_web_dedups_before_fetching() -> None:
+    # ``web.researcher_web`` is stubbed in conftest, so load the real module.
+    path = Path(__file__).resolve().parents[1] / "src" / "web" / "researcher_web.py"
+    spec = importlib.util.spec_from_file_location("researcher_web_real", path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+
+    fetched = []
+
+    async def fetch(url: str):
+        fetched.append(url)
+        if "broken" in url:
+            raise httpx.ConnectError("boom")
+        return module.CitationResult(url=url, content=url)
+
+    results = await module.researcher_web(
+        [
+            "https://www.Example.com/Page/",
+            "http://example.com/page?ref=1",
+            "https://broken.example/",
+            "https://other.example/",
+        ],
+        fetch=fetch,
+    )
+    assert fetched == [
+        "https://www.Example.com/Page/",
+        "https://broken.example/",
+        "https://other.example/",
+    ]
+    assert [r.url for r in results] == [
+        "https://www.Example.com/Page/",
+        "https://other.example/",
+    ]
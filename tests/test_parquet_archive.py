@@ -0,0 +1,124 @@
+"""Tests for the partitioned Parquet lecture archive."""
+
+import importlib.util
+import sys
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import pyarrow.dataset as ds
+
+from agents.models import ResearchResult, Slide, SlideCopy, SlideSpeakerNotes
+from core.state import Citation, Module, State
+
+repo_src = Path(__file__).resolve().parents[1] / "src"
+
+
+def _load(name: str):
+    spec = importlib.util.spec_from_file_location(
+        f"persistence.{name}", repo_src / "persistence" / f"{name}.py"
+    )
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+_load("parquet_schema")
+LectureArchive = _load("parquet_archive").LectureArchive
+
+
+def _state(topic: str) -> State:
+    state = State(prompt=topic)
+    state.modules.append(
+        Module(
+            id="m1",
+            title=topic,
+            learning_objectives=["understand"],
+            duration_min=30,
+            slides=[
+                Slide(
+                    slide_number=1,
+                    copy=SlideCopy(bullet_points=[f"Intro to {topic}"]),
+                ),
+                Slide(
+                    slide_number=2,
+                    speaker_notes=SlideSpeakerNotes(notes="Mention Entropy here"),
+                ),
+            ],
+        )
+    )
+    state.research_results.append(
+        ResearchResult(url="https://a.example", title="A", snippet="s")
+    )
+    state.sources.append(Citation(url="https://a.example", title="A"))
+    return state
+
+
+def test_write_partitions_by_workspace_and_lecture(tmp_path):
+    archive = LectureArchive(tmp_path)
+    stamp = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    written = archive.write(
+        _state("graphs"), workspace_id="ws1", lecture_id="l1", archived_at=stamp
+    )
+    assert written == {
+        "modules": 1,
+        "slides": 2,
+        "activities": 0,
+        "research_results": 1,
+        "citations": 1,
+    }
+    assert (tmp_path / "slides" / "workspace_id=ws1" / "lecture_id=l1").is_dir()
+    citations = archive.scan("citations")
+    assert citations.column("url").to_pylist() == ["https://a.example/"]
+    assert citations.column("workspace_id").to_pylist() == ["ws1"]
+    assert citations.column("date").to_pylist() == ["2024-05-01"]
+
+
+def test_rewriting_a_lecture_replaces_its_rows(tmp_path):
+    archive = LectureArchive(tmp_path)
+    archive.write(_state("graphs"), workspace_id="ws1", lecture_id="l1")
+    archive.write(_state("other"), workspace_id="ws1", lecture_id="l2")
+    revised = _state("graphs v2")
+    revised.sources.clear()
+    archive.write(revised, workspace_id="ws1", lecture_id="l1")
+
+    modules = archive.scan("modules", columns=["lecture_id", "title"])
+    assert sorted(zip(*modules.to_pydict().values())) == [
+        ("l1", "graphs v2"),
+        ("l2", "other"),
+    ]
+    cited = archive.scan("citations").column("lecture_id").to_pylist()
+    assert cited == ["l2"]
+
+
+def test_scan_prunes_partitions_and_pushes_filters(tmp_path):
+    archive = LectureArchive(tmp_path)
+    archive.write(
+        _state("graphs"),
+        workspace_id="ws1",
+        lecture_id="l1",
+        archived_at=datetime(2024, 5, 1, tzinfo=timezone.utc),
+    )
+    archive.write(
+        _state("entropy"),
+        workspace_id="ws2",
+        lecture_id="l2",
+        archived_at=datetime(2024, 6, 1, tzinfo=timezone.utc),
+    )
+    recent = archive.scan("modules", since=date(2024, 5, 15), columns=["title"])
+    assert recent.column("title").to_pylist() == ["entropy"]
+    numbered = archive.scan(
+        "slides", workspace_id="ws1", filter=ds.field("slide_number") == 2
+    )
+    assert numbered.num_rows == 1
+
+
+def test_slides_mentioning_searches_bullets_and_notes(tmp_path):
+    archive = LectureArchive(tmp_path)
+    archive.write(_state("graphs"), workspace_id="ws1", lecture_id="l1")
+    archive.write(_state("entropy"), workspace_id="ws2", lecture_id="l2")
+    hits = archive.slides_mentioning("entropy")
+    assert sorted(hits.column("lecture_id").to_pylist()) == ["l1", "l2", "l2"]
+    assert archive.slides_mentioning("entropy", workspace_id="ws1").num_rows == 1
+    assert LectureArchive(tmp_path / "empty").scan("slides").num_rows == 0
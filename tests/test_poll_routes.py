@@ -61,3 +61,69 @@ def test_poll_returns_204_when_empty() -> None:
     client = TestClient(create_app())
     resp = client.get("/api/poll/messages")
     assert resp.status_code == 204
+
+
+def test_poll_sets_etag_and_honours_if_none_match() -> None:
+    client = TestClient(create_app())
+    stream("ws-etag:values", {"status": "running"})
+    resp = client.get("/api/poll/ws-etag/values")
+    version = resp.json()["id"]
+    assert resp.headers["etag"] == f'"{poll_routes._EPOCH}-{version}"'
+    resp = client.get(
+        "/api/poll/ws-etag/values", headers={"If-None-Match": resp.headers["etag"]}
+    )
+    assert resp.status_code == 304
+
+
+def test_long_poll_returns_newer_payload_immediately() -> None:
+    client = TestClient(create_app())
+    stream("ws-since:values", {"step": 1})
+    first = client.get("/api/poll/ws-since/values").json()["id"]
+    stream("ws-since:values", {"step": 2})
+    resp = client.get(f"/api/poll/ws-since/values?since={first}&wait=5")
+    assert resp.status_code == 200
+    assert resp.json()["payload"] == {"step": 2}
+    assert resp.json()["id"] > first
+
+
+def test_long_poll_timeout_returns_304_only_for_matching_etag() -> None:
+    client = TestClient(create_app())
+    stream("ws-idle:values", {"step": 1})
+    first = client.get("/api/poll/ws-idle/values")
+    version = first.json()["id"]
+    url = f"/api/poll/ws-idle/values?since={version}&wait=0.05"
+    resp = client.get(url)
+    assert resp.status_code == 200
+    assert resp.json()["payload"] == {"step": 1}
+    resp = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == f'"{poll_routes._EPOCH}-{version}"'
+
+
+def test_if_none_match_accepts_weak_tags_and_lists() -> None:
+    client = TestClient(create_app())
+    stream("ws-weak:values", {"step": 1})
+    etag = client.get("/api/poll/ws-weak/values").headers["etag"]
+    for header in (f"W/{etag}", f'"other", {etag}', "*"):
+        resp = client.get("/api/poll/ws-weak/values", headers={"If-None-Match": header})
+        assert resp.status_code == 304
+
+
+def test_long_poll_with_version_from_earlier_process_returns_latest() -> None:
+    """Ids restart per process, so a ``since`` ahead of the broker is stale."""
+
+    client = TestClient(create_app())
+    stream("ws-restart:values", {"step": 1})
+    resp = client.get("/api/poll/ws-restart/values?since=999999999&wait=5")
+    assert resp.status_code == 200
+    assert resp.json()["payload"] == {"step": 1}
+
+
+def test_etag_from_earlier_process_does_not_match() -> None:
+    client = TestClient(create_app())
+    stream("ws-epoch:values", {"step": 1})
+    version = client.get("/api/poll/ws-epoch/values").json()["id"]
+    resp = client.get(
+        "/api/poll/ws-epoch/values", headers={"If-None-Match": f'"{version}"'}
+    )
+    assert resp.status_code == 200
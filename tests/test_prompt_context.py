@@ -0,0 +1,58 @@
+"""Tests for token-budgeted prompt context."""
+
+from __future__ import annotations
+
+import types
+from typing import Any
+
+from agents import prompt_context
+from agents.models import ResearchResult
+from core.state import Citation
+
+
+def _source(slug: str) -> Citation:
+    return Citation(
+        url=f"https://example.com/{slug}",
+        title=f"About {slug}",
+        licence="CC BY",
+        retrieved_at="2024-01-01",
+    )
+
+
+def test_rank_sources_prefers_matching_research_keywords() -> None:
+    """Sources whose research keywords match the query rank first."""
+
+    sources = [_source("a"), _source("b"), _source("c")]
+    research = [
+        ResearchResult(
+            url="https://example.com/c",
+            title="C",
+            snippet="",
+            keywords=["photosynthesis", "chlorophyll"],
+        )
+    ]
+
+    ranked = prompt_context.rank_sources(
+        sources, "How chlorophyll drives photosynthesis", research
+    )
+
+    assert [str(s.url) for s in ranked][0] == "https://example.com/c"
+    assert ranked[1:] == sources[:2]
+
+
+def test_build_source_context_compacts_then_drops_to_fit(monkeypatch: Any) -> None:
+    """Lines are shortened, then omitted, once the budget runs out."""
+
+    words = types.SimpleNamespace(encode=lambda text: text.split())
+    monkeypatch.setattr(prompt_context, "get_encoding", lambda _name: words)
+    sources = [_source("a"), _source("b"), _source("c")]
+
+    context = prompt_context.build_source_context(
+        sources, "topic", model_name="m", budget=13
+    )
+
+    lines = context.splitlines()
+    assert lines[0] == (
+        "- About a (https://example.com/a) – CC BY retrieved 2024-01-01"
+    )
+    assert lines[1:] == ["- About b (https://example.com/b)"]
@@ -0,0 +1,122 @@
+"""Tests for provider rate limiting."""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+import httpx
+import pytest
+
+from agents import rate_limits
+from agents.rate_limits import AdaptiveConcurrency, LimitConfig, ProviderLimiter
+
+
+def _throttled(retry_after: str) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://api.example.com")
+    response = httpx.Response(
+        429, headers={"Retry-After": retry_after}, request=request
+    )
+    return httpx.HTTPStatusError("slow down", request=request, response=response)
+
+
+def test_call_retries_throttled_requests_honouring_retry_after(
+    monkeypatch: Any,
+) -> None:
+    """429 responses are retried after the advertised delay."""
+
+    sleeps: list[float] = []
+
+    async def fake_sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    monkeypatch.setattr(rate_limits.asyncio, "sleep", fake_sleep)
+    limiter = ProviderLimiter(
+        "test", LimitConfig(requests_per_minute=60, initial_concurrency=4)
+    )
+    attempts: list[int] = []
+
+    async def flaky() -> str:
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise _throttled("7")
+        return "ok"
+
+    assert asyncio.run(limiter.call(flaky)) == "ok"
+    assert len(attempts) == 3
+    assert sleeps[:2] == [7.0, 7.0]
+    assert limiter.throttled == 2
+    assert limiter.snapshot()["concurrency_limit"] < 4
+
+
+def test_call_does_not_retry_client_errors() -> None:
+    """Non-transient failures propagate immediately."""
+
+    limiter = ProviderLimiter("test", LimitConfig())
+
+    async def bad() -> None:
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        asyncio.run(limiter.call(bad))
+    assert limiter.concurrency.in_flight == 0
+
+
+def test_adaptive_concurrency_is_additive_increase_multiplicative_decrease() -> None:
+    """Successes grow the window slowly; throttling halves it."""
+
+    async def run() -> list[float]:
+        window = AdaptiveConcurrency(4, 8)
+        limits = []
+        for throttled in (False, False, False, False, True):
+            await window.acquire()
+            await window.release(1.0, throttled=throttled)
+            limits.append(window.limit)
+        await window.acquire()
+        await window.release(10.0)
+        limits.append(window.limit)
+        return limits
+
+    limits = asyncio.run(run())
+    assert 4.9 < limits[3] < 5.0
+    assert limits[4] == pytest.approx(limits[3] / 2)
+    assert limits[5] == pytest.approx(limits[4] / 2)
+
+
+def test_stream_retries_throttled_open_but_not_started_streams(
+    monkeypatch: Any,
+) -> None:
+    """A 429 before the stream starts is retried; later failures are not."""
+
+    sleeps: list[float] = []
+
+    async def fake_sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    monkeypatch.setattr(rate_limits.asyncio, "sleep", fake_sleep)
+    limiter = ProviderLimiter("test", LimitConfig())
+    opened: list[int] = []
+
+    @asynccontextmanager
+    async def open_stream() -> AsyncIterator[str]:
+        opened.append(1)
+        if len(opened) == 1:
+            raise _throttled("3")
+        yield "response"
+
+    async def consume(fail: bool) -> str:
+        async with limiter.stream(open_stream) as response:
+            if fail:
+                raise _throttled("3")
+            return response
+
+    assert asyncio.run(consume(fail=False)) == "response"
+    assert len(opened) == 2
+    assert sleeps == [3.0]
+    assert limiter.throttled == 1
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(consume(fail=True))
+    assert len(opened) == 3
+    assert limiter.concurrency.in_flight == 0
@@ -20,6 +20,48 @@ async def test_pipeline_handles_web_search_error(monkeypatch):
     assert citations == []
 
 
+class FakeVerifier:
+    async def cached(self, _url: str):
+        return None
+
+
+@pytest.fixture(autouse=True)
+def no_url_cache(monkeypatch):
+    """Keep the shared verifier from opening a cache in the data dir."""
+
+    monkeypatch.setattr(
+        "agents.researcher_pipeline.get_url_verifier", lambda: FakeVerifier()
+    )
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stores_citations_in_one_batch(monkeypatch):
+    drafts = [
+        CitationDraft(url="https://example.edu/a", snippet="", title="A"),
+        CitationDraft(url="https://example.edu/b", snippet="", title="B"),
+    ]
+    batches = []
+
+    async def lookup(_url: str) -> str:
+        return "MIT"
+
+    async def upsert_many(self, citations):
+        batches.append([c.url for c in citations])
+
+    async def insert(self, citation):
+        raise AssertionError("row-by-row fallback used")
+
+    monkeypatch.setattr("agents.researcher_pipeline._lookup_licence", lookup)
+    monkeypatch.setattr(
+        "agents.researcher_pipeline.CitationRepo.upsert_many", upsert_many
+    )
+    monkeypatch.setattr("agents.researcher_pipeline.CitationRepo.insert", insert)
+
+    citations = await researcher_pipeline("query", State(prompt="topic"), drafts)
+    assert batches == [["https://example.edu/a", "https://example.edu/b"]]
+    assert [c.licence for c in citations] == ["MIT", "MIT"]
+
+
 @pytest.mark.asyncio
 async def test_pipeline_continues_on_license_and_db_errors(monkeypatch):
     drafts = [
@@ -35,6 +77,9 @@ async def test_pipeline_continues_on_license_and_db_errors(monkeypatch):
             raise httpx.HTTPError("network issue")
         return "MIT"
 
+    async def failed_batch(self, _citations):
+        raise RuntimeError("bulk insert failed")
+
     async def flaky_insert(self, citation):
         if str(citation.url).endswith("/b"):
             raise RuntimeError("db down")
@@ -42,6 +87,9 @@ async def test_pipeline_continues_on_license_and_db_errors(monkeypatch):
 
     monkeypatch.setattr("agents.researcher_pipeline.run_web_search", good_search)
     monkeypatch.setattr("agents.researcher_pipeline._lookup_licence", flaky_lookup)
+    monkeypatch.setattr(
+        "agents.researcher_pipeline.CitationRepo.upsert_many", failed_batch
+    )
     monkeypatch.setattr("agents.researcher_pipeline.CitationRepo.insert", flaky_insert)
 
     state = State(prompt="topic")
@@ -7,7 +7,11 @@ from agents.researcher_web import TavilyClient
 
 
 @pytest.mark.asyncio
-async def test_tavily_client_parses_response():
+async def test_tavily_client_parses_response(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "agents.offline_cache.corpus_path", lambda: tmp_path / "corpus.db"
+    )
+
     def handler(
         request: httpx.Request,
     ) -> httpx.Response:  # pragma: no cover - simple handler
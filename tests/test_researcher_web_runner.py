@@ -0,0 +1,58 @@
+import pytest
+
+from agents import researcher_web_runner
+from agents.researcher_web import RawSearchResult
+from core.state import State
+
+
+def test_derive_queries_covers_prompt_and_clauses() -> None:
+    queries = researcher_web_runner.derive_queries(
+        "Photosynthesis and respiration", limit=4
+    )
+    assert queries == [
+        "Photosynthesis and respiration",
+        "Photosynthesis",
+        "respiration",
+        "Photosynthesis and respiration overview",
+    ]
+    assert researcher_web_runner.derive_queries("Gravity", limit=2) == [
+        "Gravity",
+        "Gravity overview",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fanout_merges_and_ranks_by_query_hits(monkeypatch) -> None:
+    def result(url: str) -> RawSearchResult:
+        return RawSearchResult(url=url, title=url, snippet="")
+
+    responses = {
+        "a": [result("https://one.example/"), result("https://two.example/")],
+        "b": [result("https://www.two.example"), result("https://three.example/")],
+    }
+
+    async def fake_search(query, _client):
+        if query == "broken":
+            raise RuntimeError("boom")
+        return responses[query]
+
+    class FakeClient:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return None
+
+    monkeypatch.setattr(researcher_web_runner, "cached_search", fake_search)
+    monkeypatch.setattr(researcher_web_runner, "_client", lambda _s: FakeClient())
+
+    drafts = await researcher_web_runner.run_fanout_search(
+        State(prompt="topic"), ["a", "b", "broken"]
+    )
+    assert [d.url for d in drafts] == [
+        "https://two.example/",
+        "https://one.example/",
+        "https://three.example/",
+    ]
+    with pytest.raises(RuntimeError):
+        await researcher_web_runner.run_fanout_search(State(prompt="x"), ["broken"])
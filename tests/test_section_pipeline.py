@@ -0,0 +1,124 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from agents import section_pipeline
+from agents.hedging import RequestPolicy, hedged_stream
+from core.state import Outline, State
+
+
+def _fake_weaver(started, release):
+    async def content_weaver(state, section_id):
+        started.append(section_id)
+        await release.wait()
+        return state.outline.steps[section_id]
+
+    def add_module(state, weave):
+        state.modules.append(weave)
+        return weave
+
+    return SimpleNamespace(content_weaver=content_weaver, add_module=add_module)
+
+
+@pytest.mark.asyncio
+async def test_sections_start_while_planning_continues(monkeypatch) -> None:
+    started: list[int] = []
+    release = asyncio.Event()
+
+    async def stream_planner_steps(_topic, _workspace_id):
+        yield "Intro"
+        await asyncio.sleep(0)
+        # The first section is already being woven before planning ends.
+        assert started == [0]
+        yield "Laws"
+
+    planner = SimpleNamespace(
+        stream_planner_steps=stream_planner_steps,
+        plan_confidence=lambda outline: 0.7,
+        PlanResult=lambda confidence, outline: SimpleNamespace(
+            confidence=confidence, outline=outline
+        ),
+    )
+    monkeypatch.setattr(section_pipeline, "planner", planner)
+    monkeypatch.setattr(
+        section_pipeline, "content_weaver", _fake_weaver(started, release)
+    )
+
+    state = State(prompt="Physics")
+    result = await section_pipeline.run_pipelined_planner(state)
+    assert result.outline.steps == ["Intro", "Laws"]
+    release.set()
+    modules = await section_pipeline.run_section_weaver(state)
+    assert modules == ["Intro", "Laws"]
+    assert state.modules == ["Intro", "Laws"]
+
+
+@pytest.mark.asyncio
+async def test_empty_stream_falls_back_to_blocking_planner(monkeypatch) -> None:
+    started: list[int] = []
+    release = asyncio.Event()
+    release.set()
+
+    async def stream_planner_steps(_topic, _workspace_id):
+        return
+        yield  # pragma: no cover
+
+    async def run_planner(state):
+        state.outline = Outline(steps=["A", "B"])
+        return "blocking"
+
+    planner = SimpleNamespace(
+        stream_planner_steps=stream_planner_steps, run_planner=run_planner
+    )
+    monkeypatch.setattr(section_pipeline, "planner", planner)
+    monkeypatch.setattr(
+        section_pipeline, "content_weaver", _fake_weaver(started, release)
+    )
+
+    state = State(prompt="Physics")
+    assert await section_pipeline.run_pipelined_planner(state) == "blocking"
+    assert started == []
+    assert await section_pipeline.run_section_weaver(state) == ["A", "B"]
+
+
+@pytest.mark.asyncio
+async def test_deadline_mid_stream_falls_back_to_blocking_planner(
+    monkeypatch,
+) -> None:
+    started: list[int] = []
+    release = asyncio.Event()
+
+    async def stream_planner_steps(_topic, _workspace_id):
+        async def start():
+            async def chunks():
+                yield "Intro"
+                await asyncio.sleep(1)
+                yield "Laws"  # pragma: no cover - cut off by the deadline
+
+            return chunks()
+
+        policy = RequestPolicy(deadline=0.05)
+        async for step in hedged_stream("Planner", start, policy):
+            yield step
+
+    async def run_planner(state):
+        state.outline = Outline(steps=["Intro", "Laws", "Energy"])
+        return "blocking"
+
+    planner = SimpleNamespace(
+        stream_planner_steps=stream_planner_steps, run_planner=run_planner
+    )
+    monkeypatch.setattr(section_pipeline, "planner", planner)
+    monkeypatch.setattr(
+        section_pipeline, "content_weaver", _fake_weaver(started, release)
+    )
+
+    state = State(prompt="Physics")
+    assert await section_pipeline.run_pipelined_planner(state) == "blocking"
+    # The section started before the deadline was cancelled, not kept.
+    assert started == [0]
+    assert state.outline.steps == ["Intro", "Laws", "Energy"]
+    release.set()
+    modules = await section_pipeline.run_section_weaver(state)
+    assert modules == ["Intro", "Laws", "Energy"]
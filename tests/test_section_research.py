@@ -0,0 +1,149 @@
+"""Tests for background per-section research."""
+
+from __future__ import annotations
+
+import asyncio
+import types
+from datetime import datetime
+from typing import Any
+
+import pytest
+
+from agents import section_pipeline, section_research
+from agents.researcher_web import CitationDraft
+from core.state import Citation, Outline, State
+from metrics.collector import MetricsCollector
+from metrics.repository import MetricsRepository
+
+
+@pytest.fixture
+def collector(monkeypatch: Any) -> MetricsCollector:
+    collector = MetricsCollector(MetricsRepository(":memory:"))
+    monkeypatch.setattr(section_research, "get_metrics_collector", lambda: collector)
+    return collector
+
+
+def _names(collector: MetricsCollector) -> list[str]:
+    return [record.name for record in collector._buffer]
+
+
+def _state(workspace_id: str) -> State:
+    state = State(prompt="Physics", outline=Outline(steps=["Optics", "Waves"]))
+    state.workspace_id = workspace_id  # type: ignore[attr-defined]
+    return state
+
+
+@pytest.mark.asyncio
+async def test_research_section_searches_step_and_returns_citations(
+    monkeypatch: Any,
+) -> None:
+    queries: list[list[str]] = []
+
+    async def run_fanout_search(_state: State, qs: list[str]) -> list[CitationDraft]:
+        queries.append(qs)
+        return [
+            CitationDraft(
+                url="https://en.wikipedia.org/wiki/Optics", snippet="", title="Optics"
+            ),
+            CitationDraft(url="https://example.edu/waves", snippet="", title="Waves"),
+        ]
+
+    async def cite_drafts(drafts: list[CitationDraft], workspace_id: str) -> list[Any]:
+        assert workspace_id == "ws-r"
+        return [
+            types.SimpleNamespace(
+                url=d.url,
+                title=d.title,
+                licence="CC BY-SA",
+                retrieved_at=datetime(2024, 1, 1),
+                status_code=200,
+                verified_at=datetime(2024, 1, 2),
+            )
+            for d in drafts
+        ]
+
+    monkeypatch.setattr(section_research, "run_fanout_search", run_fanout_search)
+    monkeypatch.setattr(section_research, "cite_drafts", cite_drafts)
+
+    state = _state("ws-r")
+    state.sources.append(Citation(url="https://example.edu/waves"))
+    citations = await section_research.research_section(state, 0)
+    assert queries == [["Physics Optics"]]
+    assert citations[0].title == "Optics"
+    assert citations[0].licence == "CC BY-SA"
+    assert citations[0].retrieved_at == "2024-01-01T00:00:00"
+    assert citations[0].status_code == 200
+    assert citations[0].verified_at == "2024-01-02T00:00:00"
+    assert [str(source.url) for source in state.sources] == [
+        "https://example.edu/waves",
+        "https://en.wikipedia.org/wiki/Optics",
+    ]
+
+    await section_research.research_section(state, 0)
+    assert len(state.sources) == 2
+
+
+@pytest.mark.asyncio
+async def test_section_sources_records_hits_and_misses(
+    monkeypatch: Any, collector: MetricsCollector
+) -> None:
+    release = asyncio.Event()
+    found = [Citation(url="https://example.edu/optics", title="Optics")]
+
+    async def research_section(_state: State, section_id: int) -> list[Citation]:
+        if section_id == 1:
+            await release.wait()
+        return found
+
+    monkeypatch.setattr(section_research, "research_section", research_section)
+    state = _state("ws-h")
+    section_research.prefetch_sections(state)
+
+    assert await section_research.section_sources(state, 0, wait=1) == found
+    # A slow search is not waited for beyond ``wait`` and keeps running.
+    assert await section_research.section_sources(state, 1, wait=0.01) is None
+    release.set()
+    assert await section_research.section_sources(state, 1, wait=1) == found
+    assert _names(collector) == [
+        "research.section.hit",
+        "research.section.miss",
+        "research.section.hit",
+    ]
+    section_research.cancel_prefetch(state)
+    assert await section_research.section_sources(state, 0, wait=1) is None
+
+
+@pytest.mark.asyncio
+async def test_section_weaver_uses_section_citations(
+    monkeypatch: Any, collector: MetricsCollector
+) -> None:
+    async def research_section(state: State, section_id: int) -> list[Citation]:
+        if section_id == 1:
+            raise RuntimeError("search down")
+        step = state.outline.steps[section_id].lower()
+        return [Citation(url=f"https://example.edu/{step}")]
+
+    woven: dict[int, Any] = {}
+
+    async def content_weaver(state: State, section_id: int, sources: Any) -> str:
+        woven[section_id] = sources
+        return state.outline.steps[section_id]
+
+    settings = types.SimpleNamespace(section_research=True, section_research_wait=1)
+    monkeypatch.setattr(section_pipeline.config, "load_settings", lambda: settings)
+    monkeypatch.setattr(section_research, "research_section", research_section)
+    monkeypatch.setattr(
+        section_pipeline,
+        "content_weaver",
+        types.SimpleNamespace(
+            content_weaver=content_weaver,
+            add_module=lambda state, weave: weave,
+        ),
+    )
+
+    state = _state("ws-w")
+    assert await section_pipeline.run_section_weaver(state) == ["Optics", "Waves"]
+    assert [str(c.url) for c in woven[0]] == ["https://example.edu/optics"]
+    # A failed search falls back to the topic-wide sources.
+    assert woven[1] is None
+    assert "ws-w" not in section_research._PREFETCH
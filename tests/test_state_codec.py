@@ -0,0 +1,68 @@
+"""Tests for the binary state snapshot codec."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from core.state import Module, Outline, State
+from core.state_codec import (
+    SCHEMA_VERSION,
+    decode_state,
+    encode_state,
+    is_encoded,
+    read_header,
+    upgrade_payload,
+)
+
+
+def _state() -> State:
+    return State(
+        prompt="topic",
+        outline=Outline(steps=["intro", "body"]),
+        modules=[
+            Module(id="m1", title="Intro", learning_objectives=[], duration_min=10)
+        ],
+        version=7,
+    )
+
+
+def test_encode_decode_roundtrip() -> None:
+    state = _state()
+    payload = encode_state(state)
+    assert is_encoded(payload)
+    assert decode_state(payload) == state
+
+
+def test_header_is_readable_without_body() -> None:
+    payload = encode_state(_state())
+    truncated = payload[: payload.index(b"}") + 1]
+    header = read_header(truncated)
+    assert header.prompt == "topic"
+    assert header.version == 7
+    assert header.schema == SCHEMA_VERSION
+
+
+def test_legacy_json_payloads_decode_and_upgrade() -> None:
+    state = _state()
+    legacy = json.dumps(state.to_dict())
+    assert not is_encoded(legacy)
+    assert read_header(legacy).schema == 0
+    assert decode_state(legacy) == state
+    upgraded = upgrade_payload(legacy)
+    assert is_encoded(upgraded)
+    assert decode_state(upgraded) == state
+    assert upgrade_payload(upgraded) == upgraded
+
+
+def test_uncompressed_payload_roundtrip() -> None:
+    state = _state()
+    assert decode_state(encode_state(state, compress=False)) == state
+
+
+def test_newer_schema_is_rejected() -> None:
+    payload = bytearray(encode_state(_state()))
+    payload[4] = SCHEMA_VERSION + 1
+    with pytest.raises(ValueError):
+        decode_state(bytes(payload))
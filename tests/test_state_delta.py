@@ -0,0 +1,34 @@
+import copy
+
+import pytest
+
+from core.state_delta import apply, diff
+
+
+def test_diff_roundtrip_nested_changes():
+    old = {"a": 1, "b": {"c": [1, 2]}, "d/e": "x", "gone": True}
+    new = {"a": 2, "b": {"c": [1, 2, 3]}, "d/e": "y", "added": None}
+    ops = diff(old, new)
+    assert {"op": "add", "path": "/b/c/-", "value": 3} in ops
+    assert {"op": "replace", "path": "/d~1e", "value": "y"} in ops
+    assert apply(copy.deepcopy(old), ops) == new
+
+
+def test_diff_replaces_mostly_rewritten_lists():
+    ops = diff({"l": [1, 2, 3]}, {"l": [0, 1, 2, 3]})
+    assert ops == [{"op": "replace", "path": "/l", "value": [0, 1, 2, 3]}]
+
+
+def test_diff_shrinking_list_removes_from_tail():
+    old = {"l": [1, 2, 3, 4]}
+    new = {"l": [1, 2]}
+    assert apply(copy.deepcopy(old), diff(old, new)) == new
+
+
+def test_diff_identical_is_empty():
+    assert diff({"a": [1]}, {"a": [1]}) == []
+
+
+def test_apply_rejects_unknown_op():
+    with pytest.raises(ValueError):
+        apply({"a": 1}, [{"op": "move", "path": "/a"}])
@@ -43,3 +43,83 @@ async def test_stream_broadcasts_to_subscribers() -> None:
     streaming.stream("test", "payload")
     result = await asyncio.wait_for(task, 1)
     assert result == "payload"
+
+
+@pytest.mark.asyncio
+async def test_subscribe_many_tags_events_and_replays_missed() -> None:
+    """One subscription carries several channels and resumes by event id."""
+
+    streaming.stream("ws-multi:values", {"n": 1})
+    streaming.stream("ws-multi:debug", "skipped")
+    events = streaming.subscribe_many(
+        ["ws-multi:values", "ws-multi:messages"], last_event_id=0
+    )
+    first = await asyncio.wait_for(events.__anext__(), 1)
+    assert first[0] == "ws-multi:values" and first[2] == {"n": 1}
+
+    pending = asyncio.ensure_future(events.__anext__())
+    await asyncio.sleep(0)
+    streaming.stream("ws-multi:messages", "token")
+    channel, event_id, payload = await asyncio.wait_for(pending, 1)
+    assert (channel, payload) == ("ws-multi:messages", "token")
+    assert event_id > first[1]
+    await events.aclose()
+
+
+@pytest.mark.asyncio
+async def test_workspace_multiplex_names_events_and_sets_ids() -> None:
+    """The multiplexed SSE generator names events by channel with ids."""
+
+    from web.sse import stream_workspace_multiplex
+
+    events = stream_workspace_multiplex("mux1", ["messages", "values"])
+    pending = asyncio.ensure_future(events.__anext__())
+    await asyncio.sleep(0)
+    streaming.stream("mux1:debug", "ignored")
+    streaming.stream("mux1:values", {"slide": 1})
+    event = await asyncio.wait_for(pending, 1)
+    await events.aclose()
+
+    assert event["event"] == "values"
+    assert int(event["id"]) > 0
+    assert '"slide":1' in event["data"]
+
+
+@pytest.mark.asyncio
+async def test_wait_for_event_wakes_on_publish() -> None:
+    streaming.stream("wait:values", {"step": 1})
+    since = streaming.get_latest_event("wait:values")[0]
+    waiter = asyncio.create_task(streaming.wait_for_event("wait:values", since, 1))
+    await asyncio.sleep(0)
+    streaming.stream("wait:values", {"step": 2})
+    event_id, payload = await waiter
+    assert event_id > since and payload == {"step": 2}
+    assert await streaming.wait_for_event("wait:values", event_id, 0.01) is None
+
+
+def test_state_channels_keep_only_the_latest_snapshot() -> None:
+    for n in range(3):
+        streaming.stream("ws-hist:state", {"n": n})
+        streaming.stream("ws-hist:messages", n)
+    assert [p for _, p in streaming._HISTORY["ws-hist:state"]] == [{"n": 2}]
+    assert [p for _, p in streaming._HISTORY["ws-hist:messages"]] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_idle_channels_without_subscribers_are_evicted(monkeypatch) -> None:
+    clock = [1_000_000.0]
+    monkeypatch.setattr(streaming.time, "monotonic", lambda: clock[0])
+    streaming.stream("ws-idle:messages", "old")
+    events = streaming.subscribe_many(["ws-busy:messages"])
+    pending = asyncio.ensure_future(events.__anext__())
+    await asyncio.sleep(0)
+    streaming.stream("ws-busy:messages", "kept")
+    await asyncio.wait_for(pending, 1)
+
+    clock[0] += streaming.CHANNEL_TTL + streaming._SWEEP_INTERVAL
+    streaming.stream("ws-other:messages", "new")
+    assert streaming.get_latest("ws-idle:messages") is None
+    assert streaming.get_latest_event("ws-idle:messages") is None
+    # A channel with a live subscriber keeps its history.
+    assert streaming.get_latest("ws-busy:messages") == "kept"
+    await events.aclose()
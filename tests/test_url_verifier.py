@@ -0,0 +1,67 @@
+import httpx
+import pytest
+
+from agents.url_verifier import UrlVerifier
+
+
+def _client(requests, responses):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        status, headers = responses[str(request.url)]
+        return httpx.Response(status, headers=headers)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_check_many_dedups_and_streams_results(tmp_path):
+    requests = []
+    responses = {
+        "https://a.example/": (200, {"License": "MIT"}),
+        "https://b.example/": (404, {}),
+    }
+    verifier = UrlVerifier(
+        tmp_path / "checks.db", delay=0, client=_client(requests, responses)
+    )
+    urls = ["https://a.example/", "https://b.example/", "https://a.example/"]
+    checks = {c.url: c async for c in verifier.check_many(urls)}
+    assert checks["https://a.example/"].ok
+    assert checks["https://a.example/"].licence == "MIT"
+    assert not checks["https://b.example/"].ok
+    assert len(requests) == 2
+    await verifier.check("https://a.example/")
+    assert len(requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_checks_revalidate_conditionally(tmp_path):
+    requests = []
+    responses = {"https://a.example/": (200, {"ETag": '"v1"', "License": "MIT"})}
+    first = UrlVerifier(
+        tmp_path / "checks.db", delay=0, client=_client(requests, responses)
+    )
+    await first.check("https://a.example/")
+
+    responses["https://a.example/"] = (304, {})
+    stale = UrlVerifier(
+        tmp_path / "checks.db", ttl=-1, delay=0, client=_client(requests, responses)
+    )
+    check = await stale.check("https://a.example/")
+    assert requests[-1].headers["If-None-Match"] == '"v1"'
+    assert check.status_code == 200
+    assert check.licence == "MIT"
+
+
+@pytest.mark.asyncio
+async def test_spellings_of_one_url_share_a_check(tmp_path):
+    requests = []
+    responses = {"https://a.example/": (200, {"License": "MIT"})}
+    verifier = UrlVerifier(
+        tmp_path / "checks.db", delay=0, client=_client(requests, responses)
+    )
+    await verifier.check("https://a.example")
+    cached = await verifier.cached("HTTPS://A.example:443/#top")
+    assert cached is not None and cached.licence == "MIT"
+    checks = [c async for c in verifier.check_many(["https://a.example/"])]
+    assert [c.url for c in checks] == ["https://a.example/"]
+    assert len(requests) == 1